@@ -5,7 +5,7 @@ from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast
     FastAcquisition1To3GHzFitsWriter
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_observation import \
     FastAcquisition1To3GHzObservation
-from ratan_600_data_analyzer.ratan.ratan_builder_factory import RatanBuilderFactory
+from ratan_600_data_analyzer.ratan.ratan_processor import ObservationProcessingFacade
 
 
 class ObservationProcessor:
@@ -16,14 +16,8 @@ class ObservationProcessor:
         write_fits = True
         overwrite = True
 
-        builder = RatanBuilderFactory.create_builder(fast_acquisition_bin_file)
-        observation = None
-        if RatanBuilderFactory.is_fast_1_3ghz_builder(builder):
-            observation = (builder
-                           .read()
-                           .remove_spikes(method="kurtosis")
-                           .calibrate(method="lebedev")
-                           .build())
+        # Этапы - config.pipeline; другой набор: process(file, stages=config.pipeline_variants["quicklook"])
+        observation = ObservationProcessingFacade().process(fast_acquisition_bin_file)
 
         if observation is None:
             raise Exception("No observation created")
@@ -16,6 +16,7 @@ from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast
     FastAcquisition1To3GHzObservation
 from ratan_600_data_analyzer.ratan.polarization_type import PolarizationType
 from ratan_600_data_analyzer.ratan.ratan_builder_factory import RatanBuilderFactory
+from ratan_600_data_analyzer.ratan.ratan_processor import ObservationProcessingFacade
 from ratan_600_data_analyzer.utils.common_utils import time_counter
 
 FITS_OUTPUT_PATH = Path(r"D:\data\astro\ratan-600\fast-acquisition-1-3ghz\fits\sun")
@@ -67,23 +68,17 @@ def process_fast_acquisition(fast_acquisition_bin_file: Path, fits_output_path:
         pipeline Director
     """
     write = True
-    builder = RatanBuilderFactory.create_builder(fast_acquisition_bin_file)
-    observation = None
-    if RatanBuilderFactory.is_fast_1_3ghz_builder(builder):
-        observation = (builder
-                        .read()
-                        .remove_spikes(method="kurtosis")
-                        .calibrate(method="lebedev")
-                        .build())
+    # Этапы - config.pipeline ([pipeline] variant: full, quicklook)
+    observation = ObservationProcessingFacade().process(fast_acquisition_bin_file)
 
-        # available
-        # .write(".fits", output_fits_file)
-        # .interpolate_gaps(method="linear")
-        # .time_downsample(time_reduction_factor=16)
+    # available
+    # .write(".fits", output_fits_file)
+    # .interpolate_gaps(method="linear")
+    # .time_downsample(factor=16)
 
-        # potential adding
-        # .empty_raw_data() .remove_data("kurtosis")
-        # .frequency_downsample(FREQUENCY_REDUCTION_FACTOR)
+    # potential adding
+    # .empty_raw_data() .remove_data("kurtosis")
+    # .frequency_downsample(FREQUENCY_REDUCTION_FACTOR)
 
     if observation is None:
         raise Exception("No observation created")
@@ -99,9 +94,7 @@ def process_fast_acquisition(fast_acquisition_bin_file: Path, fits_output_path:
             writer.write(output_fits_file, overwrite=overwrite)
             print(f"Written to {output_fits_file}")
 
-            lhcp = observation.data.lhcp
-            rhcp = observation.data.rhcp
-            data_cube_bin = np.stack([lhcp, rhcp], axis=1)
+            data_cube_bin = observation.data.array_3d
             data_cube_fits = read_fits(output_fits_file)
             bin_arr = data_cube_bin[0,0,:]
             fits_arr = data_cube_fits[0, 0, :]
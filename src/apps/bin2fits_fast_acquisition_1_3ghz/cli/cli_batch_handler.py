@@ -153,7 +153,7 @@ class CliBatchHandler:
         with concurrent.futures.ProcessPoolExecutor(
                 max_workers=active_workers,
                 initializer=init_worker,
-                initargs=(max_ram_limit,)) as executor:
+                initargs=(max_ram_limit, active_workers)) as executor:
 
             def submit_next_tasks():
                 if self._shutdown_requested:
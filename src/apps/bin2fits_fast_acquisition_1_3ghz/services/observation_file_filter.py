@@ -3,6 +3,8 @@ import re
 from pathlib import Path
 
 from apps.bin2fits_fast_acquisition_1_3ghz.settings.bin2fits_fast_acquisition_1_3ghz_settings import FileFilterSettings
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +19,8 @@ class ObservationFileFilter:
     def is_valid(self, file_path: Path) -> bool:
         filename = file_path.name
 
-        if not (filename.endswith('.bin') or filename.endswith('.bin.gz')):
+        # .bin и сжатые .bin.gz, .bin.xz, .bin.bz2, .bin.zst
+        if not FastAcquisition1To3GHzCodecs.is_bin(file_path):
             return False
 
         for pattern in self._forbidden_patterns:
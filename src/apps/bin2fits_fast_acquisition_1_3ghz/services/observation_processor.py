@@ -1,11 +1,31 @@
 import logging
+import tempfile
 from pathlib import Path
 
+import numpy as np
+import psutil
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_demultiplexer import \
+    FastAcquisition1To3GHzBinDemultiplexer
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_calibrator_lebedev import \
+    FastAcquisition1To3GHzCalibratorLebedev
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_chunked_reader import \
+    FastAcquisition1To3GHzChunkedReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_data import \
+    FastAcquisition1To3GHzData
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_fits_writer import \
     FastAcquisition1To3GHzFitsWriter
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_flagger import \
+    FastAcquisition1To3GHzFlagger
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_observation import \
     FastAcquisition1To3GHzObservation
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_preflight_validator import \
+    FastAcquisition1To3GHzPreflightValidator
 from ratan_600_data_analyzer.ratan.ratan_builder_factory import RatanBuilderFactory
+from ratan_600_data_analyzer.ratan.ratan_calibrator_factory import RatanCalibratorFactory
+from ratan_600_data_analyzer.ratan.ratan_observation_director import RatanObservationDirector
 
 logger = logging.getLogger(__name__)
 
@@ -14,17 +34,88 @@ class FastAcquisition1To3GHzObservationProcessor:
         Обработка наблюдения
     """
     @staticmethod
-    def execute(bin_file: Path, output_fits_file: Path, overwrite: bool) -> None:
+    def execute(bin_file: Path, output_fits_file: Path, overwrite: bool, memory_budget_gb: float = None) -> None:
+        """
+            Запись предварительно проверяется (FastAcquisition1To3GHzPreflightValidator, config.preflight_validation):
+            ValueError "preflight: ..." - причина отказа, записываемая в БД со статусом FAILED.
+            memory_budget_gb - предел памяти процесса: если обработка всей записи сразу его превысит
+            (оценка по размеру файла) или завершится MemoryError, запись обрабатывается частями
+        """
         logger.info(f"[{bin_file.name}] Started processing")
 
+        memory_budget = None if memory_budget_gb is None else int(memory_budget_gb * 1024 ** 3)
+        estimated_memory = None
+        if memory_budget is not None:
+            estimated_memory = FastAcquisition1To3GHzObservationProcessor._estimated_memory(bin_file)
+        in_chunks = estimated_memory is not None and estimated_memory > memory_budget
+
+        records = None
+        if config.preflight_validation:
+            # Плохой файл отбраковывается по .desc и заголовкам записей, до декодирования спектров.
+            # Записи архива, читаемого целиком, возвращаются проверкой: чтение не распаковывает его повторно
+            _, records = FastAcquisition1To3GHzPreflightValidator.validate(bin_file, keep_records=not in_chunks)
+
+        if in_chunks:
+            logger.info(f"[{bin_file.name}] Estimated memory {estimated_memory / 1024 ** 3:.1f} GB exceeds "
+                        f"{memory_budget_gb} GB, processing in chunks")
+            FastAcquisition1To3GHzObservationProcessor.execute_chunked(bin_file, output_fits_file, overwrite,
+                                                                       memory_budget)
+            return
+
+        try:
+            FastAcquisition1To3GHzObservationProcessor._execute(bin_file, output_fits_file, overwrite, records)
+            return
+        except Exception as e:
+            if memory_budget is None or not FastAcquisition1To3GHzObservationProcessor._is_memory_error(e):
+                raise
+            logger.warning(f"[{bin_file.name}] Out of memory, processing in chunks")
+        finally:
+            # Записи проверки не нужны обработке частями
+            records = None
+        # Повтор вне обработчика исключения: массивы неудачной попытки уже освобождены
+        FastAcquisition1To3GHzObservationProcessor.execute_chunked(bin_file, output_fits_file, overwrite, memory_budget)
+
+    @staticmethod
+    def _estimated_memory(bin_file: Path) -> int | None:
+
+        """
+            FastAcquisition1To3GHzChunkedReader.estimated_memory; None - размер записи не определяется
+            (причину отказа сообщат проверка или чтение)
+        """
+
+        try:
+            return FastAcquisition1To3GHzChunkedReader.estimated_memory(bin_file)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _is_memory_error(e: BaseException) -> bool:
+
+        """
+            MemoryError, в том числе обернутая в RuntimeError этапов сборки
+        """
+
+        while e is not None:
+            if isinstance(e, MemoryError):
+                return True
+            e = e.__cause__
+        return False
+
+    @staticmethod
+    def _execute(bin_file: Path, output_fits_file: Path, overwrite: bool,
+                 records: FastAcquisition1To3GHzBinDemultiplexer = None) -> None:
+
+        """
+            records - записи, разобранные проверкой (FastAcquisition1To3GHzPreflightValidator.validate)
+        """
+
         builder = RatanBuilderFactory.create_builder(bin_file)
         if not RatanBuilderFactory.is_fast_1_3ghz_builder(builder):
             raise ValueError(f"Invalid builder type for file {bin_file.name}")
+        builder.records = records
 
-        observation = (builder.read()
-                       .remove_spikes(method="kurtosis")
-                       .calibrate(method="lebedev")
-                       .build())
+        # Этапы - config.pipeline, время и память каждого этапа пишутся в лог
+        observation = RatanObservationDirector(builder, builder.default_stages()).construct()
 
         if observation is None:
             raise RuntimeError("Processing failed: no observation created")
@@ -34,4 +125,63 @@ class FastAcquisition1To3GHzObservationProcessor:
             writer.write(output_fits_file, overwrite)
             logger.info(f"[{bin_file.name}] Successfully converted to '{output_fits_file}'")
         else:
-            raise TypeError("Processing failed: Invalid observation type returned")
\ No newline at end of file
+            raise TypeError("Processing failed: Invalid observation type returned")
+
+    @staticmethod
+    def execute_chunked(bin_file: Path, output_fits_file: Path, overwrite: bool, memory_budget: int) -> None:
+        """
+            Обработка частями по времени (этапы фиксированы, config.pipeline не используется):
+            чтение -> разметка -> калибровка -> куб (частота, поляризация, время)
+            во временном файле рядом с output_fits_file -> запись (сжатие по строкам куба).
+            Коэффициенты калибровки - по окну спокойного Солнца [arcsec_min, arcsec_max] (предварительный проход),
+            память - не более memory_budget байт, не считая отображенных в память файлов
+        """
+        output_fits_file.parent.mkdir(parents=True, exist_ok=True)
+        flagger = FastAcquisition1To3GHzFlagger()
+
+        with FastAcquisition1To3GHzChunkedReader(bin_file, temp_dir=output_fits_file.parent) as reader:
+            metadata = reader.metadata
+
+            # Предварительный проход: точка спокойного Солнца и коэффициенты калибровки
+            start, stop = reader.sample_range((config.arcsec_min, config.arcsec_max))
+            quiet_sun = reader.read_samples(start, stop, flagger=flagger)
+            channel_mapping = quiet_sun.data.channel_mapping
+            quiet_sun = RatanCalibratorFactory.create_calibrator(quiet_sun, "lebedev").calibrate()
+            quiet_sun_metadata = quiet_sun.metadata
+            cal_coeffs = quiet_sun_metadata.calibration_coefficients
+            del quiet_sun
+
+            # Остаток предела - поровну на часть записи и на сжатый куб при записи.
+            # Страницы отображенных файлов (shared) в пределе не учитываются
+            memory_info = psutil.Process().memory_info()
+            available = memory_budget - (memory_info.rss - getattr(memory_info, 'shared', 0))
+            chunk_samples = reader.chunk_samples(max(available // 2, 0))
+            logger.info(f"[{bin_file.name}] Chunk: {chunk_samples} of {reader.num_samples} samples")
+
+            frequency_axis = metadata.coordinate_axes.frequency_axis
+            cube_shape = (metadata.num_frequencies, 2, metadata.num_samples)
+            with tempfile.NamedTemporaryFile(suffix='.cube', dir=output_fits_file.parent) as cube_file:
+                cube = np.memmap(cube_file, dtype=np.float32, mode='w+', shape=cube_shape)
+                for start, stop in reader.chunks(chunk_samples):
+                    chunk = reader.read_samples(start, stop, flagger=flagger)
+                    FastAcquisition1To3GHzCalibratorLebedev.calibrate_array(
+                        chunk.data.pol_channel0, cal_coeffs.calibration_coefficients_pol_channel0, frequency_axis,
+                        out=cube[:, 0, start:stop])
+                    FastAcquisition1To3GHzCalibratorLebedev.calibrate_array(
+                        chunk.data.pol_channel1, cal_coeffs.calibration_coefficients_pol_channel1, frequency_axis,
+                        out=cube[:, 1, start:stop])
+                    del chunk
+                cube.flush()
+
+                metadata.is_calibrated = True
+                metadata.calibration_coefficients = cal_coeffs
+                metadata.unit = quiet_sun_metadata.unit
+                metadata._quiet_sun_point_arcsec = quiet_sun_metadata._quiet_sun_point_arcsec
+                observation = FastAcquisition1To3GHzObservation(metadata=metadata,
+                                                                data=FastAcquisition1To3GHzData(channel_mapping))
+
+                writer = FastAcquisition1To3GHzFitsWriter(observation)
+                writer.write(output_fits_file, overwrite, data_cube=cube, tile_shape=(1, 2, cube_shape[2]))
+                del cube
+
+        logger.info(f"[{bin_file.name}] Successfully converted to '{output_fits_file}' (chunked)")
@@ -14,23 +14,28 @@ if sys.platform != 'win32':
 from apps.bin2fits_fast_acquisition_1_3ghz.services.observation_processor import \
     FastAcquisition1To3GHzObservationProcessor
 from ratan_600_data_analyzer.logging.logger_configurator import LoggerConfigurator
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_threads import \
+    FastAcquisition1To3GHzStreamThreads
 
-def init_worker(worker_max_ram_gb: float):
+def init_worker(worker_max_ram_gb: float, workers: int = 1):
     """
     Вызывается при старте каждого дочернего процесса в пуле.
     Приказывает воркеру ИГНОРИРОВАТЬ сигнал Ctrl+C.
     Это позволяет воркеру спокойно доделать текущий файл,
     пока главный процесс управляет мягкой остановкой пула.
+    workers - число воркеров пула: ядра делятся между ними (потоки обработки каналов одной записи)
     """
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+    FastAcquisition1To3GHzStreamThreads.set_workers(workers)
 
     # Модуль resource доступен только в UNIX/Linux
     if sys.platform != 'win32':
         bytes_limit = int(worker_max_ram_gb * 1024 * 1024 * 1024)
 
         try:
-            # RLIMIT_AS (Address Space) - общий объем виртуальной памяти процесса
-            resource.setrlimit(resource.RLIMIT_AS, (bytes_limit, bytes_limit))
+            # RLIMIT_DATA - память данных процесса (куча и анонимные отображения).
+            # Отображенные в память файлы (np.memmap записи и куба при обработке частями) не учитываются
+            resource.setrlimit(resource.RLIMIT_DATA, (bytes_limit, bytes_limit))
         except ValueError:
             # Выбрасывается, если пытаемся поднять лимит выше разрешенного ОС
             pass
@@ -86,9 +91,10 @@ def parallel_worker(bin_file: Path, output_fits_file: Path, overwrite: bool, app
     # 2. Запуск обработки
     logger.info(f"=== [File {file_index} of {total_files}] === [{filename}] ===")
     try:
-        # Если файл потребует больше WORKER_MAX_RAM_GB, эта строка выбросит MemoryError
+        # Если файл потребует больше WORKER_MAX_RAM_GB, он обрабатывается частями
         with ProcessProfiler() as profiler:
-            FastAcquisition1To3GHzObservationProcessor.execute(bin_file, output_fits_file, overwrite)
+            FastAcquisition1To3GHzObservationProcessor.execute(bin_file, output_fits_file, overwrite,
+                                                               memory_budget_gb=max_worker_ram)
         success = True
         exec_time = profiler.elapsed_seconds
         peak_ram = profiler.peak_memory_mb
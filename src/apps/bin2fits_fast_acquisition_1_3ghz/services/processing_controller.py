@@ -12,6 +12,8 @@ from sqlalchemy.orm import Session
 
 from apps.bin2fits_fast_acquisition_1_3ghz.infrastructure.database import FastAcquisition1To3GHzRaw, ProcessingStatus
 from apps.bin2fits_fast_acquisition_1_3ghz.services.observation_processor import FastAcquisition1To3GHzObservationProcessor
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
 
 logger = logging.getLogger(__name__)
 
@@ -82,8 +84,9 @@ class FastAcquisition1To3GHzProcessingController:
         bin_archive = self._settings.bin_archive.resolve()
         filename = bin_file.name
 
-        if filename.endswith('.bin.gz'):
-            fits_filename = filename.replace('.bin.gz', '.fits').lower()
+        extension = FastAcquisition1To3GHzCodecs.extension(bin_file)
+        if extension is not None:
+            fits_filename = (filename.removesuffix(extension) + '.fits').lower()
         else:
             fits_filename = bin_file.with_suffix('.fits').name.lower()
 
@@ -242,7 +245,9 @@ class FastAcquisition1To3GHzProcessingController:
             return
 
         try:
-            FastAcquisition1To3GHzObservationProcessor.execute(bin_file, output_fits_file, overwrite)
+            FastAcquisition1To3GHzObservationProcessor.execute(
+                bin_file, output_fits_file, overwrite,
+                memory_budget_gb=self._settings.resources.worker_max_ram_gb)
             self.finalize_status_in_db(bin_file, output_fits_file, ProcessingStatus.SUCCESS, "")
         except Exception as e:
             error_msg = str(e)[:500]
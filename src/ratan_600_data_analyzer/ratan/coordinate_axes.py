@@ -1,35 +1,43 @@
-import copy
-
 import numpy as np
 
+from ratan_600_data_analyzer.utils.array_utils import ArrayUtils
+
 
 class CoordinateAxes:
+
+    """
+        Оси хранятся и отдаются только для чтения, без копирования (ArrayUtils.read_only)
+    """
+
     def __init__(self):
         self._frequency_axis = None
         self._time_axis = None
         self._arcsec_axis = None
 
+    def __deepcopy__(self, memo):
+        return ArrayUtils.share_read_only(self, memo)
+
     @property
     def frequency_axis(self):
-        return copy.deepcopy(self._frequency_axis)
+        return self._frequency_axis
 
     @frequency_axis.setter
     def frequency_axis(self, array: np.ndarray):
-        self._frequency_axis = copy.deepcopy(array)
+        self._frequency_axis = ArrayUtils.read_only(array)
 
     @property
     def time_axis(self):
-        return copy.deepcopy(self._time_axis)
+        return self._time_axis
 
     @time_axis.setter
     def time_axis(self, array: np.ndarray):
-        self._time_axis = copy.deepcopy(array)
+        self._time_axis = ArrayUtils.read_only(array)
 
     @property
     def arcsec_axis(self):
-        return copy.deepcopy(self._arcsec_axis)
+        return self._arcsec_axis
 
     @arcsec_axis.setter
     def arcsec_axis(self, array: np.ndarray):
-        self._arcsec_axis = copy.deepcopy(array)
+        self._arcsec_axis = ArrayUtils.read_only(array)
 
@@ -0,0 +1,67 @@
+from enum import Enum
+
+import numpy as np
+
+# Сэмплов в блоке склейки: блоки строк c0, c1 и столбцов результата остаются в кэше
+JOIN_BLOCK_SAMPLES = 0x80
+
+
+class FastAcquisition1To3GHzBand(Enum):
+
+    """
+        Полоса частот наблюдения
+
+        c0 1-2 GHz
+        c1 2-3 GHz
+    """
+
+    FULL = "1-3 GHz"
+    LOW = "1-2 GHz"
+    HIGH = "2-3 GHz"
+
+    @property
+    def channels(self) -> tuple:
+
+        """
+            Номера каналов АЦП (поле channel записи: 0 - c0, иначе c1), входящих в полосу
+        """
+
+        if self is FastAcquisition1To3GHzBand.LOW:
+            return (0,)
+        if self is FastAcquisition1To3GHzBand.HIGH:
+            return (1,)
+        return (0, 1)
+
+    def join(self, c0: np.ndarray, c1: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+
+        """
+            Склейка спектров (время, частота) каналов полосы: (частота, время) по возрастанию частоты,
+            C-порядок (один проход транспонирования блоками по JOIN_BLOCK_SAMPLES сэмплов).
+            out - массив (частота, время) для результата, например плоскость куба данных наблюдения
+        """
+
+        parts = []
+        if 0 in self.channels:
+            parts.append(c0[:, ::-1])
+        if 1 in self.channels:
+            parts.append(c1)
+        num_samples = {part.shape[0] for part in parts}
+        if len(num_samples) > 1:
+            raise ValueError(f"Channels has different sizes: {c0.shape[0]} != {c1.shape[0]}.")
+        num_samples = num_samples.pop()
+
+        shape = (sum(part.shape[1] for part in parts), num_samples)
+        if out is None:
+            joined = np.empty(shape, dtype=np.result_type(*parts))
+        elif out.shape != shape:
+            raise ValueError(f"Output array has shape {out.shape}, joined channels {shape}")
+        else:
+            joined = out
+        step = JOIN_BLOCK_SAMPLES
+        for start in range(0, num_samples, step):
+            stop = min(start + step, num_samples)
+            row = 0
+            for part in parts:
+                np.copyto(joined[row:row + part.shape[1], start:stop], part[start:stop].T)
+                row += part.shape[1]
+        return joined
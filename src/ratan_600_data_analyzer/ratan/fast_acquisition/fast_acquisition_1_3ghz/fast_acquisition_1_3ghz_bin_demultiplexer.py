@@ -0,0 +1,180 @@
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_jit_kernels import \
+    FastAcquisition1To3GHzJitKernels
+
+
+class FastAcquisition1To3GHzBinDemultiplexer:
+
+    """
+        Потоковое разделение записей fast_input.dt по каналам и поляризациям.
+        Записи подаются порциями (add), каждая порция сразу раскладывается по номеру кадра cnt
+        в предварительно выделенные массивы потоков c0p0, c0p1, c1p0, c1p1.
+        Ключ потока (канал, поляризация) вычисляется один раз на порцию, записи упорядочиваются по ключу
+        устойчивой сортировкой (поразрядной для uint8) и копируются за один проход.
+
+        c0 1-2 GHz
+        c1 2-3 GHz
+    """
+
+    STREAMS = ('c0p0', 'c0p1', 'c1p0', 'c1p1')
+
+    def __init__(self, capacity: int = 0, dtype: np.dtype = None, window: tuple[int, int] = None,
+                 band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL):
+
+        """
+            capacity - ожидаемое количество кадров в потоке (длина массива потока);
+            при необходимости массивы увеличиваются.
+            dtype - тип записей в потоках, по умолчанию config.dt; config.header_dt - только заголовки.
+            window - диапазон кадров [start, stop), для которого дополнительно сохраняются полные записи
+            (config.dt), см. window_result(); stop может быть больше длины записи
+            band - полоса; записи каналов вне полосы пропускаются, их потоки остаются пустыми
+        """
+
+        self._dtype = config.dt if dtype is None else dtype
+        self._band = band
+        self._avg_kurt = None
+        # Номер потока 2 * channel + polarization
+        self._stream_numbers = [i for i in range(len(self.STREAMS)) if i // 2 in band.channels]
+        self._streams = [np.zeros(capacity if i in self._stream_numbers else 0, dtype=self._dtype)
+                         for i in range(len(self.STREAMS))]
+        self._max_cnt = [-1 for _ in self.STREAMS]
+
+        self._window = window
+        self._window_streams = None
+        # Окно дополнительно копирует записи, JIT-ядро - только для разбора без окна
+        self._jit = window is None and FastAcquisition1To3GHzJitKernels.is_enabled()
+        if window is not None:
+            window_capacity = min(max(window[1] - window[0], 0), capacity)
+            self._window_streams = [np.zeros(window_capacity if i in self._stream_numbers else 0, dtype=config.dt)
+                                    for i in range(len(self.STREAMS))]
+
+    @property
+    def avg_kurt(self) -> int:
+        return self._avg_kurt
+
+    @property
+    def band(self) -> FastAcquisition1To3GHzBand:
+        return self._band
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._dtype
+
+    def add(self, records: np.ndarray):
+
+        if records.size == 0:
+            return
+
+        if self._avg_kurt is None:
+            self._avg_kurt = int(records[0]['avg_kurt'])
+
+        if self._jit and records.dtype == self._dtype and FastAcquisition1To3GHzJitKernels.is_contiguous(records):
+            self._add_jit(records)
+            return
+
+        order, bounds = self._route(records)
+        cnt = records['cnt'][order]
+
+        if self._window is not None:
+            self._add_to_window(records, order, bounds, cnt)
+
+        if records.dtype != self._dtype:
+            # Копируются только поля self._dtype (например, заголовки без data)
+            records = records[list(self._dtype.names)]
+
+        for i in self._stream_numbers:
+            if bounds[i] == bounds[i + 1]:
+                continue
+            stream_cnt = cnt[bounds[i]:bounds[i + 1]]
+            max_cnt = int(stream_cnt.max())
+            self._reserve(i, max_cnt + 1)
+            self._streams[i][stream_cnt] = records[order[bounds[i]:bounds[i + 1]]]
+            self._max_cnt[i] = max(self._max_cnt[i], max_cnt)
+
+    def result(self):
+
+        """
+            Возвращает массивы потоков c0p0, c0p1, c1p0, c1p1.
+            Длина массива кратна config.chunk_length (размер полезной нагрузки ethernet-кадра),
+            записи за ее пределами отбрасываются
+        """
+
+        result = []
+        for i in range(len(self.STREAMS)):
+            max_cnt = max(self._max_cnt[i], 0)
+            length = ((max_cnt + 1) // config.chunk_length) * config.chunk_length
+            result.append(self._streams[i][:length])
+        return tuple(result)
+
+    def window_result(self):
+
+        """
+            Полные записи кадров окна [start, stop) потоков c0p0, c0p1, c1p0, c1p1,
+            индекс в массиве - cnt - start; массивы не длиннее потоков result() без отбрасывания хвоста
+        """
+
+        start, stop = self._window
+        result = []
+        for i in range(len(self.STREAMS)):
+            length = max(min(stop, self._max_cnt[i] + 1) - start, 0)
+            self._window_streams[i] = self._grown(self._window_streams[i], length, limit=length)
+            result.append(self._window_streams[i][:length])
+        return tuple(result)
+
+    @staticmethod
+    def _route(records):
+
+        """
+            Номер потока записи 2 * channel + polarization; возвращает порядок записей, упорядоченных
+            по номеру потока (в пределах потока - в порядке следования), и границы потоков в нем
+        """
+
+        stream_number = (((records['channel'] != 0).astype(np.uint8) << 1)
+                         | ((records['state'] & config.polarization_mask) != 0).astype(np.uint8))
+        order = np.argsort(stream_number, kind='stable')
+        bounds = np.zeros(len(FastAcquisition1To3GHzBinDemultiplexer.STREAMS) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(stream_number, minlength=len(FastAcquisition1To3GHzBinDemultiplexer.STREAMS)),
+                  out=bounds[1:])
+        return order, bounds
+
+    def _add_jit(self, records):
+        max_cnt = FastAcquisition1To3GHzJitKernels.stream_max_cnt(records)
+        for i in self._stream_numbers:
+            if max_cnt[i] < 0:
+                continue
+            self._reserve(i, int(max_cnt[i]) + 1)
+            self._max_cnt[i] = max(self._max_cnt[i], int(max_cnt[i]))
+        FastAcquisition1To3GHzJitKernels.scatter(records, self._streams, self._stream_numbers)
+
+    def _add_to_window(self, records, order, bounds, cnt):
+        start, stop = self._window
+        in_window = (cnt >= start) & (cnt < stop)
+        for i in self._stream_numbers:
+            stream_in_window = in_window[bounds[i]:bounds[i + 1]]
+            if not stream_in_window.any():
+                continue
+            idx = order[bounds[i]:bounds[i + 1]][stream_in_window]
+            position = cnt[bounds[i]:bounds[i + 1]][stream_in_window] - start
+            max_position = int(position.max())
+            self._window_streams[i] = self._grown(self._window_streams[i], max_position + 1, limit=stop - start)
+            self._window_streams[i][position] = records[idx]
+
+    def _reserve(self, i, length):
+        self._streams[i] = self._grown(self._streams[i], length)
+
+    @staticmethod
+    def _grown(stream, length, limit=None):
+        if length <= stream.shape[0]:
+            return stream
+        # Оценка длины обычно точна, недостающие кадры дописываются с запасом 1/8
+        new_length = max(length + length // 8, stream.shape[0] + stream.shape[0] // 8)
+        if limit is not None:
+            new_length = min(new_length, limit)
+        grown = np.zeros(new_length, dtype=stream.dtype)
+        grown[:stream.shape[0]] = stream
+        return grown
@@ -1,25 +1,47 @@
-import gzip
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Union
 
 import numpy as np
 
-from ratan_600_data_analyzer.observation.observation import Observation
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz import fast_input
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_demultiplexer import \
+    FastAcquisition1To3GHzBinDemultiplexer
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_columnar_file import \
+    FastAcquisition1To3GHzColumnarFile
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
     config
-from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_data import \
-    FastAcquisition1To3GHzData
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_decoded_cache import \
+    FastAcquisition1To3GHzDecodedCache
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_flagger import \
+    FastAcquisition1To3GHzFlagger
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_gzip_index import \
+    FastAcquisition1To3GHzGzipIndex
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_jit_kernels import \
+    FastAcquisition1To3GHzJitKernels
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_lazy_data import \
+    FastAcquisition1To3GHzLazyData
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_metadata import \
+    FastAcquisition1To3GHzMetadata
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_metadata_bin_loader import \
     FastAcquisition1To3GHzMetadataBinLoader
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_observation import \
     FastAcquisition1To3GHzObservation
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_decoder import \
+    FastAcquisition1To3GHzStreamDecoder
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_threads import \
+    FastAcquisition1To3GHzStreamThreads
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.fast_acquisition_1_3ghz_lazy_raw_data import \
+    FastAcquisition1To3GHzLazyRawData
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.fast_acquisition_1_3ghz_raw_data import \
     FastAcquisition1To3GHzRawData
-from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.generator_state_data import \
-    GeneratorStateData
-from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.kurtosis_data import KurtosisData
-from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.polarization_channels_data import \
-    PolarizationChannelsData
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.fast_acquisition_1_3ghz_stacked_raw_data import \
+    FastAcquisition1To3GHzStackedRawData
 from ratan_600_data_analyzer.ratan.polarization_type import PolarizationType
 from ratan_600_data_analyzer.ratan.ratan_observation import RatanObservation
 from ratan_600_data_analyzer.ratan.ratan_observation_reader import RatanObservationReader
@@ -28,17 +50,12 @@ from ratan_600_data_analyzer.ratan.ratan_observation_reader import RatanObservat
 class FastAcquisition1To3GHzBinReader(RatanObservationReader):
 
     def can_read(self, file: Path):
+        return FastAcquisition1To3GHzCodecs.is_supported(file)
 
-        extensions = file.suffixes
-
-        if extensions == ['.bin', '.gz']:
-            return True
-        elif extensions == ['.bin']:
-            return True
-        else:
-            return False
-
-    def read(self, bin_file: Path) -> RatanObservation:
+    def read(self, bin_file: Path, lazy: bool = False, sample_range: tuple[int, int] = None,
+             arcsec_range: tuple[float, float] = None,
+             band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL,
+             cache: bool = None, records: FastAcquisition1To3GHzBinDemultiplexer = None) -> RatanObservation:
 
         """
             склейки
@@ -46,162 +63,549 @@ class FastAcquisition1To3GHzBinReader(RatanObservationReader):
             c1 2-3
             p0
             p1
+
+            lazy - метаданные по заголовкам записей, данные и сырые данные декодируются при первом обращении
+            sample_range - читаются только сэмплы [start, stop) (с округлением до границ записей),
+            arcsec_range - только окрестность [arcsec_min, arcsec_max] относительно центра записи
+            (оценка по .desc с запасом config.partial_read_margin). Заголовки записей читаются полностью
+            (сэмплы импульсов генератора), полезная нагрузка вне окна не копируется
+            band - полоса FastAcquisition1To3GHzBand (или ее значение, "1-2 GHz"): декодируются только записи
+            каналов полосы, ось частот наблюдения - только полоса
+            cache - декодированные потоки полного чтения (не lazy) берутся из FastAcquisition1To3GHzDecodedCache
+            и сохраняются в него; None - config.decoded_cache
+            records - записи bin_file, разобранные read_records() для той же полосы: полное чтение
+            (без sample_range, arcsec_range) берет их без повторной распаковки. Записи изменяются чтением
+            (удаление выбросов) и используются один раз
         """
-        pol_chan_data, kurtosis_data, gen_state_data = self._get_data_from_file(bin_file)
+        band = FastAcquisition1To3GHzBand(band)
+        if records is not None:
+            if sample_range is not None or arcsec_range is not None:
+                raise ValueError("read(): records are used only for a full read")
+            if records.band is not band or records.dtype != config.dt:
+                raise ValueError(f"read(): records of band {records.band.value} with {len(records.dtype)} fields "
+                                 f"do not match band {band.value}")
+
+        if cache is None:
+            cache = config.decoded_cache
+        if cache and not lazy and sample_range is None and arcsec_range is None:
+            return self._read_cached(bin_file, band, records)
+
+        fast_acq_metadata = None
+        if sample_range is None and arcsec_range is None:
+            decoder = self._get_data_from_file(bin_file, band=band, records=records)
+        else:
+            decoder, fast_acq_metadata = self._get_window_from_file(bin_file, sample_range=sample_range,
+                                                                    arcsec_range=arcsec_range, band=band)
+
+        if lazy:
+            return self._read_lazy(bin_file, decoder, fast_acq_metadata)
+        return self._read_eager(bin_file, decoder, fast_acq_metadata)
+
+    def read_metadata(self, file_path: Path) -> FastAcquisition1To3GHzMetadata:
+
+        """
+            Метаданные наблюдения только по заголовкам записей (cnt, avg_kurt, state, channel),
+            спектры не декодируются
+        """
+
+        avg_kurt, headers = self.scan_headers(file_path)
+        return self._load_metadata(file_path, self.header_decoder(avg_kurt, headers))
+
+    def scan_headers(self, bin_file: Path, band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL,
+                     records: FastAcquisition1To3GHzBinDemultiplexer = None) -> tuple[int, tuple]:
+
+        """
+            Один проход по записям файла без декодирования спектров: avg_kurt и заголовки записей
+            (поля config.header_dt) потоков c0p0, c0p1, c1p0, c1p1. Ошибка чтения - RuntimeError.
+            records - записи read_records(): заголовки копируются из них, файл не читается
+        """
+
+        if records is not None:
+            return records.avg_kurt, tuple(self._header_fields(stream) for stream in records.result())
+
+        try:
+            demultiplexer = self._demultiplex_file(bin_file, dtype=config.header_dt,
+                                                   band=FastAcquisition1To3GHzBand(band))
+        except Exception as e:
+            raise RuntimeError(f"scan_headers(): {e}") from e
+        return demultiplexer.avg_kurt, demultiplexer.result()
+
+    def read_records(self, bin_file: Path, band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                     ) -> FastAcquisition1To3GHzBinDemultiplexer:
+
+        """
+            Все записи файла, разобранные по потокам за один проход (архив распаковывается один раз):
+            заголовки - scan_headers(records=...), наблюдение - read(records=...) без повторного чтения файла.
+            Ошибка чтения - RuntimeError
+        """
+
+        try:
+            return self._demultiplex_file(bin_file, band=FastAcquisition1To3GHzBand(band))
+        except Exception as e:
+            raise RuntimeError(f"read_records(): {e}") from e
+
+    def header_decoder(self, avg_kurt: int, headers: tuple,
+                       band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                       ) -> FastAcquisition1To3GHzStreamDecoder:
+
+        """
+            Декодер заголовков scan_headers() после удаления выбросов (число сэмплов, состояние генератора);
+            headers не изменяются
+        """
+
+        return self._get_decoder(avg_kurt, *(stream.copy() for stream in headers), band=band)
+
+    @staticmethod
+    def _header_fields(stream: np.ndarray) -> np.ndarray:
+        headers = np.empty(stream.shape[0], dtype=config.header_dt)
+        for name in config.header_dt.names:
+            headers[name] = stream[name]
+        return headers
+
+    def _read_eager(self, bin_file: Path, decoder: FastAcquisition1To3GHzStreamDecoder,
+                    fast_acq_metadata: FastAcquisition1To3GHzMetadata = None,
+                    flagger: FastAcquisition1To3GHzFlagger = None) -> FastAcquisition1To3GHzObservation:
 
         """
             Missing values = 2
+            flagger - разметка данных до склейки (иначе - FastAcquisition1To3GHzBuilder.remove_spikes)
         """
-        # pol_chan_data.c0p0_data = np.nan_to_num(pol_chan_data.c0p0_data, nan=replacement_value)
-        # pol_chan_data.c0p1_data = np.nan_to_num(pol_chan_data.c0p1_data, nan=replacement_value)
-        # pol_chan_data.c1p0_data = np.nan_to_num(pol_chan_data.c1p0_data, nan=replacement_value)
-        # pol_chan_data.c1p1_data = np.nan_to_num(pol_chan_data.c1p1_data, nan=replacement_value)
-        pol_chan_data.c0p0_data[pol_chan_data.c0p0_data == 0] = config.raw_missing_value_replacement
-        pol_chan_data.c0p1_data[pol_chan_data.c0p1_data == 0] = config.raw_missing_value_replacement
-        pol_chan_data.c1p0_data[pol_chan_data.c1p0_data == 0] = config.raw_missing_value_replacement
-        pol_chan_data.c1p1_data[pol_chan_data.c1p1_data == 0] = config.raw_missing_value_replacement
 
-        joined_channels_0 = np.hstack((np.fliplr(pol_chan_data.c0p0_data), pol_chan_data.c1p0_data)).T  # 1-3 GHz pol0
-        joined_channels_1 = np.hstack((np.fliplr(pol_chan_data.c0p1_data), pol_chan_data.c1p1_data)).T  # 1-3 GHz pol1
+        stacked = FastAcquisition1To3GHzStackedRawData.decode(decoder)
+        return self._observation(bin_file, stacked, fast_acq_metadata, flagger)
+
+    def _read_cached(self, bin_file: Path, band: FastAcquisition1To3GHzBand,
+                     records: FastAcquisition1To3GHzBinDemultiplexer = None) -> FastAcquisition1To3GHzObservation:
+        try:
+            cache = FastAcquisition1To3GHzDecodedCache()
+            cached = cache.load(bin_file, band)
+        except Exception as e:
+            raise RuntimeError(f"read(): {e}") from e
+        if cached is not None:
+            return self._observation(bin_file, FastAcquisition1To3GHzStackedRawData.from_streams(*cached, band=band))
+
+        decoder = self._get_data_from_file(bin_file, band=band, records=records)
+        stacked = FastAcquisition1To3GHzStackedRawData.decode(decoder)
+        streams = FastAcquisition1To3GHzStackedRawData.STREAMS
+        cache.store(bin_file, band, {stream: stacked.stream_data(stream) for stream in streams},
+                    {stream: stacked.stream_kurtosis(stream) for stream in streams},
+                    {stream: stacked.stream_state(stream) for stream in streams})
+        return self._observation(bin_file, stacked)
+
+    def _observation(self, bin_file: Path, stacked: FastAcquisition1To3GHzStackedRawData,
+                     fast_acq_metadata: FastAcquisition1To3GHzMetadata = None,
+                     flagger: FastAcquisition1To3GHzFlagger = None) -> FastAcquisition1To3GHzObservation:
 
-        fast_acq_raw_data = FastAcquisition1To3GHzRawData()
-        fast_acq_raw_data.polarization_channels_data = pol_chan_data
-        fast_acq_raw_data.kurtosis_data = kurtosis_data
-        fast_acq_raw_data.generator_state_data = gen_state_data
+        """
+            Наблюдение по декодированным потокам (данные, куртозис, состояние).
+            Поляризации склеиваются при первом обращении (после разметки FastAcquisition1To3GHzBuilder.remove_spikes -
+            только размеченные)
+        """
+
+        if flagger is not None:
+            flagger.flag(*stacked.writable())
+
+        fast_acq_raw_data = FastAcquisition1To3GHzRawData(stacked=stacked)
+        fast_acq_data = FastAcquisition1To3GHzLazyData(self._channel_mapping(), stacked)
+
+        if fast_acq_metadata is None:
+            fast_acq_metadata = self._load_metadata(bin_file, stacked)
+        observation = FastAcquisition1To3GHzObservation(metadata=fast_acq_metadata, data=fast_acq_data, raw_data=fast_acq_raw_data)
+        return observation
+
+    def _read_lazy(self, bin_file: Path, decoder: FastAcquisition1To3GHzStreamDecoder,
+                   fast_acq_metadata: FastAcquisition1To3GHzMetadata = None) -> FastAcquisition1To3GHzObservation:
+
+        if fast_acq_metadata is None:
+            fast_acq_metadata = self._load_metadata(bin_file, decoder)
+        fast_acq_data = FastAcquisition1To3GHzLazyData(self._channel_mapping(), decoder)
+        fast_acq_raw_data = FastAcquisition1To3GHzLazyRawData(decoder)
+        return FastAcquisition1To3GHzObservation(metadata=fast_acq_metadata, data=fast_acq_data, raw_data=fast_acq_raw_data)
 
+    @staticmethod
+    def _load_metadata(bin_file: Path,
+                       source: Union[FastAcquisition1To3GHzStreamDecoder, FastAcquisition1To3GHzStackedRawData]
+                       ) -> FastAcquisition1To3GHzMetadata:
+
+        """
+            Метаданные по состоянию генератора потоков: декодера (заголовки записей) или декодированных сырых данных
+        """
+
+        return FastAcquisition1To3GHzMetadataBinLoader.load_from_generator_state(bin_file,
+                                                                                 source.generator_state(0),
+                                                                                 source.generator_state(1),
+                                                                                 num_frequencies=source.num_frequencies,
+                                                                                 num_samples=source.num_samples,
+                                                                                 band=source.band)
+
+    @staticmethod
+    def _channel_mapping() -> dict:
         polarization_to_attribute = {
             PolarizationType.LHCP.value: 'lhcp',
             PolarizationType.RHCP.value: 'rhcp'
         }
-        channel_mapping = {
+        return {
             'pol_channel0': polarization_to_attribute[config.pol_ch0],
             'pol_channel1': polarization_to_attribute[config.pol_ch1],
         }
 
-        fast_acq_data = FastAcquisition1To3GHzData(channel_mapping)
-        fast_acq_data.pol_channel0 = joined_channels_0
-        fast_acq_data.pol_channel1 = joined_channels_1
-
-        fast_acq_metadata = FastAcquisition1To3GHzMetadataBinLoader.load(bin_file, fast_acq_data=fast_acq_data, fast_acq_raw_data=fast_acq_raw_data)
-        observation = FastAcquisition1To3GHzObservation(metadata=fast_acq_metadata, data=fast_acq_data, raw_data=fast_acq_raw_data)
-        return observation
-
-    def read_metadata(self, file_path: Path) -> Observation:
-        pass
-
-    def _get_data_from_file(self, file: Path, remove_spikes=True):
+    def _get_data_from_file(self, file: Path, remove_spikes=True,
+                            band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL,
+                            records: FastAcquisition1To3GHzBinDemultiplexer = None
+                            ) -> FastAcquisition1To3GHzStreamDecoder:
 
         """
             Если файл - архив, распаковываен и читаем данные в соответствии с форматом fast_input.dt;
-            если не архив, просто читаем
+            если не архив, просто читаем. records - записи файла, уже разобранные read_records()
         """
 
         file_name = file.name
         extensions = file.suffixes
 
-        if extensions == ['.bin', '.gz']:
+        if records is not None:
+            return self._get_decoder(records.avg_kurt, *records.result(), remove_spikes=True, band=band)
+        elif FastAcquisition1To3GHzCodecs.is_compressed(file):
             try:
-                with gzip.open(file) as f:
-                    block_array = np.frombuffer(f.read(), dtype=fast_input.dt)
+                demultiplexer = self._demultiplex_file(file, band=band)
             except Exception as e:
                 raise RuntimeError(f"_get_data_from_file(): {e}") from e
+            return self._get_decoder(demultiplexer.avg_kurt, *demultiplexer.result(), remove_spikes=True, band=band)
         elif extensions == ['.bin']:
             try:
-                block_array = np.fromfile(file, dtype=fast_input.dt)
+                if config.memory_map:
+                    # Файл отображается в память, в RAM попадают только выбранные записи
+                    num_records = file.stat().st_size // config.dt.itemsize
+                    block_array = np.memmap(file, dtype=config.dt, mode='r', shape=(num_records,))
+                else:
+                    block_array = np.fromfile(file, dtype=fast_input.dt)
+            except Exception as e:
+                raise RuntimeError(f"_get_data_from_file(): {e}") from e
+        elif extensions == [FastAcquisition1To3GHzColumnarFile.SUFFIX]:
+            # Потоки уже разложены по cnt, разбор записей не нужен
+            try:
+                demultiplexer = self._demultiplex_file(file, band=band)
             except Exception as e:
                 raise RuntimeError(f"_get_data_from_file(): {e}") from e
+            return self._get_decoder(demultiplexer.avg_kurt, *demultiplexer.result(), remove_spikes=True, band=band)
         else:
             raise ValueError(f"Unsupported file type: '{file_name}'.")
 
-        return self._get_data(block_array, remove_spikes=True)
+        return self._get_data(block_array, remove_spikes=True, band=band)
+
+    def _get_window_from_file(self, file: Path, sample_range: tuple[int, int] = None,
+                              arcsec_range: tuple[float, float] = None,
+                              band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL):
+
+        """
+            Декодер части записи и метаданные, пересчитанные для нее.
+            Заголовки записей раскладываются по всей записи (сэмплы импульсов, удаление выбросов),
+            полные записи - только для кадров окна
+        """
 
-    def _get_data(self, block_array, remove_spikes=True):
+        try:
+            first_record = self._read_first_record(file)
+        except Exception as e:
+            raise RuntimeError(f"_get_window_from_file(): {e}") from e
+        if first_record is None:
+            raise ValueError(f"No records in '{file.name}'")
+        spectrum_length = 8192 // 2 ** (int(first_record['avg_kurt']) & 0b111111)
+
+        if sample_range is None:
+            sample_range = self._arcsec_range_to_sample_range(file, arcsec_range)
+
+        # Окно кадров [start, stop): начало на границе и записи, и спектра
+        start_sample = max(int(sample_range[0]), 0)
+        stop_sample = max(int(sample_range[1]), start_sample)
+        samples_per_record_boundary = max(config.chunk_length // spectrum_length, 1)
+        start_sample -= start_sample % samples_per_record_boundary
+        window = (start_sample * spectrum_length // config.chunk_length,
+                  -(-stop_sample * spectrum_length // config.chunk_length))
+
+        try:
+            demultiplexer = self._demultiplex_file(file, dtype=config.header_dt, window=window, band=band)
+        except Exception as e:
+            raise RuntimeError(f"_get_window_from_file(): {e}") from e
+
+        headers = list(demultiplexer.result())
+        window_streams = list(demultiplexer.window_result())
+        for p0, p1 in ((0, 1), (2, 3)):
+            length = min(headers[p0].shape[0], headers[p1].shape[0])
+            stop = min(window[1], length)
+            num_records = max(stop - window[0], 0)
+            window_streams[p0] = window_streams[p0][:num_records]
+            window_streams[p1] = window_streams[p1][:num_records]
+            if num_records > 0:
+                # Маски выбросов по всей записи, до удаления выбросов из заголовков
+                idx_p0, idx_p1 = self._spike_masks(headers[p0][:length], headers[p1][:length])
+                window_streams[p0][idx_p1[window[0]:stop]] = 0
+                window_streams[p1][idx_p0[window[0]:stop]] = 0
+
+        header_decoder = self._get_decoder(demultiplexer.avg_kurt, *headers, band=band)
+        decoder = FastAcquisition1To3GHzStreamDecoder(demultiplexer.avg_kurt, *window_streams, band=band)
+        if decoder.num_samples == 0:
+            raise ValueError(f"Window {tuple(sample_range)} is out of the record '{file.name}'")
+
+        fast_acq_metadata = self._load_metadata(file, header_decoder)
+        FastAcquisition1To3GHzMetadataBinLoader.set_sample_window(fast_acq_metadata,
+                                                                  window[0] * config.chunk_length // spectrum_length,
+                                                                  decoder.num_samples)
+        return decoder, fast_acq_metadata
+
+    @staticmethod
+    def _arcsec_range_to_sample_range(file: Path, arcsec_range: tuple[float, float]) -> tuple[int, int]:
+
+        """
+            Оценка сэмплов по .desc: начало записи в record_duration_rlc[0] (сек относительно кульминации),
+            окно расширяется на config.partial_read_margin с каждой стороны
+        """
 
-        avg_num = 2 ** (block_array[0]['avg_kurt'] & 0b111111)
-        spectrum_length = 8192 // avg_num
+        metadata = FastAcquisition1To3GHzMetadataBinLoader.load_desc(file)
+        arcsec_per_second = float(metadata.arcsec_per_second)
+        ref_time = -float(metadata.record_duration_rlc[0])
 
-        chan0_pol0, chan0_pol1 = self._get_polarization_arrays(block_array, channel=0)
-        chan1_pol0, chan1_pol1 = self._get_polarization_arrays(block_array, channel=1)
+        times = sorted(ref_time - np.asarray(arcsec_range, dtype=float) / arcsec_per_second)
+        start_time = times[0] - config.partial_read_margin
+        stop_time = times[1] + config.partial_read_margin
+        return (int(np.floor(start_time * config.samples_per_second)),
+                int(np.ceil(stop_time * config.samples_per_second)))
 
-        if remove_spikes:
-            chan0_length = min(chan0_pol0.shape[0], chan0_pol1.shape[0])
-            if chan0_length > 0:
-                chan0_pol0, chan0_pol1 \
-                    = self._remove_spikes_from_polarization_arrays(chan0_pol0[:chan0_length], chan0_pol1[:chan0_length])
-            chan1_length = min(chan1_pol0.shape[0], chan1_pol1.shape[0])
-            if chan1_length > 0:
-                chan1_pol0, chan1_pol1 \
-                    = self._remove_spikes_from_polarization_arrays(chan1_pol0[:chan1_length], chan1_pol1[:chan1_length])
-
-
-        c0p0_data, c0p0_kurtosis, c0p0_state = self._get_data_and_kurtosis(chan0_pol0, spectrum_length)
-        c0p1_data, c0p1_kurtosis, c0p1_state = self._get_data_and_kurtosis(chan0_pol1, spectrum_length)
-        c1p0_data, c1p0_kurtosis, c1p0_state = self._get_data_and_kurtosis(chan1_pol0, spectrum_length)
-        c1p1_data, c1p1_kurtosis, c1p1_state = self._get_data_and_kurtosis(chan1_pol1, spectrum_length)
-
-        pol_chan_data = PolarizationChannelsData(_c0p0_data=c0p0_data,
-                                                 _c0p1_data=c0p1_data,
-                                                 _c1p0_data=c1p0_data,
-                                                 _c1p1_data=c1p1_data)
-
-        kurtosis_data = KurtosisData(_c0p0_kurt=c0p0_kurtosis,
-                                     _c0p1_kurt=c0p1_kurtosis,
-                                     _c1p0_kurt=c1p0_kurtosis,
-                                     _c1p1_kurt=c1p1_kurtosis)
-
-        gen_state_data = GeneratorStateData(_c0p0_state=c0p0_state,
-                                       _c0p1_state=c0p1_state,
-                                       _c1p0_state=c1p0_state,
-                                       _c1p1_state=c1p1_state)
-
-        return pol_chan_data, kurtosis_data, gen_state_data
-
-    def _get_polarization_arrays(self, raw_array, channel):
-        def _align_to_chunk_length(length):
-            return ((length + 1) // config.chunk_length) * config.chunk_length
-
-        # Select elements of the channel
-        if channel == 0:
-            a = raw_array[raw_array['channel'] == 0]
-        elif channel == 1:
-            a = raw_array[raw_array['channel'] != 0]
+    @staticmethod
+    def _read_first_record(file: Path):
+        extensions = file.suffixes
+        if FastAcquisition1To3GHzCodecs.is_compressed(file):
+            with FastAcquisition1To3GHzCodecs.open(file) as f:
+                buffer = f.read(config.dt.itemsize)
+            if len(buffer) < config.dt.itemsize:
+                return None
+            return np.frombuffer(buffer, dtype=config.dt)[0]
+        elif extensions == ['.bin']:
+            records = np.fromfile(file, dtype=config.dt, count=1)
+            return records[0] if records.size > 0 else None
+        elif extensions == [FastAcquisition1To3GHzColumnarFile.SUFFIX]:
+            return FastAcquisition1To3GHzColumnarFile(file).first_record()
         else:
-            raise ValueError(f'Bad channel number: {channel}. Must be 0 or 1.')
-
-        # Separate two polarizations
-        p0 = a[(a['state'] & config.polarization_mask) == 0]
-        p1 = a[(a['state'] & config.polarization_mask) != 0]
-
-        # Find max frame numbers
-        p0_maxindex = p0['cnt'].max() if p0.size > 0 else 0
-        p1_maxindex = p1['cnt'].max() if p1.size > 0 else 0
-
-        # Make the array size a multiple of chunk (ethernet frame payload) size throwing away any possible trailing trash
-        p0_length = _align_to_chunk_length(p0_maxindex)
-        p1_length = _align_to_chunk_length(p1_maxindex)
-        p0 = p0[p0['cnt'] < p0_length]
-        p1 = p1[p1['cnt'] < p1_length]
-
-        # Construct zero arrays to accomodate the full data in the case when there are no missing values
-        # and fill them with the available data
-        r_p0 = np.zeros(p0_length, dtype=config.dt)
-        r_p0[p0['cnt']] = p0
-        r_p1 = np.zeros(p1_length, dtype=config.dt)
-        r_p1[p1['cnt']] = p1
-
-        return r_p0, r_p1
-
-    def _get_data_and_kurtosis(self, a, spectrum_length):
-        cc = a['data'].reshape(-1, spectrum_length)
-        state = np.empty(a['data'].shape, dtype=np.uint32)
-        for i in np.arange(0, state.shape[0]):
-            state[i, :] = a['state'][i]
-        state = state.reshape(-1, spectrum_length)
-        return (cc & 0x7FFFFFFFFFFFFF).astype(np.float32), (cc >> 55).astype(np.float32), state
+            raise ValueError(f"Unsupported file type: '{file.name}'.")
+
+    def _demultiplex_file(self, file: Path, dtype: np.dtype = None, window: tuple[int, int] = None,
+                          band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                          ) -> FastAcquisition1To3GHzBinDemultiplexer:
+
+        extensions = file.suffixes
+
+        if extensions == ['.bin', '.gz']:
+            return self._demultiplex_gzip(file, dtype=dtype, window=window, band=band)
+        elif FastAcquisition1To3GHzCodecs.is_compressed(file):
+            return self._demultiplex_compressed(file, dtype=dtype, window=window, band=band)
+        elif extensions == ['.bin']:
+            return self._demultiplex_bin(file, dtype=dtype, window=window, band=band)
+        elif extensions == [FastAcquisition1To3GHzColumnarFile.SUFFIX]:
+            return self._checked(FastAcquisition1To3GHzColumnarFile(file).demultiplexed(dtype=dtype, window=window,
+                                                                                         band=band), file)
+        else:
+            raise ValueError(f"Unsupported file type: '{file.name}'.")
+
+    def _demultiplex_bin(self, file: Path, dtype: np.dtype = None, window: tuple[int, int] = None,
+                         band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                         ) -> FastAcquisition1To3GHzBinDemultiplexer:
+
+        num_records = file.stat().st_size // config.dt.itemsize
+        if num_records > 0:
+            block_array = np.memmap(file, dtype=config.dt, mode='r', shape=(num_records,))
+        else:
+            block_array = np.zeros(0, dtype=config.dt)
+        demultiplexer = self._demultiplex_array(block_array, dtype=dtype, window=window, band=band)
+        return self._checked(demultiplexer, file)
+
+    @staticmethod
+    def _demultiplex_array(block_array: np.ndarray, dtype: np.dtype = None, window: tuple[int, int] = None,
+                           band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                           ) -> FastAcquisition1To3GHzBinDemultiplexer:
+
+        """
+            Записи массива (block_array может быть np.memmap) раскладываются по потокам
+            порциями по config.read_chunk_records записей, каждая запись копируется один раз.
+            Длина потоков - по максимальному номеру кадра, без перевыделения при пропусках записей
+        """
+
+        capacity = int(block_array['cnt'].max()) + 1 if block_array.shape[0] > 0 else 0
+        demultiplexer = FastAcquisition1To3GHzBinDemultiplexer(capacity=capacity, dtype=dtype, window=window,
+                                                               band=band)
+        step = config.read_chunk_records
+        for start in range(0, block_array.shape[0], step):
+            demultiplexer.add(block_array[start:start + step])
+        return demultiplexer
+
+    def _demultiplex_gzip(self, file: Path, dtype: np.dtype = None, window: tuple[int, int] = None,
+                          band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                          ) -> FastAcquisition1To3GHzBinDemultiplexer:
+
+        """
+            При наличии индекса точек доступа архив распаковывается параллельно (config.gzip_threads),
+            иначе последовательно; при последовательном чтении через indexed_gzip индекс сохраняется.
+            indexed_gzip не сообщает об оборванном архиве: объем распакованных данных сверяется с ISIZE,
+            при несовпадении или неполной последней записи архив читается модулем gzip (он сообщает причину),
+            индекс не сохраняется
+        """
+
+        if config.gzip_index and FastAcquisition1To3GHzGzipIndex.is_available():
+            with FastAcquisition1To3GHzGzipIndex(file) as index:
+                if index.is_up_to_date:
+                    try:
+                        demultiplexer = self._demultiplex_indexed_gzip(index, dtype=dtype, window=window, band=band)
+                    except Exception:
+                        # Поврежденный индекс: удаляем и читаем архив последовательно
+                        index.remove()
+                    else:
+                        return self._checked(demultiplexer, file)
+                f = index.open_sequential()
+                try:
+                    demultiplexer = self._demultiplex_stream(f, self._stream_capacity(file),
+                                                             dtype=dtype, window=window, band=band)
+                except ValueError:
+                    demultiplexer = None
+                # ISIZE - размер распакованных данных по модулю 2^32
+                isize = FastAcquisition1To3GHzCodecs.uncompressed_size(file) % 2 ** 32
+                if demultiplexer is None or f.tell() % 2 ** 32 != isize:
+                    return self._demultiplex_compressed(file, dtype=dtype, window=window, band=band)
+                index.export(f)
+        else:
+            return self._demultiplex_compressed(file, dtype=dtype, window=window, band=band)
+
+        return self._checked(demultiplexer, file)
+
+    def _demultiplex_compressed(self, file: Path, dtype: np.dtype = None, window: tuple[int, int] = None,
+                                band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                                ) -> FastAcquisition1To3GHzBinDemultiplexer:
+
+        """
+            Архив (.bin.gz, .bin.xz, .bin.bz2, .bin.zst, см. FastAcquisition1To3GHzCodecs)
+            распаковывается последовательно, потоком
+        """
+
+        with FastAcquisition1To3GHzCodecs.open(file) as f:
+            demultiplexer = self._demultiplex_stream(f, self._stream_capacity(file),
+                                                     dtype=dtype, window=window, band=band)
+        return self._checked(demultiplexer, file)
+
+    def _demultiplex_indexed_gzip(self, index: FastAcquisition1To3GHzGzipIndex, dtype: np.dtype = None,
+                                  window: tuple[int, int] = None,
+                                  band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                                  ) -> FastAcquisition1To3GHzBinDemultiplexer:
+
+        """
+            Диапазоны по config.read_chunk_records записей распаковываются в нескольких потоках,
+            раскладываются по потокам данных в порядке следования в файле (не более 2 * gzip_threads порций в памяти)
+        """
+
+        num_records = index.num_records
+        demultiplexer = FastAcquisition1To3GHzBinDemultiplexer(capacity=num_records // 2, dtype=dtype, window=window,
+                                                               band=band)
+        step = config.read_chunk_records
+        in_flight = 2 * config.gzip_threads
+
+        with ThreadPoolExecutor(max_workers=config.gzip_threads) as executor:
+            pending = deque()
+            for start in range(0, num_records, step):
+                pending.append(executor.submit(index.read_records, start, min(start + step, num_records)))
+                if len(pending) >= in_flight:
+                    demultiplexer.add(pending.popleft().result())
+            while pending:
+                demultiplexer.add(pending.popleft().result())
+
+        return demultiplexer
+
+    def _demultiplex_stream(self, f, capacity: int, dtype: np.dtype = None, window: tuple[int, int] = None,
+                            band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                            ) -> FastAcquisition1To3GHzBinDemultiplexer:
+
+        """
+            Поток распаковывается порциями по config.read_chunk_records записей,
+            каждая порция сразу раскладывается по потокам данных; неполная последняя запись - ValueError
+        """
+
+        demultiplexer = FastAcquisition1To3GHzBinDemultiplexer(capacity=capacity, dtype=dtype, window=window,
+                                                               band=band)
+
+        chunk = np.empty(config.read_chunk_records, dtype=config.dt)
+        buffer = memoryview(chunk.view(np.uint8))
+        while True:
+            filled = 0
+            while filled < buffer.nbytes:
+                n = f.readinto(buffer[filled:])
+                if n == 0:
+                    break
+                filled += n
+            demultiplexer.add(chunk[:filled // config.dt.itemsize])
+            if filled < buffer.nbytes:
+                break
+
+        if filled % config.dt.itemsize != 0:
+            raise ValueError(f"Records end with a partial record: {filled % config.dt.itemsize} of "
+                             f"{config.dt.itemsize} bytes")
+
+        return demultiplexer
+
+    @staticmethod
+    def _stream_capacity(file: Path) -> int:
+
+        """
+            Ожидаемая длина потока по размеру распакованных данных (FastAcquisition1To3GHzCodecs.uncompressed_size).
+            Номер кадра cnt общий для обеих поляризаций канала, поэтому длина потока ~ половине записей
+        """
+
+        return FastAcquisition1To3GHzCodecs.uncompressed_size(file) // config.dt.itemsize // 2
+
+    @staticmethod
+    def _checked(demultiplexer: FastAcquisition1To3GHzBinDemultiplexer, file: Path) -> FastAcquisition1To3GHzBinDemultiplexer:
+        if demultiplexer.avg_kurt is None:
+            raise ValueError(f"No records in '{file.name}'")
+        return demultiplexer
+
+    def _get_data(self, block_array, remove_spikes=True,
+                  band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL) -> FastAcquisition1To3GHzStreamDecoder:
+
+        demultiplexer = self._demultiplex_array(block_array, band=band)
+        return self._get_decoder(demultiplexer.avg_kurt, *demultiplexer.result(), remove_spikes=remove_spikes,
+                                 band=band)
+
+    def _get_decoder(self, avg_kurt, chan0_pol0, chan0_pol1, chan1_pol0, chan1_pol1, remove_spikes=True,
+                     band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                     ) -> FastAcquisition1To3GHzStreamDecoder:
+
+        if remove_spikes:
+            chan0_pol0, chan0_pol1, chan1_pol0, chan1_pol1 = self._remove_spikes(chan0_pol0, chan0_pol1,
+                                                                                 chan1_pol0, chan1_pol1)
+
+        return FastAcquisition1To3GHzStreamDecoder(avg_kurt, chan0_pol0, chan0_pol1, chan1_pol0, chan1_pol1, band=band)
+
+    def _remove_spikes(self, chan0_pol0, chan0_pol1, chan1_pol0, chan1_pol1):
+
+        """
+            Каналы обрабатываются параллельно (FastAcquisition1To3GHzStreamThreads)
+        """
+
+        def remove_channel_spikes(polarizations):
+            pol0, pol1 = polarizations
+            length = min(pol0.shape[0], pol1.shape[0])
+            if length > 0:
+                pol0, pol1 = self._remove_spikes_from_polarization_arrays(pol0[:length], pol1[:length])
+            return pol0, pol1
+
+        (chan0_pol0, chan0_pol1), (chan1_pol0, chan1_pol1) = FastAcquisition1To3GHzStreamThreads.map(
+            remove_channel_spikes, ((chan0_pol0, chan0_pol1), (chan1_pol0, chan1_pol1)))
+        return chan0_pol0, chan0_pol1, chan1_pol0, chan1_pol1
 
     def _remove_spikes_from_polarization_arrays(self, a, b, shift=-4):
-        idx_a = np.roll((a['cnt'] > 0), shift, axis=0)
-        idx_b = np.roll((b['cnt'] > 0), shift, axis=0)
+        if FastAcquisition1To3GHzJitKernels.is_enabled() and FastAcquisition1To3GHzJitKernels.is_contiguous(a, b):
+            FastAcquisition1To3GHzJitKernels.remove_spikes(a, b, shift=shift)
+            return a, b
+        idx_a, idx_b = self._spike_masks(a, b, shift=shift)
         a[idx_b] = 0
         b[idx_a] = 0
-        return a, b
\ No newline at end of file
+        return a, b
+
+    @staticmethod
+    def _spike_masks(a, b, shift=-4):
+        idx_a = np.roll((a['cnt'] > 0), shift, axis=0)
+        idx_b = np.roll((b['cnt'] > 0), shift, axis=0)
+        return idx_a, idx_b
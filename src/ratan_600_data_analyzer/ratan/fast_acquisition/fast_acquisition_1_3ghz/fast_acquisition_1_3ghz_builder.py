@@ -1,26 +1,78 @@
 from __future__ import annotations
 
 import copy
-import warnings
 from pathlib import Path
 
 import numpy as np
 
 from ratan_600_data_analyzer.ratan.data_receiver import DataReceiver
-from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz import fast_input
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_demultiplexer import \
+    FastAcquisition1To3GHzBinDemultiplexer
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
     config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_data import \
+    FastAcquisition1To3GHzData
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_flagger import \
+    FastAcquisition1To3GHzFlagger
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_metadata_bin_loader import \
+    FastAcquisition1To3GHzMetadataBinLoader
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_observation import \
     FastAcquisition1To3GHzObservation
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_threads import \
+    FastAcquisition1To3GHzStreamThreads
 from ratan_600_data_analyzer.ratan.ratan_calibrator_factory import RatanCalibratorFactory
 from ratan_600_data_analyzer.ratan.ratan_observation_builder import RatanObservationBuilder
+from ratan_600_data_analyzer.ratan.ratan_pipeline_stage import RatanStageSpec
 from ratan_600_data_analyzer.ratan.ratan_reader_factory import RatanReaderFactory
 
 
 class FastAcquisition1To3GHzBuilder(RatanObservationBuilder):
-    def __init__(self, file: Path):
+
+    """
+        in_place - этапы (remove_spikes, calibrate) изменяют наблюдение на месте, без копий массивов
+        (по умолчанию, bin2fits); наблюдения, полученные build() раньше, изменяются вместе с ним.
+        in_place=False - каждый этап работает с копией: наблюдение предыдущего build() остается исходным.
+        records - записи файла, уже разобранные FastAcquisition1To3GHzBinReader.read_records() (например,
+        FastAcquisition1To3GHzPreflightValidator.validate): полное чтение read() берет их без повторной распаковки,
+        после read() они не хранятся
+    """
+
+    # Разметка собирает данные заново из сырых: после калибровки и усреднения она отбросила бы их результат.
+    # Калибровка берет импульсы генератора по сэмплам полного разрешения и один столбец спокойного Солнца -
+    # только до усреднения по времени
+    STAGES = {
+        'read': RatanStageSpec(provides=('raw_data', 'data'), excludes=('data',)),
+        'remove_spikes': RatanStageSpec(requires=('raw_data',), provides=('spikes_removed',),
+                                        excludes=('spikes_removed', 'calibrated', 'time_downsampled')),
+        'calibrate': RatanStageSpec(requires=('data',), provides=('calibrated',),
+                                    excludes=('calibrated', 'time_downsampled'),
+                                    choices={'method': ('lebedev',)}),
+        'time_downsample': RatanStageSpec(requires=('data',), provides=('time_downsampled',)),
+    }
+
+    def __init__(self, file: Path, in_place: bool = True):
         super().__init__(file)
         self._observation = None
+        self._in_place = in_place
+        self._records = None
+
+    @property
+    def in_place(self) -> bool:
+        return self._in_place
+
+    @in_place.setter
+    def in_place(self, value: bool):
+        self._in_place = value
+
+    @property
+    def records(self) -> FastAcquisition1To3GHzBinDemultiplexer:
+        return self._records
+
+    @records.setter
+    def records(self, value: FastAcquisition1To3GHzBinDemultiplexer):
+        self._records = value
 
     @property
     def receiver(self) -> DataReceiver:
@@ -33,21 +85,50 @@ class FastAcquisition1To3GHzBuilder(RatanObservationBuilder):
     def build(self) -> FastAcquisition1To3GHzObservation:
         return self._observation
 
-    def read(self) -> FastAcquisition1To3GHzBuilder:
+    @staticmethod
+    def default_stages() -> list:
+
+        """
+            Этапы обработки из конфигурации: config.pipeline (набор [pipeline] variant)
+        """
+
+        return config.pipeline
+
+    def resume(self, observation: FastAcquisition1To3GHzObservation) -> FastAcquisition1To3GHzBuilder:
+        self._observation = observation
+        return self
+
+    def read(self, lazy: bool = False, sample_range: tuple[int, int] = None,
+             arcsec_range: tuple[float, float] = None,
+             band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL) -> FastAcquisition1To3GHzBuilder:
+
+        """
+            lazy - данные декодируются при первом обращении (см. FastAcquisition1To3GHzBinReader.read)
+            sample_range, arcsec_range - чтение только части записи (см. FastAcquisition1To3GHzBinReader.read)
+            band - только полоса 1-2 или 2-3 GHz (см. FastAcquisition1To3GHzBinReader.read)
+        """
+
         reader = RatanReaderFactory.create_reader(self._file)
-        observation = reader.read(self._file)
+        records, self._records = self._records, None
+        if sample_range is None and arcsec_range is None and FastAcquisition1To3GHzBand(band) is FastAcquisition1To3GHzBand.FULL:
+            observation = reader.read(self._file, lazy=lazy, records=records)
+        else:
+            observation = reader.read(self._file, lazy=lazy, sample_range=sample_range, arcsec_range=arcsec_range,
+                                      band=band)
 
         self._observation = observation
         return self
 
-    def remove_spikes(self, method: str="kurtosis") -> FastAcquisition1To3GHzBuilder:
+    def remove_spikes(self, method: str="kurtosis",
+                      flagger: FastAcquisition1To3GHzFlagger = None) -> FastAcquisition1To3GHzBuilder:
         """
             Remove spikes and zeros, changing to nan
+
+            flagger - разметка пропущенных значений и куртозиса, по умолчанию FastAcquisition1To3GHzFlagger()
+            с порогами из конфигурации
         """
         if method.lower() == "kurtosis":
-            observation = self._observation
-            pol_chan_raw_data = observation.raw_data.polarization_channels_data
-            kurtosis_data = observation.raw_data.kurtosis_data
+            observation = self._stage_observation()
 
             # original
             # pol_chan_data.c0p0_data[kurtosis_data.c0p0_kurt <= KURT_THRESHOLD] = np.nan
@@ -56,71 +137,109 @@ class FastAcquisition1To3GHzBuilder(RatanObservationBuilder):
             # pol_chan_data.c1p1_data[kurtosis_data.c1p1_kurt <= KURT_THRESHOLD] = np.nan
 
             """
-                kurtosis replace by 1
+                missing values replace by 2, kurtosis replace by 1
             """
-            pol_chan_raw_data.c0p0_data[(kurtosis_data.c0p0_kurt <= config.kurt_threshold)
-                                    & (pol_chan_raw_data.c0p0_data != config.raw_missing_value_replacement)] = config.raw_kurtosis_value_replacement
-            pol_chan_raw_data.c0p1_data[(kurtosis_data.c0p1_kurt <= config.kurt_threshold)
-                                    & (pol_chan_raw_data.c0p1_data != config.raw_missing_value_replacement)] = config.raw_kurtosis_value_replacement
-            pol_chan_raw_data.c1p0_data[(kurtosis_data.c1p0_kurt <= config.kurt_threshold)
-                                    & (pol_chan_raw_data.c1p0_data != config.raw_missing_value_replacement)] = config.raw_kurtosis_value_replacement
-            pol_chan_raw_data.c1p1_data[(kurtosis_data.c1p1_kurt <= config.kurt_threshold)
-                                    & (pol_chan_raw_data.c1p1_data != config.raw_missing_value_replacement)] = config.raw_kurtosis_value_replacement
-
-            joined_channels_0 = np.hstack(
-                (np.fliplr(pol_chan_raw_data.c0p0_data), pol_chan_raw_data.c1p0_data)).T  # 1-3 GHz pol0
-            joined_channels_1 = np.hstack(
-                (np.fliplr(pol_chan_raw_data.c0p1_data), pol_chan_raw_data.c1p1_data)).T  # 1-3 GHz pol1
-
-            fast_acq_data = observation.data
-            fast_acq_data.pol_channel0 = joined_channels_0
-            fast_acq_data.pol_channel1 = joined_channels_1
+            if flagger is None:
+                flagger = FastAcquisition1To3GHzFlagger()
+            flagger.flag(*observation.raw_data.writable_stacked())
+            stacked_raw_data = observation.raw_data.stacked
+
+            # 1-3 GHz pol0, pol1: единственная склейка размеченных потоков, сразу в плоскости куба данных
+            fast_acq_data = FastAcquisition1To3GHzData(observation.data.channel_mapping)
+            shape = (stacked_raw_data.num_frequencies, stacked_raw_data.num_samples)
+            planes = [fast_acq_data.writable(polarization, shape) for polarization in (0, 1)]
+            FastAcquisition1To3GHzStreamThreads.map(
+                lambda polarization: stacked_raw_data.joined(polarization, out=planes[polarization]), (0, 1))
             observation.data = fast_acq_data
-            self._observation = copy.deepcopy(observation)
+            self._observation = observation
             return self
         raise ValueError(f"Spikes removing method {method} not found.")
 
-    # todo
-    # def time_downsample(self, time_reduction_factor: int) -> FastAcquisition1To3GHzBuilder:
-    #
-    #     pol_chan_data = self._observation.data.pol_channels_data
-    #     joined_channels_0 = np.hstack((np.fliplr(pol_chan_data.c0p0_data), pol_chan_data.c1p0_data)).T  # 1-3 GHz pol0
-    #     joined_channels_1 = np.hstack((np.fliplr(pol_chan_data.c0p1_data), pol_chan_data.c1p1_data)).T  # 1-3 GHz pol1
-    #
-    #     pol0_data = self._trim_polarization_array(joined_channels_0, time_reduction_factor = time_reduction_factor)
-    #     pol1_data = self._trim_polarization_array(joined_channels_1, time_reduction_factor = time_reduction_factor)
-    #
-    #     array_3d = np.stack([pol0_data, pol1_data], axis=1)
-    #
-    #     fast_acq_data = FastAcquisition1To3GHzData()
-    #     fast_acq_data.pol_channels_data = pol_chan_data
-    #     fast_acq_data.kurtosis_data = self._data.kurtosis_data
-    #     fast_acq_data.gen_state_data = self._data.gen_state_data
-    #     fast_acq_data.array_3d = array_3d
-    #
-    #     bin_file = self._metadata.bin_file
-    #     fast_acq_metadata = FastAcquisition1To3GHzMetadataBinLoader.load(bin_file, fast_acq_data)
-    #
-    #     self._metadata = fast_acq_metadata
-    #     self._data = fast_acq_data
-    #     return self
+    def time_downsample(self, factor: int) -> FastAcquisition1To3GHzBuilder:
+
+        """
+            Усреднение по времени блоками по factor сэмплов, неполный последний блок отбрасывается.
+            Размеченные отсчеты (пропущенные значения, куртозис) и nan в среднее не входят
+            (_downsample_polarization_array). Метаданные: оси time/arcsec, num_samples, разрешение по времени
+            (FastAcquisition1To3GHzMetadataBinLoader.set_time_reduction)
+        """
+
+        factor = int(factor)
+        if factor < 1:
+            raise ValueError(f"time_downsample(): factor must be >= 1, got {factor}")
+        observation = self._stage_observation()
+        if factor == 1:
+            self._observation = observation
+            return self
+
+        metadata = observation.metadata
+        data = observation.data
+        pol_channels = (data.pol_channel0, data.pol_channel1)
+        num_frequencies, num_samples = pol_channels[0].shape
+        if num_samples < factor:
+            raise ValueError(f"time_downsample(): factor {factor} exceeds {num_samples} samples")
+        if metadata.is_calibrated:
+            missing_value, kurtosis_value = (config.calibr_missing_value_replacement,
+                                             config.calibr_kurtosis_value_replacement)
+        else:
+            missing_value, kurtosis_value = config.raw_missing_value_replacement, config.raw_kurtosis_value_replacement
+
+        fast_acq_data = FastAcquisition1To3GHzData(data.channel_mapping)
+        shape = (num_frequencies, num_samples // factor)
+        planes = [fast_acq_data.writable(polarization, shape) for polarization in (0, 1)]
+        FastAcquisition1To3GHzStreamThreads.map(
+            lambda polarization: self._downsample_polarization_array(
+                pol_channels[polarization], factor, missing_value, kurtosis_value, out=planes[polarization]), (0, 1))
+        observation.data = fast_acq_data
+        FastAcquisition1To3GHzMetadataBinLoader.set_time_reduction(metadata, factor)
+
+        self._observation = observation
+        return self
+
+    def _stage_observation(self) -> FastAcquisition1To3GHzObservation:
+
+        """
+            Наблюдение, изменяемое этапом: текущее (in_place) или его копия
+        """
+
+        if self._in_place:
+            return self._observation
+        return copy.deepcopy(self._observation)
 
     @staticmethod
-    def _trim_polarization_array(pol_array: np.ndarray, time_reduction_factor: int) -> np.ndarray:
-        # Приводит массив к размеру, кратному self.time_reduction_factor, усредняет его по времени и заменяет
-        # возможные nan интерполированными значениями
-
-        n_bands, n_points = np.shape(pol_array)
-        pol_array = pol_array[:, :(n_points // time_reduction_factor) * time_reduction_factor]
-        try:
-            pol_array = pol_array.reshape(n_bands, n_points // time_reduction_factor, -1)
-            with warnings.catch_warnings():
-                warnings.filterwarnings(action='ignore', message='Mean of empty slice')
-                pol_array = np.nanmean(pol_array, axis=2)
-            pol_array = fast_input.replace_nan(pol_array)
-        except ValueError:
-            pol_array = None
-        return pol_array
+    def _downsample_polarization_array(pol_array: np.ndarray, factor: int, missing_value: float,
+                                       kurtosis_value: float, out: np.ndarray = None) -> np.ndarray:
+
+        """
+            Среднее (частота, время) по блокам из factor сэмплов: одно reshape/reduce без копии pol_array.
+            Отсчеты nan, missing_value и kurtosis_value в среднее не входят; блок только из них -
+            missing_value, если оно есть в блоке, иначе kurtosis_value (nan - если блок только из nan)
+        """
+
+        num_frequencies, num_samples = pol_array.shape[0], pol_array.shape[1] // factor
+        blocks = pol_array[:, :num_samples * factor].reshape(num_frequencies, num_samples, factor)
+        missing_value = pol_array.dtype.type(missing_value)
+        kurtosis_value = pol_array.dtype.type(kurtosis_value)
+
+        valid = ~np.isnan(blocks)
+        valid &= blocks != missing_value
+        valid &= blocks != kurtosis_value
+        counts = np.count_nonzero(valid, axis=2)
+        sums = np.sum(blocks, axis=2, where=valid, dtype=np.float64)
+        del valid
+
+        if out is None:
+            out = np.empty((num_frequencies, num_samples), dtype=pol_array.dtype)
+        filled = counts > 0
+        np.divide(sums, counts, out=out, where=filled, casting='same_kind')
+
+        empty = ~filled
+        if empty.any():
+            # Метки - только для блоков без данных, по их отсчетам
+            flagged = blocks[empty]
+            out[empty] = np.where((flagged == missing_value).any(axis=1), missing_value,
+                                  np.where((flagged == kurtosis_value).any(axis=1), kurtosis_value, np.nan))
+        return out
 
     # todo
     # def interpolate_gaps(self, method: str) -> FastAcquisition1To3GHzBuilder:
@@ -168,7 +287,7 @@ class FastAcquisition1To3GHzBuilder(RatanObservationBuilder):
 
     def calibrate(self, method: str) -> FastAcquisition1To3GHzBuilder:
 
-        calibrator = RatanCalibratorFactory.create_calibrator(self._observation, "lebedev")
+        calibrator = RatanCalibratorFactory.create_calibrator(self._stage_observation(), method)
         observation = calibrator.calibrate()
 
         self._observation = observation
@@ -18,6 +18,9 @@ class FastAcquisition1To3GHzCalibratorLebedev(FastAcquisition1To3GHzCalibrator):
         Калибровка, предложенная М.К.Лебедевым и Н.Е.Овчинниковой
     """
 
+    # Отсчеты ниже порога не участвуют в поиске точки спокойного Солнца и калибруются как nan
+    SIGNAL_THRESHOLD = 10
+
     def __init__(self, observation: FastAcquisition1To3GHzObservation):
         super().__init__(observation)
 
@@ -31,14 +34,17 @@ class FastAcquisition1To3GHzCalibratorLebedev(FastAcquisition1To3GHzCalibrator):
             raise ValueError(
                 f"Polarization arrays has different sizes: {lhcp.shape} != {rhcp.shape}. Observation marked as bad.")
 
-        frequency_axis = copy.deepcopy(metadata.coordinate_axes.frequency_axis)
-        time_axis = copy.deepcopy(metadata.coordinate_axes.time_axis)
-        arcsec_axis = copy.deepcopy(metadata.coordinate_axes.arcsec_axis)
+        # Оси и исходные поляризации только читаются (массивы только для чтения), копии не нужны
+        frequency_axis = metadata.coordinate_axes.frequency_axis
+        time_axis = metadata.coordinate_axes.time_axis
+        arcsec_axis = metadata.coordinate_axes.arcsec_axis
 
-        lhcp_orig = copy.deepcopy(lhcp)
-        rhcp_orig = copy.deepcopy(rhcp)
+        lhcp_orig = lhcp
+        rhcp_orig = rhcp
+        lhcp = lhcp.copy()
+        rhcp = rhcp.copy()
 
-        threshold = 10
+        threshold = self.SIGNAL_THRESHOLD
         lhcp[lhcp < threshold] = np.nan
         rhcp[rhcp < threshold] = np.nan
 
@@ -52,6 +58,8 @@ class FastAcquisition1To3GHzCalibratorLebedev(FastAcquisition1To3GHzCalibrator):
         narrowed_time_axis = time_axis[idx]
         narrowed_lhcp = lhcp_interpolated[:, idx]
         narrowed_rhcp = rhcp_interpolated[:, idx]
+        # Полные интерполированные спектрограммы больше не нужны: не держим их до пика памяти (калибровка)
+        del lhcp_interpolated, rhcp_interpolated
 
         # matplotlib.use('TkAgg')  # 'Qt5Agg', 'WxAgg'
         # plt.figure(figsize=(14, 8))
@@ -65,7 +73,7 @@ class FastAcquisition1To3GHzCalibratorLebedev(FastAcquisition1To3GHzCalibrator):
         # plt.tight_layout()
         # plt.show()
 
-        arr = copy.deepcopy(narrowed_lhcp)
+        arr = narrowed_lhcp
         x_scale = copy.deepcopy(narrowed_arcsec_axis)
         avg_scan = np.nansum(arr, axis=0)
 
@@ -79,7 +87,7 @@ class FastAcquisition1To3GHzCalibratorLebedev(FastAcquisition1To3GHzCalibrator):
         suggested_qsp_coord = x_scale[suggested_qsp_idx]
 
         # lhcp
-        arr_lhcp = copy.deepcopy(lhcp[:,idx])
+        arr_lhcp = lhcp[:, idx]
         arr_lhcp = arr_lhcp[:, idx_x_max:idx_x_min]
         avg_scan_lhcp = np.nansum(arr_lhcp, axis=0)
         lhcp_not_nan_indices = np.where(avg_scan_lhcp != 0)[0]
@@ -90,7 +98,7 @@ class FastAcquisition1To3GHzCalibratorLebedev(FastAcquisition1To3GHzCalibrator):
         #print(f"QSP {suggested_qsp}")
 
         # rhcp
-        arr_rhcp = copy.deepcopy(rhcp[:, idx])
+        arr_rhcp = rhcp[:, idx]
         arr_rhcp = arr_rhcp[:, idx_x_max:idx_x_min]
         avg_scan_rhcp = np.nansum(arr_rhcp, axis=0)
         rhcp_not_nan_indices = np.where(avg_scan_rhcp != 0)[0]
@@ -123,32 +131,18 @@ class FastAcquisition1To3GHzCalibratorLebedev(FastAcquisition1To3GHzCalibrator):
         #fp = FLUX_DM
         fp = flux_dm
         # Интерполяция здесь нужна, поскольку таблица значений потоков FLUX_DM есть только для одной сетки частот,
-        # которая может отличаться от использованной в наблюдении - все зависит от усреднения по частотам
-        freq_min = frequency_axis[0]
-        freq_max = frequency_axis[-1]
-        xp = np.linspace(freq_min, freq_max, fp.shape[0])
+        # которая может отличаться от использованной в наблюдении - все зависит от усреднения по частотам.
+        # Таблица задана на 1-3 GHz, наблюдение может содержать только полосу 1-2 или 2-3 GHz
+        xp = np.linspace(config.freq_min, config.freq_max, fp.shape[0])
         interp_flux = np.interp(frequency_axis, xp, fp)
+        # Калиброванные данные пишутся на месте в плоскости куба данных наблюдения (pol_channel0, pol_channel1)
         cal_coeffs0 = interp_flux / lhcp[:, qsp_lhcp_idx]
-        pol0_calibrated = (lhcp.T * cal_coeffs0).T
-        for el in config.filter_bands:
-            idx = (frequency_axis >= el[0]) & (frequency_axis <= el[1])
-            pol0_calibrated[idx] = 0
+        self._apply_coefficients(lhcp, lhcp_orig, cal_coeffs0, frequency_axis, out=data.writable(0))
+        del lhcp_orig
 
         cal_coeffs1 = interp_flux / rhcp[:, qsp_rhcp_idx]
-        pol1_calibrated = (rhcp.T * cal_coeffs1).T
-        for el in config.filter_bands:
-            idx = (frequency_axis >= el[0]) & (frequency_axis <= el[1])
-            pol1_calibrated[idx] = 0
-
-        # todo
-        mask0 = (lhcp_orig == 1) | (lhcp_orig == 2)
-        pol0_calibrated[mask0] = lhcp_orig[mask0] / 100
-
-        mask1 = (rhcp_orig == 1) | (rhcp_orig == 2)
-        pol1_calibrated[mask1] = rhcp_orig[mask1] / 100
-
-        self._observation.data.pol_channel0 = pol0_calibrated
-        self._observation.data.pol_channel1 = pol1_calibrated
+        self._apply_coefficients(rhcp, rhcp_orig, cal_coeffs1, frequency_axis, out=data.writable(1))
+        del rhcp_orig
 
         metadata.is_calibrated = True
         metadata._quiet_sun_point_arcsec = suggested_qsp_coord.value
@@ -497,6 +491,40 @@ class FastAcquisition1To3GHzCalibratorLebedev(FastAcquisition1To3GHzCalibrator):
     #
     #     return self._observation
 
+    @staticmethod
+    def calibrate_array(pol: np.ndarray, cal_coeffs: np.ndarray, frequency_axis: np.ndarray,
+                        out: np.ndarray = None) -> np.ndarray:
+
+        """
+            Калибровка спектрограммы (частота, время) по найденным коэффициентам, как в calibrate():
+            для обработки записи частями (коэффициенты - по окну спокойного Солнца).
+            out - массив для результата, например часть куба записи
+        """
+
+        thresholded = pol.copy()
+        thresholded[thresholded < FastAcquisition1To3GHzCalibratorLebedev.SIGNAL_THRESHOLD] = np.nan
+        return FastAcquisition1To3GHzCalibratorLebedev._apply_coefficients(thresholded, pol, cal_coeffs,
+                                                                           frequency_axis, out=out)
+
+    @staticmethod
+    def _apply_coefficients(pol: np.ndarray, pol_orig: np.ndarray, cal_coeffs: np.ndarray,
+                            frequency_axis: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+
+        """
+            out может совпадать с pol_orig: размеченные значения сохраняются до записи
+        """
+
+        # todo
+        mask = (pol_orig == 1) | (pol_orig == 2)
+        flagged = pol_orig[mask] / 100
+
+        calibrated = np.multiply(pol, cal_coeffs[:, np.newaxis], out=out)
+        for el in config.filter_bands:
+            idx = (frequency_axis >= el[0]) & (frequency_axis <= el[1])
+            calibrated[idx] = 0
+        calibrated[mask] = flagged
+        return calibrated
+
     @staticmethod
     def _val2idx(a, v):
         return np.argmin(np.abs(np.array(a) - v))
@@ -0,0 +1,223 @@
+import copy
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_demultiplexer import \
+    FastAcquisition1To3GHzBinDemultiplexer
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_reader import \
+    FastAcquisition1To3GHzBinReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_flagger import \
+    FastAcquisition1To3GHzFlagger
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_metadata import \
+    FastAcquisition1To3GHzMetadata
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_metadata_bin_loader import \
+    FastAcquisition1To3GHzMetadataBinLoader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_observation import \
+    FastAcquisition1To3GHzObservation
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_decoder import \
+    FastAcquisition1To3GHzStreamDecoder
+
+
+class FastAcquisition1To3GHzChunkedReader(FastAcquisition1To3GHzBinReader):
+
+    """
+        Чтение записи частями по времени, память ограничена размером части, а не длиной записи.
+
+        open() - один проход по заголовкам записей: метаданные всей записи, удаление выбросов
+        и номер каждой записи в файле; read_samples() - полные записи только для сэмплов части.
+        .bin отображается в память (np.memmap), архив (.bin.gz, .bin.xz, ...) предварительно распаковывается во временный .bin
+        в каталоге temp_dir. В памяти остаются только заголовки (cnt, state, номер записи) - 16 байт на кадр
+    """
+
+    # Заголовок, сохраняемый для кадра: номер записи в файле + 1 (0 - кадр отсутствует или удален как выброс)
+    HEADER_DT = np.dtype([('cnt', '<u4'), ('state', '<u4'), ('position', '<u8')])
+
+    def __init__(self, bin_file: Path, band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL,
+                 temp_dir: Path = None):
+        super().__init__()
+        self._bin_file = bin_file
+        self._band = FastAcquisition1To3GHzBand(band)
+        self._temp_dir = temp_dir
+        self._temp_file = None
+        self._records = None
+        self._headers = None
+        self._avg_kurt = None
+        self._metadata = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def metadata(self) -> FastAcquisition1To3GHzMetadata:
+
+        """
+            Метаданные всей записи (без калибровки)
+        """
+
+        return self._metadata
+
+    @property
+    def num_samples(self) -> int:
+        return self._metadata.num_samples
+
+    @property
+    def spectrum_length(self) -> int:
+        return 8192 // 2 ** (self._avg_kurt & 0b111111)
+
+    @property
+    def samples_per_record_boundary(self) -> int:
+
+        """
+            Границы частей кратны этому числу сэмплов (начало части - на границе и записи, и спектра)
+        """
+
+        return max(config.chunk_length // self.spectrum_length, 1)
+
+    @staticmethod
+    def uncompressed_size(file: Path) -> int:
+
+        """
+            Объем записей файла, байт (для архива - FastAcquisition1To3GHzCodecs.uncompressed_size)
+        """
+
+        return FastAcquisition1To3GHzCodecs.uncompressed_size(file)
+
+    @staticmethod
+    def estimated_memory(file: Path) -> int:
+
+        """
+            Оценка пика памяти обработки всей записи сразу (чтение, разметка, калибровка), байт
+        """
+
+        return FastAcquisition1To3GHzChunkedReader.uncompressed_size(file) * config.processing_memory_factor
+
+    def open(self):
+        try:
+            self._open_records()
+            self._read_headers()
+        except Exception as e:
+            self.close()
+            raise RuntimeError(f"open(): {e}") from e
+
+    def close(self):
+        self._records = None
+        self._headers = None
+        if self._temp_file is not None:
+            self._temp_file.unlink(missing_ok=True)
+            self._temp_file = None
+
+    def chunk_samples(self, memory_budget: int) -> int:
+
+        """
+            Количество сэмплов части, обработка которой укладывается в memory_budget байт
+        """
+
+        records_per_sample = 2 * len(self._band.channels) * self.spectrum_length / config.chunk_length
+        bytes_per_sample = records_per_sample * config.dt.itemsize * config.processing_memory_factor
+        boundary = self.samples_per_record_boundary
+        return max(int(memory_budget // bytes_per_sample) // boundary * boundary, boundary)
+
+    def chunks(self, chunk_samples: int):
+
+        """
+            Части записи [start, stop) по chunk_samples сэмплов (кратно samples_per_record_boundary)
+        """
+
+        boundary = self.samples_per_record_boundary
+        chunk_samples = max(chunk_samples // boundary * boundary, boundary)
+        for start in range(0, self.num_samples, chunk_samples):
+            yield start, min(start + chunk_samples, self.num_samples)
+
+    def sample_range(self, arcsec_range: tuple[float, float]) -> tuple[int, int]:
+
+        """
+            Сэмплы [start, stop) окна arcsec_range по оси arcsec записи, с запасом config.partial_read_margin
+        """
+
+        arcsec_axis = self._metadata.coordinate_axes.arcsec_axis
+        low, high = sorted(arcsec_range)
+        inside = np.flatnonzero((arcsec_axis >= low) & (arcsec_axis <= high))
+        if inside.size == 0:
+            raise ValueError(f"sample_range(): no samples in {arcsec_range} arcsec")
+        margin = int(np.ceil(config.partial_read_margin * config.samples_per_second))
+        return max(int(inside[0]) - margin, 0), min(int(inside[-1]) + 1 + margin, self.num_samples)
+
+    def read_samples(self, start: int, stop: int,
+                     flagger: FastAcquisition1To3GHzFlagger = None) -> FastAcquisition1To3GHzObservation:
+
+        """
+            Наблюдение для сэмплов [start, stop) (начало округляется до samples_per_record_boundary),
+            метаданные пересчитаны для части. flagger - разметка данных до склейки
+        """
+
+        spectrum_length = self.spectrum_length
+        start = max(int(start), 0)
+        start -= start % self.samples_per_record_boundary
+        stop = min(max(int(stop), start), self.num_samples)
+        first_record = start * spectrum_length // config.chunk_length
+        stop_record = -(-stop * spectrum_length // config.chunk_length)
+
+        streams = []
+        for headers in self._headers:
+            positions = headers['position'][first_record:stop_record]
+            stream = np.zeros(positions.shape[0], dtype=config.dt)
+            present = positions > 0
+            # Записи части обычно идут в файле подряд, читаются только они
+            stream[present] = self._records[positions[present] - 1]
+            streams.append(stream)
+
+        decoder = FastAcquisition1To3GHzStreamDecoder(self._avg_kurt, *streams, band=self._band)
+        metadata = copy.deepcopy(self._metadata)
+        FastAcquisition1To3GHzMetadataBinLoader.set_sample_window(metadata, start, decoder.num_samples)
+        return self._read_eager(self._bin_file, decoder, metadata, flagger=flagger)
+
+    def _open_records(self):
+        records_file = self._bin_file
+        if FastAcquisition1To3GHzCodecs.is_compressed(self._bin_file):
+            fd, temp_name = tempfile.mkstemp(suffix='.bin', prefix=self._bin_file.name + '.', dir=self._temp_dir)
+            self._temp_file = Path(temp_name)
+            with os.fdopen(fd, 'wb') as f, FastAcquisition1To3GHzCodecs.open(self._bin_file) as archive:
+                shutil.copyfileobj(archive, f, config.read_chunk_records * config.dt.itemsize)
+            records_file = self._temp_file
+        elif self._bin_file.suffixes != ['.bin']:
+            raise ValueError(f"Unsupported file type: '{self._bin_file.name}'.")
+
+        num_records = records_file.stat().st_size // config.dt.itemsize
+        if num_records == 0:
+            raise ValueError(f"No records in '{self._bin_file.name}'")
+        self._records = np.memmap(records_file, dtype=config.dt, mode='r', shape=(num_records,))
+
+    def _read_headers(self):
+        num_records = self._records.shape[0]
+        demultiplexer = FastAcquisition1To3GHzBinDemultiplexer(capacity=num_records // 2, dtype=self.HEADER_DT,
+                                                               band=self._band)
+        step = config.read_chunk_records
+        headers_dt = np.dtype(config.header_dt.descr + [('position', '<u8')])
+        headers = np.empty(step, dtype=headers_dt)
+        for start in range(0, num_records, step):
+            block = self._records[start:start + step]
+            block_headers = headers[:block.shape[0]]
+            for name in config.header_dt.names:
+                block_headers[name] = block[name]
+            block_headers['position'] = np.arange(start + 1, start + 1 + block.shape[0])
+            demultiplexer.add(block_headers)
+        demultiplexer = self._checked(demultiplexer, self._bin_file)
+
+        self._avg_kurt = demultiplexer.avg_kurt
+        self._headers = self._remove_spikes(*demultiplexer.result())
+        header_decoder = self._get_decoder(self._avg_kurt, *self._headers, remove_spikes=False, band=self._band)
+        self._metadata = self._load_metadata(self._bin_file, header_decoder)
@@ -0,0 +1,202 @@
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+try:
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class FastAcquisition1To3GHzCodec:
+
+    """
+        Кодек сжатых записей .bin<suffix>: open(file, mode) - файловый объект (двоичный режим),
+        uncompressed_size(file) - размер распакованных данных, байт, или None, если архив его не хранит
+    """
+
+    def __init__(self, suffix: str, open_file, uncompressed_size=None, is_available=None):
+        self._suffix = suffix
+        self._open_file = open_file
+        self._uncompressed_size = uncompressed_size
+        self._is_available = is_available
+
+    @property
+    def suffix(self) -> str:
+        return self._suffix
+
+    def is_available(self) -> bool:
+        return self._is_available is None or self._is_available()
+
+    def open(self, file: Path, mode: str = 'rb'):
+        return self._open_file(file, mode)
+
+    def uncompressed_size(self, file: Path):
+        return None if self._uncompressed_size is None else self._uncompressed_size(file)
+
+
+class FastAcquisition1To3GHzCodecs:
+
+    """
+        Реестр форматов файлов записи: .bin, сжатые .bin.gz, .bin.xz, .bin.bz2, .bin.zst
+        (при наличии compression.zstd или пакета zstandard) и поколоночный .binc.
+        Сжатые записи распаковываются потоком, без временных файлов; новый кодек добавляется register()
+    """
+
+    BIN_SUFFIX = '.bin'
+    COLUMNAR_SUFFIX = '.binc'
+
+    _codecs = {}
+
+    @staticmethod
+    def register(codec: FastAcquisition1To3GHzCodec):
+        FastAcquisition1To3GHzCodecs._codecs[codec.suffix] = codec
+
+    @staticmethod
+    def codecs() -> list[FastAcquisition1To3GHzCodec]:
+
+        """
+            Доступные кодеки (без недоступных опциональных)
+        """
+
+        return [codec for codec in FastAcquisition1To3GHzCodecs._codecs.values() if codec.is_available()]
+
+    @staticmethod
+    def bin_extensions() -> list[str]:
+
+        """
+            Расширения записей в исходном формате: .bin и сжатые .bin<suffix>
+        """
+
+        return [FastAcquisition1To3GHzCodecs.BIN_SUFFIX] + [FastAcquisition1To3GHzCodecs.BIN_SUFFIX + codec.suffix
+                                                            for codec in FastAcquisition1To3GHzCodecs.codecs()]
+
+    @staticmethod
+    def extensions() -> list[str]:
+        return FastAcquisition1To3GHzCodecs.bin_extensions() + [FastAcquisition1To3GHzCodecs.COLUMNAR_SUFFIX]
+
+    @staticmethod
+    def extension(file: Path):
+
+        """
+            Расширение файла записи (например, '.bin.gz') или None, если формат не поддерживается
+        """
+
+        for extension in sorted(FastAcquisition1To3GHzCodecs.extensions(), key=len, reverse=True):
+            if file.name.endswith(extension) and len(file.name) > len(extension):
+                return extension
+        return None
+
+    @staticmethod
+    def is_supported(file: Path) -> bool:
+        return FastAcquisition1To3GHzCodecs.extension(file) is not None
+
+    @staticmethod
+    def is_bin(file: Path) -> bool:
+        return FastAcquisition1To3GHzCodecs.extension(file) in FastAcquisition1To3GHzCodecs.bin_extensions()
+
+    @staticmethod
+    def codec(file: Path):
+
+        """
+            Кодек сжатой записи или None (.bin, .binc, неподдерживаемый формат)
+        """
+
+        extension = FastAcquisition1To3GHzCodecs.extension(file)
+        if extension is None or extension in (FastAcquisition1To3GHzCodecs.BIN_SUFFIX,
+                                              FastAcquisition1To3GHzCodecs.COLUMNAR_SUFFIX):
+            return None
+        return FastAcquisition1To3GHzCodecs._codecs[extension.removeprefix(FastAcquisition1To3GHzCodecs.BIN_SUFFIX)]
+
+    @staticmethod
+    def is_compressed(file: Path) -> bool:
+        return FastAcquisition1To3GHzCodecs.codec(file) is not None
+
+    @staticmethod
+    def open(file: Path):
+
+        """
+            Записи файла .bin или сжатого .bin<suffix> как двоичный поток
+        """
+
+        codec = FastAcquisition1To3GHzCodecs.codec(file)
+        if codec is not None:
+            return codec.open(file)
+        if FastAcquisition1To3GHzCodecs.extension(file) == FastAcquisition1To3GHzCodecs.BIN_SUFFIX:
+            return open(file, 'rb')
+        raise ValueError(f"Unsupported file type: '{file.name}'.")
+
+    @staticmethod
+    def uncompressed_size(file: Path) -> int:
+
+        """
+            Объем записей файла, байт. Если архив не хранит размер распакованных данных -
+            оценка config.compressed_size_factor * размер архива
+        """
+
+        size = file.stat().st_size
+        codec = FastAcquisition1To3GHzCodecs.codec(file)
+        if codec is None:
+            return size
+        uncompressed_size = codec.uncompressed_size(file)
+        return int(size * config.compressed_size_factor) if uncompressed_size is None else uncompressed_size
+
+    @staticmethod
+    def _gzip_size(file: Path) -> int:
+
+        """
+            По ISIZE (последние 4 байта, размер mod 2^32). Архив меньше 4 ГБ - ISIZE (архив несжимаемых данных
+            может быть больше их размера). Для архива от 4 ГБ добавляются кратные 2^32 до нижней границы размера:
+            архив больше данных лишь на заголовки (блоки по 64 КБ - 5 байт, заголовок файла - до 64 КБ)
+        """
+
+        size = file.stat().st_size
+        with open(file, 'rb') as f:
+            f.seek(-4, 2)
+            isize = int.from_bytes(f.read(4), 'little')
+        if size < 2 ** 32:
+            return isize
+        minimum = size - size // 2 ** 13 - 2 ** 16
+        return isize + max(-(-(minimum - isize) // 2 ** 32), 0) * 2 ** 32
+
+    @staticmethod
+    def _zstd_open(file: Path, mode: str = 'rb'):
+        if zstd is not None:
+            return zstd.open(file, mode)
+        return zstandard.open(file, mode)
+
+    @staticmethod
+    def _zstd_size(file: Path):
+
+        """
+            Размер из заголовка первого кадра (zstd записывает его при сжатии файла), None - не записан
+        """
+
+        with open(file, 'rb') as f:
+            header = f.read(18)
+        try:
+            if zstd is not None:
+                size = zstd.get_frame_info(header).decompressed_size
+            else:
+                size = zstandard.frame_content_size(header)
+        except Exception:
+            return None
+        return None if size is None or size < 0 else size
+
+
+FastAcquisition1To3GHzCodecs.register(FastAcquisition1To3GHzCodec('.gz', gzip.open,
+                                                                  FastAcquisition1To3GHzCodecs._gzip_size))
+FastAcquisition1To3GHzCodecs.register(FastAcquisition1To3GHzCodec('.xz', lzma.open))
+FastAcquisition1To3GHzCodecs.register(FastAcquisition1To3GHzCodec('.bz2', bz2.open))
+FastAcquisition1To3GHzCodecs.register(FastAcquisition1To3GHzCodec('.zst', FastAcquisition1To3GHzCodecs._zstd_open,
+                                                                  FastAcquisition1To3GHzCodecs._zstd_size,
+                                                                  lambda: zstd is not None or zstandard is not None))
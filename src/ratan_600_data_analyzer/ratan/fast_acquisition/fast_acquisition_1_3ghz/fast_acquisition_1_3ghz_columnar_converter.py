@@ -0,0 +1,48 @@
+import shutil
+from pathlib import Path
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_reader import \
+    FastAcquisition1To3GHzBinReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_columnar_file import \
+    FastAcquisition1To3GHzColumnarFile
+
+
+class FastAcquisition1To3GHzColumnarConverter:
+
+    """
+        Перепаковка .bin / сжатых .bin.gz, .bin.xz, ... в поколоночный .binc (FastAcquisition1To3GHzColumnarFile):
+        записи разбираются по потокам один раз, .desc копируется рядом с результатом
+    """
+
+    @staticmethod
+    def output_file(bin_file: Path, output_dir: Path = None) -> Path:
+        base_name = bin_file.name.removesuffix("".join(bin_file.suffixes))
+        directory = bin_file.parent if output_dir is None else output_dir
+        return directory / (base_name + FastAcquisition1To3GHzColumnarFile.SUFFIX)
+
+    @staticmethod
+    def convert(bin_file: Path, output_dir: Path = None, overwrite: bool = False) -> Path:
+        output_file = FastAcquisition1To3GHzColumnarConverter.output_file(bin_file, output_dir)
+        if output_file.exists() and not overwrite:
+            raise FileExistsError(f"'{output_file}' already exists")
+
+        reader = FastAcquisition1To3GHzBinReader()
+        try:
+            demultiplexer = reader._checked(reader._demultiplex_file(bin_file), bin_file)
+        except Exception as e:
+            raise RuntimeError(f"convert(): {e}") from e
+
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = output_file.with_name(output_file.name + '.temp')
+        try:
+            FastAcquisition1To3GHzColumnarFile.write(temp_file, bin_file.name, demultiplexer.avg_kurt,
+                                                     demultiplexer.result())
+            temp_file.replace(output_file)
+        finally:
+            temp_file.unlink(missing_ok=True)
+
+        desc_file = bin_file.with_name(bin_file.name.removesuffix("".join(bin_file.suffixes)) + ".desc")
+        output_desc_file = output_file.with_suffix(".desc")
+        if desc_file.exists() and desc_file.resolve() != output_desc_file.resolve():
+            shutil.copy2(desc_file, output_desc_file)
+        return output_file
@@ -0,0 +1,231 @@
+import json
+import struct
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_demultiplexer import \
+    FastAcquisition1To3GHzBinDemultiplexer
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+
+class FastAcquisition1To3GHzColumnarStreams:
+
+    """
+        Потоки .binc с интерфейсом FastAcquisition1To3GHzBinDemultiplexer (avg_kurt, result(), window_result())
+    """
+
+    def __init__(self, avg_kurt: int, streams: tuple, window_streams: tuple = None):
+        self._avg_kurt = avg_kurt
+        self._streams = streams
+        self._window_streams = window_streams
+
+    @property
+    def avg_kurt(self) -> int:
+        return self._avg_kurt
+
+    def result(self):
+        return self._streams
+
+    def window_result(self):
+        return self._window_streams
+
+
+class FastAcquisition1To3GHzColumnarFile:
+
+    """
+        Поколоночный формат записи (.binc): потоки c0p0, c0p1, c1p0, c1p1 уже разложены по номеру кадра cnt
+        (как FastAcquisition1To3GHzBinDemultiplexer.result(), до удаления выбросов), поля заголовков - отдельными
+        колонками, данные потока - блоками по config.columnar_chunk_records записей. Хранятся только ненулевые
+        записи потока и их номера (positions), нулевые (кадры другой поляризации, пропуски) восстанавливаются.
+        Блок сжимается zlib (config.columnar_compression_level) после перестановки байтов значений по разрядам (shuffle:
+        старшие байты отсчетов и куртозис сжимаются лучше); при уровне 0 блоки хранятся без сжатия.
+        Чтение не требует разбора записей, части записи читаются только из нужных блоков.
+
+        Файл: MAGIC, блоки колонок, оглавление (JSON: смещения и длины блоков), смещение и длина оглавления
+        (2 x uint64 little-endian), MAGIC. .desc остается рядом с файлом (то же имя)
+    """
+
+    MAGIC = b'RATANFC1'
+    FORMAT_VERSION = 1
+    SUFFIX = '.binc'
+
+    def __init__(self, file: Path):
+        self._file = file
+        with open(file, 'rb') as f:
+            if f.read(len(self.MAGIC)) != self.MAGIC:
+                raise ValueError(f"'{file.name}' is not a columnar fast acquisition file")
+            f.seek(-(16 + len(self.MAGIC)), 2)
+            trailer = f.read(16 + len(self.MAGIC))
+            if trailer[16:] != self.MAGIC:
+                raise ValueError(f"'{file.name}' is truncated")
+            offset, length = struct.unpack('<QQ', trailer[:16])
+            f.seek(offset)
+            self._index = json.loads(f.read(length))
+        if self._index['format_version'] != self.FORMAT_VERSION:
+            raise ValueError(f"'{file.name}': unsupported format version {self._index['format_version']}")
+
+    @property
+    def avg_kurt(self) -> int:
+        return self._index['avg_kurt']
+
+    @property
+    def chunk_records(self) -> int:
+        return self._index['chunk_records']
+
+    @property
+    def compression_level(self) -> int:
+        return self._index['compression_level']
+
+    def num_records(self, stream: str) -> int:
+        return self._index['streams'][stream]['num_records']
+
+    def headers(self, stream: str) -> np.ndarray:
+
+        """
+            Заголовки записей потока (config.header_dt)
+        """
+
+        stream_index = self._index['streams'][stream]
+        headers = np.zeros(stream_index['num_records'], dtype=config.header_dt)
+        with open(self._file, 'rb') as f:
+            positions = self._read_block(f, stream_index['positions'], np.dtype(np.int64), self.compression_level)
+            for name in config.header_dt.names:
+                headers[name][positions] = self._read_block(f, stream_index['columns'][name],
+                                                            config.header_dt[name], self.compression_level)
+        return headers
+
+    def records(self, stream: str, start: int = 0, stop: int = None) -> np.ndarray:
+
+        """
+            Записи потока [start, stop) (config.dt); читаются только блоки данных, содержащие их
+        """
+
+        stream_index = self._index['streams'][stream]
+        num_records = stream_index['num_records']
+        stop = num_records if stop is None else min(max(stop, start), num_records)
+        start = min(max(start, 0), stop)
+        records = np.zeros(stop - start, dtype=config.dt)
+        if records.size == 0:
+            return records
+
+        level = self.compression_level
+        chunk_records = self.chunk_records
+        data_dtype = config.dt['data'].base
+        with open(self._file, 'rb') as f:
+            positions = self._read_block(f, stream_index['positions'], np.dtype(np.int64), level)
+            first_stored, stop_stored = np.searchsorted(positions, (start, stop))
+            window_positions = positions[first_stored:stop_stored] - start
+            for name in config.header_dt.names:
+                column = self._read_block(f, stream_index['columns'][name], config.header_dt[name], level)
+                records[name][window_positions] = column[first_stored:stop_stored]
+
+            data = records['data']
+            for chunk in range(first_stored // chunk_records, -(-stop_stored // chunk_records)):
+                chunk_start = chunk * chunk_records
+                values = self._read_block(f, stream_index['data'][chunk], data_dtype, level)
+                values = values.reshape(-1, config.chunk_length)
+                first = max(first_stored, chunk_start)
+                last = min(stop_stored, chunk_start + values.shape[0])
+                data[window_positions[first - first_stored:last - first_stored]] \
+                    = values[first - chunk_start:last - chunk_start]
+        return records
+
+    def first_record(self):
+
+        """
+            Первая запись (для avg_kurt), как FastAcquisition1To3GHzBinReader._read_first_record
+        """
+
+        record = np.zeros(1, dtype=config.dt)
+        record['avg_kurt'] = self.avg_kurt
+        return record[0]
+
+    def demultiplexed(self, dtype: np.dtype = None, window: tuple[int, int] = None,
+                      band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                      ) -> FastAcquisition1To3GHzColumnarStreams:
+
+        """
+            Потоки как после FastAcquisition1To3GHzBinDemultiplexer с теми же параметрами:
+            dtype=config.header_dt - только заголовки, window - дополнительно полные записи кадров окна
+        """
+
+        dtype = config.dt if dtype is None else dtype
+        streams = []
+        window_streams = []
+        for i, stream in enumerate(FastAcquisition1To3GHzBinDemultiplexer.STREAMS):
+            in_band = i // 2 in band.channels
+            if not in_band:
+                streams.append(np.zeros(0, dtype=dtype))
+                window_streams.append(np.zeros(0, dtype=config.dt))
+                continue
+            if dtype == config.dt:
+                streams.append(self.records(stream))
+            else:
+                headers = self.headers(stream)
+                streams.append(headers if dtype == config.header_dt else headers[list(dtype.names)].astype(dtype))
+            if window is not None:
+                window_streams.append(self.records(stream, window[0], window[1]))
+        return FastAcquisition1To3GHzColumnarStreams(self.avg_kurt, tuple(streams),
+                                                     tuple(window_streams) if window is not None else None)
+
+    @staticmethod
+    def write(output_file: Path, source_name: str, avg_kurt: int, streams: tuple):
+
+        """
+            Запись потоков c0p0, c0p1, c1p0, c1p1 (config.dt, разложены по cnt) в output_file
+        """
+
+        chunk_records = config.columnar_chunk_records
+        level = config.columnar_compression_level
+        index = {
+            'format_version': FastAcquisition1To3GHzColumnarFile.FORMAT_VERSION,
+            'source': source_name,
+            'avg_kurt': avg_kurt,
+            'chunk_records': chunk_records,
+            'compression_level': level,
+            'streams': {},
+        }
+        with open(output_file, 'wb') as f:
+            f.write(FastAcquisition1To3GHzColumnarFile.MAGIC)
+
+            def write_block(values: np.ndarray) -> list:
+                values = np.ascontiguousarray(values)
+                if level > 0:
+                    planes = values.view(np.uint8).reshape(-1, values.dtype.itemsize).T
+                    block = zlib.compress(np.ascontiguousarray(planes).tobytes(), level)
+                else:
+                    block = values.tobytes()
+                offset = f.tell()
+                f.write(block)
+                return [offset, len(block)]
+
+            for stream, records in zip(FastAcquisition1To3GHzBinDemultiplexer.STREAMS, streams):
+                # Нулевые записи (кадры другой поляризации, пропуски) не хранятся
+                positions = np.flatnonzero(records.view(np.uint8).reshape(records.shape[0], -1).any(axis=1))
+                index['streams'][stream] = {
+                    'num_records': int(records.shape[0]),
+                    'positions': write_block(positions.astype(np.int64)),
+                    'columns': {name: write_block(records[name][positions]) for name in config.header_dt.names},
+                    'data': [write_block(records['data'][positions[start:start + chunk_records]])
+                             for start in range(0, positions.shape[0], chunk_records)],
+                }
+
+            index_bytes = json.dumps(index).encode()
+            index_offset = f.tell()
+            f.write(index_bytes)
+            f.write(struct.pack('<QQ', index_offset, len(index_bytes)))
+            f.write(FastAcquisition1To3GHzColumnarFile.MAGIC)
+
+    @staticmethod
+    def _read_block(f, location: list, dtype: np.dtype, level: int) -> np.ndarray:
+        offset, length = location
+        f.seek(offset)
+        if level == 0:
+            return np.frombuffer(f.read(length), dtype=dtype)
+        planes = np.frombuffer(zlib.decompress(f.read(length)), dtype=np.uint8).reshape(dtype.itemsize, -1)
+        return np.ascontiguousarray(planes.T).view(dtype).reshape(-1)
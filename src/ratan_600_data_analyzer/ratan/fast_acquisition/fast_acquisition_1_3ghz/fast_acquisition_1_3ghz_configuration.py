@@ -18,6 +18,24 @@ class FastAcquisition1To3GHzConfiguration:
         self._chunk_length = None
         self._polarization_mask = None
         self._dt = None
+        self._header_dt = None
+        self._memory_map = None
+        self._read_chunk_records = None
+        self._gzip_index = None
+        self._gzip_index_spacing = None
+        self._gzip_threads = None
+        self._gzip_index_directory = None
+        self._partial_read_margin = None
+        self._processing_memory_factor = None
+        self._jit_kernels = None
+        self._columnar_chunk_records = None
+        self._columnar_compression_level = None
+        self._compressed_size_factor = None
+        self._preflight_validation = None
+        self._stream_threads = None
+        self._decoded_cache = None
+        self._decoded_cache_directory = None
+        self._decoded_cache_max_size_gb = None
         self._samples_per_second = None
 
         self._kurt_threshold = None
@@ -43,6 +61,9 @@ class FastAcquisition1To3GHzConfiguration:
 
         self._flux_dm_file = None
 
+        self._pipeline_variant = None
+        self._pipeline_variants = None
+
     @classmethod
     def load(cls, config_file: Path) -> 'FastAcquisition1To3GHzConfiguration':
 
@@ -58,6 +79,24 @@ class FastAcquisition1To3GHzConfiguration:
                 instance._chunk_length = bin_data['chunk_length']
                 instance._polarization_mask = bin_data['polarization_mask']
                 instance._dt = np.dtype([tuple(field) for field in bin_data['dt']])
+                instance._header_dt = np.dtype([tuple(field) for field in bin_data['dt'] if field[0] != 'data'])
+                instance._memory_map = bin_data['memory_map']
+                instance._read_chunk_records = bin_data['read_chunk_records']
+                instance._gzip_index = bin_data['gzip_index']
+                instance._gzip_index_spacing = bin_data['gzip_index_spacing']
+                instance._gzip_threads = bin_data['gzip_threads']
+                instance._gzip_index_directory = Path(bin_data['gzip_index_directory']).expanduser()
+                instance._partial_read_margin = bin_data['partial_read_margin']
+                instance._processing_memory_factor = bin_data['processing_memory_factor']
+                instance._jit_kernels = bin_data['jit_kernels']
+                instance._columnar_chunk_records = bin_data['columnar_chunk_records']
+                instance._columnar_compression_level = bin_data['columnar_compression_level']
+                instance._compressed_size_factor = bin_data['compressed_size_factor']
+                instance._preflight_validation = bin_data['preflight_validation']
+                instance._stream_threads = bin_data['stream_threads']
+                instance._decoded_cache = bin_data['decoded_cache']
+                instance._decoded_cache_directory = Path(bin_data['decoded_cache_directory']).expanduser()
+                instance._decoded_cache_max_size_gb = bin_data['decoded_cache_max_size_gb']
 
                 adc = config_data['adc']
                 instance._samples_per_second = adc['clock'] / adc['factor1'] / adc['factor2']
@@ -92,6 +131,12 @@ class FastAcquisition1To3GHzConfiguration:
 
                 filtration = config_data['filtration']
                 instance._filter_bands = filtration['filter_bands']
+
+                pipeline = config_data['pipeline']
+                instance._pipeline_variant = pipeline['variant']
+                instance._pipeline_variants = {name: stages for name, stages in pipeline.items() if name != 'variant'}
+                if instance._pipeline_variant not in instance._pipeline_variants:
+                    raise KeyError(f"pipeline.{instance._pipeline_variant}")
                 return instance
         except FileNotFoundError:
             raise RuntimeError(f"Configuration file not found: {config_file}")
@@ -120,6 +165,81 @@ class FastAcquisition1To3GHzConfiguration:
     def dt(self) -> np.dtype:
         return self._dt
 
+    @property
+    def header_dt(self) -> np.dtype:
+        """
+            Заголовок записи: все поля dt, кроме data
+        """
+        return self._header_dt
+
+    @property
+    def memory_map(self) -> bool:
+        return self._memory_map
+
+    @property
+    def read_chunk_records(self) -> int:
+        return self._read_chunk_records
+
+    @property
+    def gzip_index(self) -> bool:
+        return self._gzip_index
+
+    @property
+    def gzip_index_spacing(self) -> int:
+        return self._gzip_index_spacing
+
+    @property
+    def gzip_threads(self) -> int:
+        return self._gzip_threads
+
+    @property
+    def gzip_index_directory(self) -> Path:
+        return self._gzip_index_directory
+
+    @property
+    def partial_read_margin(self) -> float:
+        return self._partial_read_margin
+
+    @property
+    def processing_memory_factor(self) -> float:
+        return self._processing_memory_factor
+
+    @property
+    def jit_kernels(self) -> bool:
+        return self._jit_kernels
+
+    @property
+    def columnar_chunk_records(self) -> int:
+        return self._columnar_chunk_records
+
+    @property
+    def columnar_compression_level(self) -> int:
+        return self._columnar_compression_level
+
+    @property
+    def compressed_size_factor(self) -> float:
+        return self._compressed_size_factor
+
+    @property
+    def preflight_validation(self) -> bool:
+        return self._preflight_validation
+
+    @property
+    def stream_threads(self) -> int:
+        return self._stream_threads
+
+    @property
+    def decoded_cache(self) -> bool:
+        return self._decoded_cache
+
+    @property
+    def decoded_cache_directory(self) -> Path:
+        return self._decoded_cache_directory
+
+    @property
+    def decoded_cache_max_size_gb(self) -> float:
+        return self._decoded_cache_max_size_gb
+
     @property
     def samples_per_second(self) -> float:
         return self._samples_per_second
@@ -184,6 +304,21 @@ class FastAcquisition1To3GHzConfiguration:
     def flux_dm_file(self) -> np.ndarray:
         return self._flux_dm_file
 
+    @property
+    def pipeline_variant(self) -> str:
+        return self._pipeline_variant
+
+    @property
+    def pipeline_variants(self) -> dict:
+        return self._pipeline_variants
+
+    @property
+    def pipeline(self) -> list:
+        """
+            Этапы обработки набора pipeline_variant: { stage = "<метод построителя>", <параметры> }
+        """
+        return self._pipeline_variants[self._pipeline_variant]
+
 project_root = ProjectInfo().project_root
 CONFIG_FILE = project_root / "src/ratan_600_data_analyzer/ratan/fast_acquisition/fast_acquisition_1_3ghz/config/fast_acquisition_1_3ghz_config.toml"
 config = FastAcquisition1To3GHzConfiguration.load(CONFIG_FILE)
\ No newline at end of file
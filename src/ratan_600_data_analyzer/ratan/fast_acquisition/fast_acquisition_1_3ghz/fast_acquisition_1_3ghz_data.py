@@ -1,34 +1,99 @@
-import copy
-
 import numpy as np
 from ratan_600_data_analyzer.ratan.ratan_observation_data import RatanObservationData
+from ratan_600_data_analyzer.utils.array_utils import ArrayUtils
 
 
 class FastAcquisition1To3GHzData(RatanObservationData):
 
+    """
+        Поляризации хранятся в одном кубе array_3d (частота, поляризация, время), float32, C-порядок -
+        порядок осей записи FITS: поляризация 0 - pol_channel0, 1 - pol_channel1;
+        lhcp/rhcp (pol_channel0/pol_channel1) - представления плоскостей куба.
+
+        Массивы отдаются только для чтения, без копирования (ArrayUtils.read_only). Запись на месте -
+        через writable(), присваивание поляризации копирует массив в куб. Копия контейнера (copy.deepcopy)
+        использует куб совместно до первой записи в любую из копий (copy-on-write)
+    """
+
     def __init__(self, channel_mapping: dict):
         super().__init__()
         self._channel_mapping = channel_mapping
-        self._lhcp = None
-        self._rhcp = None
+        self._array_3d = None
+        self._owns_array_3d = True
+        self._filled = [False, False]
         self._stokes_i = None
         self._stokes_v = None
 
+    def __deepcopy__(self, memo):
+        # Куб становится общим: первая запись в любую из копий его копирует
+        self._owns_array_3d = False
+        return ArrayUtils.share_read_only(self, memo, shared=('_array_3d',))
+
+    @property
+    def array_3d(self):
+
+        """
+            Куб (частота, поляризация, время); None, пока не заданы обе поляризации
+        """
+
+        if self._plane(0) is None or self._plane(1) is None:
+            return None
+        return ArrayUtils.read_only(self._array_3d)
+
+    @array_3d.setter
+    def array_3d(self, array: np.ndarray):
+
+        """
+            Куб (частота, 2, время) целиком: без копирования, если он уже float32 в C-порядке.
+            Массив только для чтения копируется при первой записи
+        """
+
+        if array is None:
+            self._array_3d = None
+            self._filled = [False, False]
+            return
+        if array.ndim != 3 or array.shape[1] != 2:
+            raise ValueError(f"array_3d must be (frequency, 2, time), got {array.shape}")
+        self._array_3d = np.ascontiguousarray(array, dtype=np.float32)
+        self._owns_array_3d = self._array_3d.flags.writeable
+        self._filled = [True, True]
+
+    def writable(self, polarization: int, shape: tuple = None) -> np.ndarray:
+
+        """
+            Плоскость polarization (0 - pol_channel0, 1 - pol_channel1) куба для записи на месте, (частота, время).
+            shape - (частота, время): если куба нет или его размеры другие, создается новый куб
+            (вторая поляризация в нем не задана). Общий с копией контейнера куб предварительно копируется
+        """
+
+        if shape is not None and (self._array_3d is None
+                                  or (self._array_3d.shape[0], self._array_3d.shape[2]) != tuple(shape)):
+            self._array_3d = np.empty((shape[0], 2, shape[1]), dtype=np.float32)
+            self._owns_array_3d = True
+            self._filled = [False, False]
+        elif self._array_3d is None:
+            raise ValueError("writable(): no array_3d, shape is required")
+        elif not self._owns_array_3d:
+            self._array_3d = self._array_3d.copy()
+            self._owns_array_3d = True
+        self._filled[polarization] = True
+        return self._array_3d[:, polarization]
+
     @property
     def lhcp(self):
-        return self._lhcp
+        return self._plane(self._polarization('lhcp'))
 
     @lhcp.setter
     def lhcp(self, array: np.ndarray):
-        self._lhcp = copy.deepcopy(array)
+        self._set_plane(self._polarization('lhcp'), array)
 
     @property
     def rhcp(self):
-        return self._rhcp
+        return self._plane(self._polarization('rhcp'))
 
     @rhcp.setter
     def rhcp(self, array: np.ndarray):
-        self._rhcp = copy.deepcopy(array)
+        self._set_plane(self._polarization('rhcp'), array)
 
     @property
     def stokes_i(self):
@@ -36,7 +101,7 @@ class FastAcquisition1To3GHzData(RatanObservationData):
 
     @stokes_i.setter
     def stokes_i(self, array: np.ndarray):
-        self._stokes_i = copy.deepcopy(array)
+        self._stokes_i = ArrayUtils.read_only(array)
 
     @property
     def stokes_v(self):
@@ -44,7 +109,7 @@ class FastAcquisition1To3GHzData(RatanObservationData):
 
     @stokes_v.setter
     def stokes_v(self, array: np.ndarray):
-        self._stokes_v = copy.deepcopy(array)
+        self._stokes_v = ArrayUtils.read_only(array)
 
     @property
     def pol_channel0(self):
@@ -68,4 +133,25 @@ class FastAcquisition1To3GHzData(RatanObservationData):
 
     @property
     def channel_mapping(self):
-        return self._channel_mapping
\ No newline at end of file
+        return self._channel_mapping
+
+    def _polarization(self, attribute: str) -> int:
+
+        """
+            Номер поляризации в кубе (p0/p1), соответствующий атрибуту lhcp/rhcp
+        """
+
+        if self._channel_mapping['pol_channel0'] == attribute:
+            return 0
+        return 1
+
+    def _plane(self, polarization: int):
+        if self._array_3d is None or not self._filled[polarization]:
+            return None
+        return ArrayUtils.read_only(self._array_3d[:, polarization])
+
+    def _set_plane(self, polarization: int, array: np.ndarray):
+        if array is None:
+            self._filled[polarization] = False
+            return
+        self.writable(polarization, array.shape)[...] = array
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.stacked_streams import \
+    stacked_base
+
+logger = logging.getLogger(__name__)
+
+
+class FastAcquisition1To3GHzDecodedCache:
+
+    """
+        Дисковый кэш декодированных потоков FastAcquisition1To3GHzBinReader.read(): данные, куртозис
+        и состояние потоков c0p0, c0p1, c1p0, c1p1 в .npy (открываются через np.memmap) и metadata.json.
+
+        Ключ записи кэша - путь, размер, mtime файла, выборочный дайджест содержимого (DIGEST_BLOCKS блоков
+        по DIGEST_BLOCK_SIZE байт: начало, середина, конец) и полоса: измененный файл получает новый ключ,
+        старая запись вытесняется.
+        Объем кэша ограничен max_size байт, вытесняются давно не использованные записи (LRU по last_access)
+    """
+
+    FORMAT_VERSION = 1
+    DIGEST_BLOCK_SIZE = 0x100000
+    DIGEST_BLOCKS = 3
+    METADATA_FILE = 'metadata.json'
+
+    def __init__(self, directory: Path = None, max_size: int = None):
+        self._directory = Path(config.decoded_cache_directory if directory is None else directory).expanduser()
+        self._max_size = int(config.decoded_cache_max_size_gb * 1024 ** 3) if max_size is None else max_size
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def key(self, bin_file: Path, band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL) -> str:
+        stat = bin_file.stat()
+        identity = hashlib.blake2b(digest_size=16)
+        identity.update(f"{self.FORMAT_VERSION}|{bin_file.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|"
+                        f"{FastAcquisition1To3GHzBand(band).value}|".encode())
+        identity.update(self._content_digest(bin_file, stat.st_size))
+        return identity.hexdigest()
+
+    def load(self, bin_file: Path, band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL):
+
+        """
+            (data, kurtosis, state) - словари потоков, массивы открыты через np.memmap в режиме copy-on-write
+            (изменения не попадают в кэш), или None, если записи нет
+        """
+
+        entry = self._directory / self.key(bin_file, band)
+        try:
+            with open(entry / self.METADATA_FILE) as f:
+                metadata = json.load(f)
+            result = tuple({stream: self._load_stream(entry, location) for stream, location in streams.items()}
+                           for streams in (metadata['data'], metadata['kurtosis'], metadata['state']))
+        except (OSError, ValueError, KeyError):
+            # Записи нет, она неполна или вытесняется другим процессом
+            return None
+
+        metadata['last_access'] = time.time()
+        try:
+            self._write_metadata(entry, metadata)
+        except OSError:
+            # Кэш только для чтения: запись используется без обновления last_access
+            pass
+        return result
+
+    def store(self, bin_file: Path, band: FastAcquisition1To3GHzBand, data: dict, kurtosis: dict, state: dict):
+
+        """
+            Сохранение потоков read(): data, kurtosis - словари (время, частота) по потокам
+            (срезы общего массива сохраняются одним файлом), state - (время,).
+            Запись, не помещающаяся в max_size, не сохраняется. Кэш не обязателен: ошибка записи (OSError) -
+            предупреждение, запись не сохраняется
+        """
+
+        size = sum(array.nbytes for streams in (data, kurtosis, state) for array in streams.values())
+        if size > self._max_size:
+            return
+        try:
+            self._store(bin_file, band, size, data, kurtosis, state)
+        except OSError as e:
+            logger.warning(f"[{bin_file.name}] decoded cache entry is not saved to '{self._directory}': {e}")
+
+    def _store(self, bin_file: Path, band: FastAcquisition1To3GHzBand, size: int, data: dict, kurtosis: dict,
+               state: dict):
+        key = self.key(bin_file, band)
+        entry = self._directory / key
+        if entry.exists():
+            return
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._evict(self._max_size - size)
+        temp_entry = Path(tempfile.mkdtemp(prefix=f'.{key}.', dir=self._directory))
+        try:
+            metadata = {
+                'format_version': self.FORMAT_VERSION,
+                'bin_file': str(bin_file.resolve()),
+                'band': FastAcquisition1To3GHzBand(band).value,
+                'size': size,
+                'created': time.time(),
+                'last_access': time.time(),
+                'data': self._save_streams(temp_entry, 'data', data),
+                'kurtosis': self._save_streams(temp_entry, 'kurtosis', kurtosis),
+                'state': self._save_streams(temp_entry, 'state', state),
+            }
+            self._write_metadata(temp_entry, metadata)
+            # Запись появляется целиком; при одновременной записи другим процессом остается одна
+            os.rename(temp_entry, entry)
+        except OSError:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            raise
+
+    def clear(self):
+        for entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def _evict(self, limit: int):
+
+        """
+            Удаление давно не использованных записей, пока объем кэша больше limit
+        """
+
+        entries = []
+        for entry in self._entries():
+            try:
+                with open(entry / self.METADATA_FILE) as f:
+                    metadata = json.load(f)
+                entries.append((metadata['last_access'], metadata['size'], entry))
+            except (OSError, ValueError, KeyError):
+                entries.append((0, sum(f.stat().st_size for f in entry.iterdir()), entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= limit:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def _entries(self):
+        if not self._directory.exists():
+            return []
+        return [entry for entry in self._directory.iterdir() if entry.is_dir() and not entry.name.startswith('.')]
+
+    def _content_digest(self, bin_file: Path, size: int) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        block_size = self.DIGEST_BLOCK_SIZE
+        offsets = sorted({max(min(i * (size - block_size) // max(self.DIGEST_BLOCKS - 1, 1), size - block_size), 0)
+                          for i in range(self.DIGEST_BLOCKS)})
+        with open(bin_file, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                digest.update(f.read(block_size))
+        return digest.digest()
+
+    @staticmethod
+    def _save_streams(entry: Path, name: str, streams: dict) -> dict:
+
+        """
+            Потоки - срезы общего массива сохраняются одним файлом <name>.npy, остальные - <name>_<поток>.npy;
+            возвращает расположение потоков: [файл, номер среза или None]
+        """
+
+        locations = {}
+        non_empty = [stream for stream, array in streams.items() if array.size > 0]
+        base = stacked_base([streams[stream] for stream in non_empty])
+        if base is not None:
+            np.save(entry / f'{name}.npy', base)
+            locations.update({stream: [f'{name}.npy', i] for i, stream in enumerate(non_empty)})
+        for stream, array in streams.items():
+            if stream not in locations:
+                np.save(entry / f'{name}_{stream}.npy', array)
+                locations[stream] = [f'{name}_{stream}.npy', None]
+        return locations
+
+    @staticmethod
+    def _load_stream(entry: Path, location: list) -> np.ndarray:
+        file_name, index = location
+        array = np.load(entry / file_name, mmap_mode='c')
+        return array if index is None else array[index]
+
+    @staticmethod
+    def _write_metadata(entry: Path, metadata: dict):
+        temp_file = entry / f'.{FastAcquisition1To3GHzDecodedCache.METADATA_FILE}.{os.getpid()}'
+        with open(temp_file, 'w') as f:
+            json.dump(metadata, f, indent=1)
+        os.replace(temp_file, entry / FastAcquisition1To3GHzDecodedCache.METADATA_FILE)
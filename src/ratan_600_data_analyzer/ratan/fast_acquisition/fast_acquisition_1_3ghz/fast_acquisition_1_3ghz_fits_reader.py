@@ -25,7 +25,7 @@ class FastAcquisition1To3GHzFitsReader(ObservationReader):
             with fits.open(file) as hdul:
                 header = copy.deepcopy(hdul[0].header)
                 header2 = copy.deepcopy(hdul[1].data)
-                data = copy.deepcopy(hdul[0].data.astype(np.float32))
+                data = hdul[0].data.astype(np.float32)
         except (FileNotFoundError, OSError, ValueError) as e:
             message = f"Error while reading file: {file}"
             logger.exception(f"{message}")
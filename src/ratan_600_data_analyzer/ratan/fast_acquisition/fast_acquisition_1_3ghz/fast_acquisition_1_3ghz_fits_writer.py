@@ -5,6 +5,8 @@ from astropy.io import fits
 
 from ratan_600_data_analyzer.common.project_info import ProjectInfo
 from ratan_600_data_analyzer.ratan.data_receiver import DataReceiver
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_observation import \
     FastAcquisition1To3GHzObservation
 from ratan_600_data_analyzer.ratan.ratan_observation_writer import RatanObservationWriter
@@ -20,9 +22,15 @@ class FastAcquisition1To3GHzFitsWriter(RatanObservationWriter):
         return (data_receiver == DataReceiver.FAST_ACQUISITION_1_3GHZ
                 and file_type.lower() == ".fits")
 
-    def write(self, output_file: Path, overwrite: bool = False):
+    def write(self, output_file: Path, overwrite: bool = False, data_cube: np.ndarray = None,
+              tile_shape: tuple = None):
 
         """
+            Сжимается куб данных наблюдения array_3d (частота, поляризация, время) без копирования;
+            data_cube - готовый куб вместо данных наблюдения
+            (например, np.memmap при обработке записи частями); tile_shape - плитки сжатия,
+            по умолчанию калиброванные данные сжимаются одной плиткой (весь куб)
+
             Комментарий: по стандарту FITS имя параметра в шапке не должно быть более 8 символов.
 
             Пример новой шапки
@@ -61,7 +69,10 @@ class FastAcquisition1To3GHzFitsWriter(RatanObservationWriter):
 
         metadata = self.observation.metadata
         data = self.observation.data
-        data_cube = np.stack([data.pol_channel0, data.pol_channel1], axis=1)
+        if data_cube is None:
+            data_cube = data.array_3d
+            if data_cube is None:
+                raise ValueError("write(): observation has no data for both polarization channels")
         #axes = [Axis.FREQUENCY, Axis.POLARIZATION, Axis.SAMPLE]
 
         parent_dir = output_file.parent
@@ -92,8 +103,9 @@ class FastAcquisition1To3GHzFitsWriter(RatanObservationWriter):
             np.float64	-64
         """
         if metadata.is_calibrated:
-            tile_shape = data_cube.shape # tile as entire image, slightly better accuracy
-            compressed_hdu = fits.CompImageHDU(data=data_cube.astype(np.float32),
+            if tile_shape is None:
+                tile_shape = data_cube.shape # tile as entire image, slightly better accuracy
+            compressed_hdu = fits.CompImageHDU(data=data_cube.astype(np.float32, copy=False),
                                                compression_type='GZIP_2',
                                                quantize_level=128,
                                                tile_shape=tile_shape)
@@ -118,7 +130,8 @@ class FastAcquisition1To3GHzFitsWriter(RatanObservationWriter):
 
         header["TELESCOP"] = metadata.telescope
         header["ORIGIN"] = DataReceiver.FAST_ACQUISITION_1_3GHZ.value
-        header["BAND"] = "1-3 GHz"
+        band = FastAcquisition1To3GHzBand.FULL if metadata.band is None else metadata.band
+        header["BAND"] = band.value
         header['DATE-OBS'] = metadata.datetime_culmination_feed_horn_local.strftime('%Y-%m-%d')
         header["TIME-OBS"] = metadata.datetime_culmination_feed_horn_local.strftime('%H:%M:%S')
 
@@ -164,6 +177,8 @@ class FastAcquisition1To3GHzFitsWriter(RatanObservationWriter):
         header['REF_SAMP'] = (metadata.ref_sample, f"Reference sample culm")
 
         header['DTIME'] = (metadata.time_resolution, "Sampling time resolution, s")
+        if metadata.time_reduction_factor is not None:
+            header['TREDUCT'] = (metadata.time_reduction_factor, "Time reduction factor, samples")
         header['DACTIME'] = (metadata.switch_polarization_time, "Actual time resolution, s")
         header['DFREQ'] = (metadata.frequency_resolution, "Frequency resolution, MHz")
 
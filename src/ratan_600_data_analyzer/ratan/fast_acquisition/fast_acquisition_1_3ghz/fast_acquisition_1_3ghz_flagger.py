@@ -0,0 +1,95 @@
+from typing import Sequence, Union
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_threads import \
+    FastAcquisition1To3GHzStreamThreads
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.stacked_streams import \
+    stacked_base
+
+
+class FastAcquisition1To3GHzFlagger:
+
+    """
+        Разметка отсчетов спектров потоков c0p0, c0p1, c1p0, c1p1 на месте, за один проход по данным:
+        пропущенные значения (0) -> missing_value,
+        куртозис <= kurt_threshold (кроме пропущенных значений) -> kurtosis_value.
+
+        Потоки - один массив (поток, время, частота) или последовательность массивов (время, частота).
+        Обрабатываются блоками по времени, маски - только на блок (заранее выделенные буферы);
+        потоки размечаются параллельно (FastAcquisition1To3GHzStreamThreads)
+    """
+
+    # Отсчетов на поток в блоке разметки: маски блока остаются в кэше
+    FLAG_BLOCK_VALUES = 0x10000
+
+    def __init__(self, kurt_threshold: int = None, missing_value: float = None, kurtosis_value: float = None):
+        self._kurt_threshold = config.kurt_threshold if kurt_threshold is None else kurt_threshold
+        self._missing_value = config.raw_missing_value_replacement if missing_value is None else missing_value
+        self._kurtosis_value = config.raw_kurtosis_value_replacement if kurtosis_value is None else kurtosis_value
+
+    @property
+    def kurt_threshold(self) -> int:
+        return self._kurt_threshold
+
+    @property
+    def missing_value(self) -> float:
+        return self._missing_value
+
+    @property
+    def kurtosis_value(self) -> float:
+        return self._kurtosis_value
+
+    def flag(self, data: Union[np.ndarray, Sequence[np.ndarray]],
+             kurtosis: Union[np.ndarray, Sequence[np.ndarray]]):
+
+        """
+            data, kurtosis - (поток, время, частота) или потоки (время, частота) одинаковой формы попарно;
+            data изменяется на месте, пустые потоки (вне полосы) пропускаются
+        """
+
+        if isinstance(data, np.ndarray) and data.ndim == 3:
+            self._flag_stacked(data, kurtosis)
+            return
+        if len(data) != len(kurtosis):
+            raise ValueError(f"flag(): {len(data)} data streams, {len(kurtosis)} kurtosis streams")
+        stacked_data, stacked_kurtosis = stacked_base(data), stacked_base(kurtosis)
+        if stacked_data is not None and stacked_kurtosis is not None:
+            # Потоки - срезы общих массивов (FastAcquisition1To3GHzBinReader)
+            self._flag_stacked(stacked_data, stacked_kurtosis)
+            return
+        for stream_data, stream_kurtosis in zip(data, kurtosis):
+            self._flag_stacked(stream_data[np.newaxis], stream_kurtosis[np.newaxis])
+
+    def _flag_stacked(self, data: np.ndarray, kurtosis: np.ndarray):
+        if data.shape != kurtosis.shape:
+            raise ValueError(f"flag(): data {data.shape} and kurtosis {kurtosis.shape} shapes differ")
+        if data.size == 0:
+            return
+        if data.shape[0] > 1 and FastAcquisition1To3GHzStreamThreads.num_threads() > 1:
+            FastAcquisition1To3GHzStreamThreads.map(lambda i: self._flag_blocks(data[i:i + 1], kurtosis[i:i + 1]),
+                                                    range(data.shape[0]))
+            return
+        self._flag_blocks(data, kurtosis)
+
+    def _flag_blocks(self, data: np.ndarray, kurtosis: np.ndarray):
+        num_streams, num_samples, num_values = data.shape
+
+        step = max(self.FLAG_BLOCK_VALUES // num_values, 1)
+        flagged = np.empty((num_streams, min(step, num_samples), num_values), dtype=bool)
+        not_missing = np.empty_like(flagged)
+        for start in range(0, num_samples, step):
+            stop = min(start + step, num_samples)
+            block_data = data[:, start:stop]
+            block_flagged = flagged[:, :stop - start]
+            block_not_missing = not_missing[:, :stop - start]
+
+            np.equal(block_data, 0, out=block_flagged)
+            np.copyto(block_data, self._missing_value, where=block_flagged)
+
+            np.less_equal(kurtosis[:, start:stop], self._kurt_threshold, out=block_flagged)
+            np.not_equal(block_data, self._missing_value, out=block_not_missing)
+            np.logical_and(block_flagged, block_not_missing, out=block_flagged)
+            np.copyto(block_data, self._kurtosis_value, where=block_flagged)
@@ -0,0 +1,128 @@
+import hashlib
+import io
+import logging
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+try:
+    import indexed_gzip
+except ImportError:
+    indexed_gzip = None
+
+logger = logging.getLogger(__name__)
+
+
+class FastAcquisition1To3GHzGzipIndex:
+
+    """
+        Индекс точек доступа (zran) для .bin.gz, позволяет читать произвольный диапазон записей
+        без распаковки архива с начала. Индекс хранится в каталоге config.gzip_index_directory
+        (<name>.bin.<хэш пути архива>.gzidx), каталог архива не изменяется
+
+        Каждый поток использует собственный IndexedGzipFile, распаковка (zlib) идет без GIL
+    """
+
+    def __init__(self, bin_file: Path, directory: Path = None):
+        self._bin_file = bin_file
+        self._index_file = self.index_file(bin_file, directory)
+        self._uncompressed_size = None
+        self._local = threading.local()
+        self._opened = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_available() -> bool:
+        return indexed_gzip is not None
+
+    @staticmethod
+    def index_file(bin_file: Path, directory: Path = None) -> Path:
+        directory = Path(config.gzip_index_directory if directory is None else directory).expanduser()
+        path_hash = hashlib.blake2b(str(bin_file.resolve()).encode(), digest_size=8).hexdigest()
+        return directory / f'{bin_file.name}.{path_hash}.gzidx'
+
+    @property
+    def is_up_to_date(self) -> bool:
+        return (self._index_file.exists()
+                and self._index_file.stat().st_mtime >= self._bin_file.stat().st_mtime)
+
+    def remove(self):
+        self._index_file.unlink(missing_ok=True)
+
+    @property
+    def num_records(self) -> int:
+        if self._uncompressed_size is None:
+            self._uncompressed_size = self._file().seek(0, io.SEEK_END)
+        return self._uncompressed_size // config.dt.itemsize
+
+    def open_sequential(self):
+
+        """
+            Файл для последовательного чтения с начала; точки доступа добавляются по мере распаковки,
+            после чтения индекс сохраняется методом export()
+        """
+
+        f = indexed_gzip.IndexedGzipFile(str(self._bin_file), spacing=config.gzip_index_spacing)
+        with self._lock:
+            self._opened.append(f)
+        return f
+
+    def export(self, f):
+
+        """
+            Сохранение индекса после полного чтения архива. Индекс без точек доступа, кроме начальной
+            (архив меньше config.gzip_index_spacing), не сохраняется; ошибка записи - предупреждение
+        """
+
+        if len(list(f.seek_points())) < 2:
+            return
+        try:
+            self._index_file.parent.mkdir(parents=True, exist_ok=True)
+            f.export_index(str(self._index_file))
+        except OSError as e:
+            logger.warning(f"gzip index for '{self._bin_file.name}' is not saved: {e}")
+            self.remove()
+
+    def read_records(self, start: int, stop: int) -> np.ndarray:
+
+        """
+            Записи [start, stop) архива
+        """
+
+        f = self._file()
+        records = np.empty(stop - start, dtype=config.dt)
+        buffer = memoryview(records.view(np.uint8))
+        f.seek(start * config.dt.itemsize)
+        filled = 0
+        while filled < buffer.nbytes:
+            n = f.readinto(buffer[filled:])
+            if n == 0:
+                break
+            filled += n
+        return records[:filled // config.dt.itemsize]
+
+    def close(self):
+        with self._lock:
+            for f in self._opened:
+                f.close()
+            self._opened.clear()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _file(self):
+        f = getattr(self._local, 'file', None)
+        if f is None:
+            f = indexed_gzip.IndexedGzipFile(str(self._bin_file), index_file=str(self._index_file))
+            self._local.file = f
+            with self._lock:
+                self._opened.append(f)
+        return f
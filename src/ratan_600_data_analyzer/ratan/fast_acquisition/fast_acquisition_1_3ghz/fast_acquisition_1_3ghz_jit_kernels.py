@@ -0,0 +1,175 @@
+import contextlib
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _jit(function):
+    # Без numba функции остаются обычными (не вызываются, см. is_enabled())
+    return numba.njit(cache=True, nogil=True)(function) if numba is not None else function
+
+
+_DATA_MASK = np.uint64(0x7FFFFFFFFFFFFF)
+_KURTOSIS_SHIFT = np.uint64(55)
+
+
+@_jit
+def _stream_max_cnt(cnt, state, channel, polarization_mask, max_cnt):
+    for j in range(cnt.shape[0]):
+        i = (2 if channel[j] != 0 else 0) + (1 if (state[j] & polarization_mask) != 0 else 0)
+        if cnt[j] > max_cnt[i]:
+            max_cnt[i] = cnt[j]
+
+
+@_jit
+def _scatter(cnt, state, channel, polarization_mask, raw, streams, in_band):
+    for j in range(cnt.shape[0]):
+        i = (2 if channel[j] != 0 else 0) + (1 if (state[j] & polarization_mask) != 0 else 0)
+        if in_band[i]:
+            streams[i][cnt[j], :] = raw[j, :]
+
+
+@_jit
+def _remove_spikes(a_cnt, b_cnt, a_raw, b_raw, shift):
+    n = a_cnt.shape[0]
+    # Маски по исходным cnt обоих потоков до обнуления (np.roll(cnt > 0, shift))
+    spike_a = np.empty(n, dtype=np.bool_)
+    spike_b = np.empty(n, dtype=np.bool_)
+    for k in range(n):
+        spike_a[k] = a_cnt[(k - shift) % n] > 0
+        spike_b[k] = b_cnt[(k - shift) % n] > 0
+    for k in range(n):
+        if spike_b[k]:
+            a_raw[k, :] = 0
+        if spike_a[k]:
+            b_raw[k, :] = 0
+
+
+@_jit
+def _decode(values, record_state, data, kurtosis, state, missing_value,
+            decode_data, decode_kurtosis, decode_state, replace_missing):
+    for r in range(values.shape[0]):
+        for k in range(values.shape[1]):
+            value = values[r, k]
+            if decode_data:
+                sample = value & _DATA_MASK
+                if replace_missing and sample == 0:
+                    data[r, k] = missing_value
+                else:
+                    data[r, k] = sample
+            if decode_kurtosis:
+                kurtosis[r, k] = value >> _KURTOSIS_SHIFT
+            if decode_state:
+                state[r, k] = record_state[r]
+
+
+class FastAcquisition1To3GHzJitKernels:
+
+    """
+        JIT-ядра (numba) разбора и декодирования записей fast_input.dt: один цикл по записям
+        без промежуточных массивов. Результат совпадает с NumPy-реализацией побайтно
+        (FastAcquisition1To3GHzBinDemultiplexer, FastAcquisition1To3GHzBinReader._remove_spikes,
+        FastAcquisition1To3GHzStreamDecoder.decode_records).
+
+        Используются при config.jit_kernels и установленном numba, иначе - NumPy.
+        Записи передаются C-непрерывными массивами (копируются побайтно)
+    """
+
+    _disabled = False
+
+    @staticmethod
+    def is_available() -> bool:
+        return numba is not None
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return (config.jit_kernels and FastAcquisition1To3GHzJitKernels.is_available()
+                and not FastAcquisition1To3GHzJitKernels._disabled)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def numpy_fallback():
+
+        """
+            Временное отключение JIT-ядер, например для сравнения с NumPy-реализацией
+        """
+
+        disabled = FastAcquisition1To3GHzJitKernels._disabled
+        FastAcquisition1To3GHzJitKernels._disabled = True
+        try:
+            yield
+        finally:
+            FastAcquisition1To3GHzJitKernels._disabled = disabled
+
+    @staticmethod
+    def stream_max_cnt(records: np.ndarray) -> np.ndarray:
+
+        """
+            Наибольший cnt записей каждого потока (номер 2 * channel + polarization), -1 - записей потока нет
+        """
+
+        max_cnt = np.full(4, -1, dtype=np.int64)
+        _stream_max_cnt(np.asarray(records['cnt']), np.asarray(records['state']), np.asarray(records['channel']),
+                        np.uint32(config.polarization_mask), max_cnt)
+        return max_cnt
+
+    @staticmethod
+    def scatter(records: np.ndarray, streams: list, stream_numbers: list):
+
+        """
+            Запись records в потоки streams по номеру потока и cnt (streams[i][cnt] = record);
+            потоки stream_numbers должны вмещать наибольший cnt (stream_max_cnt), остальные пропускаются
+        """
+
+        in_band = np.array([i in stream_numbers for i in range(len(streams))])
+        raw_streams = tuple(FastAcquisition1To3GHzJitKernels._raw(stream) for stream in streams)
+        _scatter(np.asarray(records['cnt']), np.asarray(records['state']), np.asarray(records['channel']),
+                 np.uint32(config.polarization_mask), FastAcquisition1To3GHzJitKernels._raw(records), raw_streams,
+                 in_band)
+
+    @staticmethod
+    def remove_spikes(a: np.ndarray, b: np.ndarray, shift: int = -4):
+
+        """
+            a[np.roll(b['cnt'] > 0, shift)] = 0, b[np.roll(a['cnt'] > 0, shift)] = 0 на месте
+        """
+
+        _remove_spikes(np.asarray(a['cnt']), np.asarray(b['cnt']), FastAcquisition1To3GHzJitKernels._raw(a),
+                       FastAcquisition1To3GHzJitKernels._raw(b), shift)
+
+    @staticmethod
+    def decode_records(records: np.ndarray, data: np.ndarray = None, kurtosis: np.ndarray = None,
+                       state: np.ndarray = None, missing_value: float = None):
+
+        """
+            См. FastAcquisition1To3GHzStreamDecoder.decode_records; выходные массивы - (записи, chunk_length)
+        """
+
+        _decode(np.asarray(records['data']), np.asarray(records['state']),
+                FastAcquisition1To3GHzJitKernels._output(data, np.float32),
+                FastAcquisition1To3GHzJitKernels._output(kurtosis, np.uint16),
+                FastAcquisition1To3GHzJitKernels._output(state, np.uint32),
+                0.0 if missing_value is None else missing_value,
+                data is not None, kurtosis is not None, state is not None, missing_value is not None)
+
+    @staticmethod
+    def is_contiguous(*arrays: np.ndarray) -> bool:
+        return all(array.flags.c_contiguous for array in arrays)
+
+    @staticmethod
+    def _raw(records: np.ndarray) -> np.ndarray:
+        # Записи как строки слов: копирование по 8 байт, если размер записи кратен 8
+        word = np.dtype(np.uint64 if records.dtype.itemsize % 8 == 0 else np.uint8)
+        return np.asarray(records).view(word).reshape(records.shape[0], records.dtype.itemsize // word.itemsize)
+
+    @staticmethod
+    def _output(output: np.ndarray, dtype) -> np.ndarray:
+        # Невычисляемый выход - пустой массив (numba не принимает None вместо массива)
+        return np.empty((0, 0), dtype=dtype) if output is None else np.asarray(output)
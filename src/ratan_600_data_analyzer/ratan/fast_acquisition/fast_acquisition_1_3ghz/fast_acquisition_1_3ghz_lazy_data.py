@@ -0,0 +1,32 @@
+from typing import Union
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_data import \
+    FastAcquisition1To3GHzData
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_decoder import \
+    FastAcquisition1To3GHzStreamDecoder
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.fast_acquisition_1_3ghz_stacked_raw_data import \
+    FastAcquisition1To3GHzStackedRawData
+
+
+class FastAcquisition1To3GHzLazyData(FastAcquisition1To3GHzData):
+
+    """
+        lhcp/rhcp склеиваются из потоков в плоскость куба при первом обращении, только запрошенная
+        поляризация: source - декодер (потоки декодируются при склейке) или уже декодированные сырые данные
+    """
+
+    def __init__(self, channel_mapping: dict,
+                 source: Union[FastAcquisition1To3GHzStreamDecoder, FastAcquisition1To3GHzStackedRawData]):
+        super().__init__(channel_mapping)
+        self._source = source
+
+    def _plane(self, polarization: int):
+        if not self._filled[polarization] and self._source is not None:
+            shape = (self._source.num_frequencies, self._source.num_samples)
+            out = self.writable(polarization, shape)
+            try:
+                self._source.joined(polarization, out=out)
+            except Exception:
+                self._filled[polarization] = False
+                raise
+        return super()._plane(polarization)
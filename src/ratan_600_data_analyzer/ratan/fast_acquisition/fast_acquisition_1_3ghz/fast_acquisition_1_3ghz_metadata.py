@@ -126,6 +126,7 @@ class FastAcquisition1To3GHzMetadata(RatanObservationMetadata):
         self._coordinate_axes = None
         self._num_samples = None  # количество временных отсчетов
         self._num_frequencies = None  # spectrum_length
+        self._band = None  # FastAcquisition1To3GHzBand, None - 1-3 GHz
         self._ref_time = None
         self._ref_sample = None
 
@@ -644,6 +645,14 @@ class FastAcquisition1To3GHzMetadata(RatanObservationMetadata):
     def num_frequencies(self, value):
         self._num_frequencies = value
 
+    @property
+    def band(self):
+        return self._band
+
+    @band.setter
+    def band(self, value):
+        self._band = value
+
     @property
     def frequency_resolution(self):
         return self._frequency_resolution
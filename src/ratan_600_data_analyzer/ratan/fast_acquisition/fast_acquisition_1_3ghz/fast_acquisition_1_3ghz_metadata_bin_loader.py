@@ -15,6 +15,10 @@ from astropy.time import Time
 from ratan_600_data_analyzer.ratan.coordinate_axes import CoordinateAxes
 from ratan_600_data_analyzer.ratan.data_receiver import DataReceiver
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.desc_reader import DescReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
     config
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_data import \
@@ -33,7 +37,43 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
 
     @staticmethod
     def load(bin_file: Path, fast_acq_data: FastAcquisition1To3GHzData,
-             fast_acq_raw_data: FastAcquisition1To3GHzRawData) -> FastAcquisition1To3GHzMetadata:
+             fast_acq_raw_data: FastAcquisition1To3GHzRawData,
+             band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL) -> FastAcquisition1To3GHzMetadata:
+
+        metadata = FastAcquisition1To3GHzMetadataBinLoader._load_desc(bin_file)
+        metadata.band = band
+
+        FastAcquisition1To3GHzMetadataBinLoader.find_pulse_edge_samples(metadata, fast_acq_raw_data)
+
+        lhcp = fast_acq_data.lhcp
+        rhcp = fast_acq_data.rhcp
+        if lhcp.shape != rhcp.shape:
+            metadata.is_bad = True
+            raise ValueError(f"Polarization arrays has different sizes: {lhcp.shape} != {rhcp.shape}. Observation marked as bad.")
+
+        FastAcquisition1To3GHzMetadataBinLoader._set_axes(metadata, num_frequencies=lhcp.shape[0], num_samples=lhcp.shape[1])
+        return metadata
+
+    @staticmethod
+    def load_from_generator_state(bin_file: Path, pol0_generator_state: np.ndarray, pol1_generator_state: np.ndarray,
+                                  num_frequencies: int, num_samples: int,
+                                  band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL
+                                  ) -> FastAcquisition1To3GHzMetadata:
+
+        """
+            Метаданные без данных наблюдения: по .desc, размерам массивов и состоянию генератора
+            в первом частотном канале склейки (по одному значению на сэмпл, 0/1)
+        """
+
+        metadata = FastAcquisition1To3GHzMetadataBinLoader._load_desc(bin_file)
+        metadata.band = band
+        FastAcquisition1To3GHzMetadataBinLoader.find_pulse_edge_samples_by_generator_state(
+            metadata, pol0_generator_state, pol1_generator_state)
+        FastAcquisition1To3GHzMetadataBinLoader._set_axes(metadata, num_frequencies=num_frequencies, num_samples=num_samples)
+        return metadata
+
+    @staticmethod
+    def _load_desc(bin_file: Path) -> FastAcquisition1To3GHzMetadata:
 
         metadata = FastAcquisition1To3GHzMetadata()
 
@@ -43,15 +83,12 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
             logger.exception(e)
             raise
 
-        bin_file_extensions = bin_file.suffixes
         bin_file_name = bin_file.name
         full_extension = "".join(bin_file.suffixes)
         bin_file_base_name = bin_file_name.removesuffix(full_extension)
 
-        if bin_file_extensions == ['.bin', '.gz']:
-            metadata.data_file_extension = ".bin.gz"
-        elif bin_file_extensions == ['.bin']:
-            metadata.data_file_extension = ".bin"
+        if FastAcquisition1To3GHzCodecs.is_supported(bin_file):
+            metadata.data_file_extension = FastAcquisition1To3GHzCodecs.extension(bin_file)
         else:
             raise ValueError(f"File {bin_file} has invalid extension. Expected .bin, but found {bin_file.suffix}")
 
@@ -145,8 +182,76 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
         metadata.feed_offset_time = timedelta(seconds=float(desc_data.get_value("feed_offset_time")))
         metadata.start_pulse_edge_time = int(desc_data.get_value("pulse1_rlc")[1])
         metadata.stop_pulse_edge_time = int(desc_data.get_value("pulse2_rlc")[0])
+        metadata.pulse1_rlc = desc_data.get_value("pulse1_rlc")
+        metadata.pulse2_rlc = desc_data.get_value("pulse2_rlc")
+        metadata.record_duration_rlc = desc_data.get_value("record_duration_rlc")
 
-        FastAcquisition1To3GHzMetadataBinLoader.find_pulse_edge_samples(metadata, fast_acq_raw_data)
+        return metadata
+
+    @staticmethod
+    def load_desc(bin_file: Path) -> FastAcquisition1To3GHzMetadata:
+
+        """
+            Метаданные только по .desc, без сэмплов импульсов и осей
+        """
+
+        return FastAcquisition1To3GHzMetadataBinLoader._load_desc(bin_file)
+
+    @staticmethod
+    def set_sample_window(metadata: FastAcquisition1To3GHzMetadata, first_sample: int, num_samples: int):
+
+        """
+            Пересчет метаданных для части записи: сэмплы [first_sample, first_sample + num_samples).
+            Сэмплы импульсов и ref_time отсчитываются от начала части, время начала и окончания регистрации
+            (T_START, T_STOP в FITS) - начало и конец части
+        """
+
+        reg_start_utc = metadata.datetime_reg_start_utc
+        reg_start_local = metadata.datetime_reg_start_local
+        if metadata.start_pulse_edge_sample is not None:
+            metadata.start_pulse_edge_sample -= first_sample
+        if metadata.stop_pulse_edge_sample is not None:
+            metadata.stop_pulse_edge_sample -= first_sample
+        FastAcquisition1To3GHzMetadataBinLoader._set_axes(metadata, num_frequencies=metadata.num_frequencies,
+                                                          num_samples=num_samples)
+
+        window_offset = timedelta(seconds=first_sample / config.samples_per_second)
+        window_duration = timedelta(seconds=metadata.record_duration_seconds)
+        metadata.datetime_reg_start_utc = reg_start_utc + window_offset
+        metadata.datetime_reg_start_local = reg_start_local + window_offset
+        metadata.datetime_reg_stop_utc = metadata.datetime_reg_start_utc + window_duration
+        metadata.datetime_reg_stop_local = metadata.datetime_reg_start_local + window_duration
+
+    @staticmethod
+    def set_time_reduction(metadata: FastAcquisition1To3GHzMetadata, factor: int):
+
+        """
+            Пересчет метаданных после усреднения по времени блоками по factor сэмплов
+            (FastAcquisition1To3GHzBuilder.time_downsample): неполный последний блок отброшен,
+            новый сэмпл относится к середине блока
+        """
+
+        num_samples = metadata.num_samples // factor
+        axes = metadata.coordinate_axes
+        coordinate_axes = CoordinateAxes()
+        coordinate_axes.frequency_axis = axes.frequency_axis
+        coordinate_axes.time_axis = axes.time_axis[:num_samples * factor].reshape(num_samples, factor).mean(axis=1)
+        coordinate_axes.arcsec_axis = axes.arcsec_axis[:num_samples * factor].reshape(num_samples, factor).mean(axis=1)
+        metadata.coordinate_axes = coordinate_axes
+
+        if metadata.start_pulse_edge_sample is not None:
+            metadata.start_pulse_edge_sample //= factor
+        if metadata.stop_pulse_edge_sample is not None:
+            metadata.stop_pulse_edge_sample //= factor
+        metadata.ref_sample = (metadata.ref_sample - (factor - 1) / 2) / factor
+        metadata.arcsec_per_sample *= factor
+        metadata.time_resolution *= factor
+        metadata.time_reduction_factor *= factor
+        metadata.num_samples = num_samples
+        metadata.record_duration_seconds = num_samples * metadata.time_resolution
+
+    @staticmethod
+    def _set_axes(metadata: FastAcquisition1To3GHzMetadata, num_frequencies: int, num_samples: int):
 
         metadata.datetime_culmination_feed_horn_utc = metadata.datetime_culmination_efrat_utc + metadata.feed_offset_time
         metadata.datetime_culmination_feed_horn_local = metadata.datetime_culmination_efrat_local + metadata.feed_offset_time
@@ -163,15 +268,16 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
         metadata.ref_sample = metadata.start_pulse_edge_sample - metadata.start_pulse_edge_time * config.samples_per_second
         metadata.arcsec_per_sample = metadata.arcsec_per_second / config.samples_per_second
 
-        lhcp = fast_acq_data.lhcp
-        rhcp = fast_acq_data.rhcp
-        if lhcp.shape != rhcp.shape:
-            metadata.is_bad = True
-            raise ValueError(f"Polarization arrays has different sizes: {lhcp.shape} != {rhcp.shape}. Observation marked as bad.")
-        num_frequencies = lhcp.shape[0]
-        num_samples = lhcp.shape[1]
+        # Ось полосы 1-2 или 2-3 GHz - половина оси 1-3 GHz
+        band = FastAcquisition1To3GHzBand.FULL if metadata.band is None else metadata.band
+        num_full_frequencies = num_frequencies * 2 // len(band.channels)
+        if band is FastAcquisition1To3GHzBand.HIGH:
+            band_slice = slice(num_full_frequencies - num_frequencies, num_full_frequencies)
+        else:
+            band_slice = slice(0, num_frequencies)
 
-        frequency_axis = np.linspace(config.freq_min / 1000, config.freq_max / 1000, num=num_frequencies, dtype=np.float64)
+        frequency_axis = np.linspace(config.freq_min / 1000, config.freq_max / 1000, num=num_full_frequencies,
+                                     dtype=np.float64)[band_slice]
         polarization_axis = [PolarizationType.LHCP, PolarizationType.RHCP]
 
         metadata.frequencies = copy.deepcopy(frequency_axis)
@@ -190,7 +296,7 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
         metadata.datetime_reg_stop_local = metadata.datetime_reg_start_local + timedelta(
             seconds=metadata.record_duration_seconds)
 
-        frequency_axis = np.linspace(config.freq_min, config.freq_max, num_frequencies)
+        frequency_axis = np.linspace(config.freq_min, config.freq_max, num_full_frequencies)[band_slice]
         time_axis = np.arange(num_samples) / config.samples_per_second
         arcsec_axis = - (time_axis - metadata.ref_time) * metadata.arcsec_per_second
 
@@ -201,7 +307,7 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
         metadata.coordinate_axes = coordinate_axes
 
         metadata.time_reduction_factor = 1
-        metadata.frequency_resolution = (config.freq_max - config.freq_min) / frequency_axis.size
+        metadata.frequency_resolution = (config.freq_max - config.freq_min) / num_full_frequencies
         metadata.time_resolution = 1 / config.samples_per_second
         metadata.arcsec_resolution = 1 / metadata.arcsec_per_second
         metadata.switch_polarization_time = 1 / config.switch_polarization_frequency # sec
@@ -211,22 +317,29 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
     @staticmethod
     def find_pulse_edge_samples(metadata: FastAcquisition1To3GHzMetadata, fast_acq_raw_data: FastAcquisition1To3GHzRawData):
 
-        ch0_pol0_state = fast_acq_raw_data.generator_state_data.c0p0_state
-        ch1_pol0_state = fast_acq_raw_data.generator_state_data.c1p0_state
+        # Первый частотный канал склейки (FastAcquisition1To3GHzBand.join) - c0, для полосы 2-3 GHz - c1;
+        # состояние хранится по одному значению на сэмпл
+        generator_state_data = fast_acq_raw_data.generator_state_data
+        if metadata.band is FastAcquisition1To3GHzBand.HIGH:
+            pol0_state = generator_state_data.c1p0_state
+            pol1_state = generator_state_data.c1p1_state
+        else:
+            pol0_state = generator_state_data.c0p0_state
+            pol1_state = generator_state_data.c0p1_state
 
-        ch0_pol1_state = fast_acq_raw_data.generator_state_data.c0p1_state
-        ch1_pol1_state = fast_acq_raw_data.generator_state_data.c1p1_state
+        pol0_generator_state = (pol0_state & 2 ** config.generator_bit) >> config.generator_bit
+        pol1_generator_state = (pol1_state & 2 ** config.generator_bit) >> config.generator_bit
 
-        pol0_generator_state = (
-                (np.hstack((np.fliplr(ch0_pol0_state), ch1_pol0_state)).T & 2 ** config.generator_bit) >> config.generator_bit
-        )
-        if pol0_generator_state.shape[1] == 0:
-            pol0_generator_state = None
+        FastAcquisition1To3GHzMetadataBinLoader.find_pulse_edge_samples_by_generator_state(
+            metadata, pol0_generator_state, pol1_generator_state)
 
-        pol1_generator_state = (
-                (np.hstack((np.fliplr(ch0_pol1_state), ch1_pol1_state)).T & 2 ** config.generator_bit) >> config.generator_bit
-        )
-        if pol1_generator_state.shape[1] == 0:
+    @staticmethod
+    def find_pulse_edge_samples_by_generator_state(metadata: FastAcquisition1To3GHzMetadata,
+                                                   pol0_generator_state: np.ndarray, pol1_generator_state: np.ndarray):
+
+        if pol0_generator_state.shape[0] == 0:
+            pol0_generator_state = None
+        if pol1_generator_state.shape[0] == 0:
             pol1_generator_state = None
 
         pol0_edge_h = -1
@@ -235,10 +348,10 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
         pol1_edge_l = sys.maxsize
 
         if pol0_generator_state is not None:
-            median = pol0_generator_state.shape[1] // 2
+            median = pol0_generator_state.shape[0] // 2
             try:
-                pol0_edge_h = median + np.nonzero(pol0_generator_state[0, median:])[0][0]
-                pol0_edge_l = np.nonzero(pol0_generator_state[0, :median])[-1][-1]
+                pol0_edge_h = median + np.nonzero(pol0_generator_state[median:])[0][0]
+                pol0_edge_l = np.nonzero(pol0_generator_state[:median])[-1][-1]
             except IndexError as ex:
                 raise ValueError(f"find_pulse_edge_samples(): pol0: probably pulse not found: {ex}")
                 #logging.warning(f"find_pulse_edge_samples(): pol0: probably pulse not found: {ex}")
@@ -248,10 +361,10 @@ class FastAcquisition1To3GHzMetadataBinLoader(RatanMetadataLoader):
             pol0_edge_h = sys.maxsize
 
         if pol1_generator_state is not None:
-            median = pol1_generator_state.shape[1] // 2
+            median = pol1_generator_state.shape[0] // 2
             try:
-                pol1_edge_h = median + np.nonzero(pol1_generator_state[0, median:])[0][0]
-                pol1_edge_l = np.nonzero(pol1_generator_state[0, :median])[-1][-1]
+                pol1_edge_h = median + np.nonzero(pol1_generator_state[median:])[0][0]
+                pol1_edge_l = np.nonzero(pol1_generator_state[:median])[-1][-1]
             except IndexError as ex:
                 raise ValueError(f"find_pulse_edge_samples(): pol1: probably pulse not found: {ex}")
                 #logging.warning(f"find_pulse_edge_samples(): pol1: probably pulse not found: {ex}")
@@ -11,12 +11,18 @@ from ratan_600_data_analyzer.ratan.ratan_observation import RatanObservation
 
 class FastAcquisition1To3GHzObservation(RatanObservation):
 
+    """
+        data и raw_data не копируются: массивы data только для чтения (FastAcquisition1To3GHzData),
+        raw_data - рабочие массивы этапов (разметка на месте), передаются во владение наблюдению.
+        Независимая копия наблюдения - copy.deepcopy(observation)
+    """
+
     def __init__(self, metadata: FastAcquisition1To3GHzMetadata, data: FastAcquisition1To3GHzData,
                  raw_data: FastAcquisition1To3GHzRawData = None):
         super().__init__(metadata, data)
         self._metadata = copy.deepcopy(metadata)
-        self._data = copy.deepcopy(data)
-        self._raw_data = copy.deepcopy(raw_data)
+        self._data = data
+        self._raw_data = raw_data
 
     @property
     def metadata(self) -> FastAcquisition1To3GHzMetadata:
@@ -32,7 +38,7 @@ class FastAcquisition1To3GHzObservation(RatanObservation):
 
     @data.setter
     def data(self, data: FastAcquisition1To3GHzData):
-        self._data = copy.deepcopy(data)
+        self._data = data
 
     @property
     def raw_data(self) -> FastAcquisition1To3GHzRawData:
@@ -40,4 +46,4 @@ class FastAcquisition1To3GHzObservation(RatanObservation):
 
     @raw_data.setter
     def raw_data(self, raw_data: FastAcquisition1To3GHzRawData):
-        self._raw_data = copy.deepcopy(raw_data)
\ No newline at end of file
+        self._raw_data = raw_data
\ No newline at end of file
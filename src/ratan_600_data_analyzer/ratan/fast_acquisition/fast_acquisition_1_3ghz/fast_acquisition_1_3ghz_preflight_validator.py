@@ -0,0 +1,142 @@
+import logging
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_demultiplexer import \
+    FastAcquisition1To3GHzBinDemultiplexer
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_reader import \
+    FastAcquisition1To3GHzBinReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_metadata import \
+    FastAcquisition1To3GHzMetadata
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_metadata_bin_loader import \
+    FastAcquisition1To3GHzMetadataBinLoader
+
+logger = logging.getLogger(__name__)
+
+
+class FastAcquisition1To3GHzPreflightValidator:
+
+    """
+        Быстрая проверка записи до чтения: .desc и один проход по заголовкам записей (без декодирования спектров).
+        Отбраковывает файлы, на которых обработка упала бы после полного декодирования:
+        нет или не читается .desc, нет записей, avg_kurt вне диапазона или меняется внутри записи,
+        разная длина каналов/поляризаций склейки, не найден калибровочный импульс.
+
+        Ошибка - ValueError с сообщением "preflight: <проверка>: <причина>"
+    """
+
+    # avg_kurt & 0b111111 - log2 усреднения, длина спектра 8192 >> log2 не меньше 1
+    MAX_AVERAGING_LOG = 13
+
+    @staticmethod
+    def validate(bin_file: Path, band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL,
+                 keep_records: bool = False
+                 ) -> tuple[FastAcquisition1To3GHzMetadata, FastAcquisition1To3GHzBinDemultiplexer | None]:
+
+        """
+            (метаданные записи (как FastAcquisition1To3GHzBinReader.read_metadata), записи) или ValueError
+            с причиной отказа.
+            keep_records - архив разбирается на записи целиком (FastAcquisition1To3GHzBinReader.read_records),
+            они возвращаются для чтения (FastAcquisition1To3GHzBinReader.read(records=...),
+            FastAcquisition1To3GHzBuilder.records): архив, прошедший проверку, распаковывается один раз.
+            Иначе и для несжатых файлов читаются только заголовки, записи - None
+        """
+
+        start = time.perf_counter()
+        band = FastAcquisition1To3GHzBand(band)
+        error = FastAcquisition1To3GHzPreflightValidator._error
+
+        if not bin_file.is_file():
+            raise error('file', f"'{bin_file}' not found")
+        if not FastAcquisition1To3GHzCodecs.is_supported(bin_file):
+            raise error('file', f"unsupported file type '{bin_file.name}'")
+        if bin_file.stat().st_size == 0:
+            raise error('file', "file is empty")
+
+        desc_file = bin_file.with_name(bin_file.name.removesuffix(FastAcquisition1To3GHzCodecs.extension(bin_file)) + '.desc')
+        if not desc_file.is_file():
+            raise error('desc', f"'{desc_file.name}' not found")
+        try:
+            FastAcquisition1To3GHzMetadataBinLoader.load_desc(bin_file)
+        except Exception as e:
+            raise error('desc', FastAcquisition1To3GHzPreflightValidator._reason(e)) from e
+
+        reader = FastAcquisition1To3GHzBinReader()
+        records = None
+        try:
+            if keep_records and FastAcquisition1To3GHzCodecs.is_compressed(bin_file):
+                records = reader.read_records(bin_file, band=band)
+            avg_kurt, headers = reader.scan_headers(bin_file, band=band, records=records)
+        except Exception as e:
+            raise error('records', FastAcquisition1To3GHzPreflightValidator._reason(e)) from e
+        metadata = FastAcquisition1To3GHzPreflightValidator._check_headers(bin_file, reader, avg_kurt, headers, band)
+
+        logger.debug(f"[{bin_file.name}] Preflight passed in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return metadata, records
+
+    @staticmethod
+    def _check_headers(bin_file: Path, reader: FastAcquisition1To3GHzBinReader, avg_kurt: int, headers: tuple,
+                       band: FastAcquisition1To3GHzBand) -> FastAcquisition1To3GHzMetadata:
+        error = FastAcquisition1To3GHzPreflightValidator._error
+
+        FastAcquisition1To3GHzPreflightValidator._check_avg_kurt(avg_kurt, headers)
+
+        decoder = reader.header_decoder(avg_kurt, headers, band=band)
+        for p0, p1 in (('c0p0', 'c0p1'), ('c1p0', 'c1p1')):
+            if int(p0[1]) in band.channels and decoder.num_spectra(p0) != decoder.num_spectra(p1):
+                raise error('shape', f"LHCP/RHCP sizes differ: {p0} {decoder.num_spectra(p0)} != "
+                                     f"{p1} {decoder.num_spectra(p1)} samples")
+        try:
+            num_samples = decoder.num_samples
+        except ValueError as e:
+            raise error('shape', str(e)) from e
+        if num_samples == 0:
+            raise error('records', f"no samples in band {band.value}")
+
+        try:
+            return FastAcquisition1To3GHzMetadataBinLoader.load_from_generator_state(
+                bin_file, decoder.generator_state(0), decoder.generator_state(1),
+                num_frequencies=decoder.num_frequencies, num_samples=num_samples, band=band)
+        except Exception as e:
+            raise error('pulse', FastAcquisition1To3GHzPreflightValidator._reason(e)) from e
+
+    @staticmethod
+    def _check_avg_kurt(avg_kurt: int, headers: tuple):
+
+        """
+            log2 усреднения в допустимом диапазоне и одинаковый avg_kurt во всех записях
+            (нулевые записи - пропуски кадров - не учитываются)
+        """
+
+        averaging_log = avg_kurt & 0b111111
+        if averaging_log > FastAcquisition1To3GHzPreflightValidator.MAX_AVERAGING_LOG:
+            raise FastAcquisition1To3GHzPreflightValidator._error(
+                'avg_kurt', f"averaging log2 {averaging_log} > {FastAcquisition1To3GHzPreflightValidator.MAX_AVERAGING_LOG}")
+        for stream, stream_headers in zip(FastAcquisition1To3GHzBinDemultiplexer.STREAMS, headers):
+            present = (stream_headers['cnt'] != 0) | (stream_headers['avg_kurt'] != 0) | (stream_headers['state'] != 0)
+            inconsistent = np.flatnonzero(present & (stream_headers['avg_kurt'] != avg_kurt))
+            if inconsistent.size > 0:
+                raise FastAcquisition1To3GHzPreflightValidator._error(
+                    'avg_kurt', f"{stream}: {inconsistent.size} records with avg_kurt != {avg_kurt} "
+                                f"(first: cnt {inconsistent[0]}, avg_kurt {int(stream_headers['avg_kurt'][inconsistent[0]])})")
+
+    @staticmethod
+    def _reason(e: BaseException) -> str:
+
+        """
+            Сообщение исходной ошибки (без обертки RuntimeError этапов чтения)
+        """
+
+        while e.__cause__ is not None:
+            e = e.__cause__
+        return str(e)
+
+    @staticmethod
+    def _error(check: str, reason: str) -> ValueError:
+        return ValueError(f"preflight: {check}: {reason}")
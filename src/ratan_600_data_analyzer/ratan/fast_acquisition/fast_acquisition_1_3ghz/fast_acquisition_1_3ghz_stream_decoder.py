@@ -0,0 +1,207 @@
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_jit_kernels import \
+    FastAcquisition1To3GHzJitKernels
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_threads import \
+    FastAcquisition1To3GHzStreamThreads
+
+
+class FastAcquisition1To3GHzStreamDecoder:
+
+    """
+        Декодирование потоков c0p0, c0p1, c1p0, c1p1 (записи fast_input.dt, разложенные по номеру кадра cnt)
+        в спектры: данные и куртозис (по строке на спектр), состояние (по значению на спектр).
+
+        Записи потоков не изменяются, каждый вызов возвращает новые массивы.
+        Для метаданных достаточно заголовков записей (config.header_dt).
+        Для полосы 1-2 или 2-3 GHz потоки другого канала пустые и не используются.
+
+        c0 1-2 GHz
+        c1 2-3 GHz
+    """
+
+    # Записей в блоке декодирования: промежуточный uint64 блока (256 КБ) остается в кэше
+    DECODE_BLOCK_RECORDS = 0x100
+
+    def __init__(self, avg_kurt: int, c0p0: np.ndarray, c0p1: np.ndarray, c1p0: np.ndarray, c1p1: np.ndarray,
+                 band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL):
+        self._spectrum_length = 8192 // 2 ** (avg_kurt & 0b111111)
+        self._streams = {'c0p0': c0p0, 'c0p1': c0p1, 'c1p0': c1p0, 'c1p1': c1p1}
+        self._band = band
+
+    def __deepcopy__(self, memo):
+        # Записи потоков только читаются, копии наблюдения используют общий декодер
+        return self
+
+    @property
+    def spectrum_length(self) -> int:
+        return self._spectrum_length
+
+    @property
+    def band(self) -> FastAcquisition1To3GHzBand:
+        return self._band
+
+    @property
+    def num_frequencies(self) -> int:
+        return len(self._band.channels) * self._spectrum_length
+
+    @property
+    def num_samples(self) -> int:
+        if self._band is FastAcquisition1To3GHzBand.LOW:
+            return self.num_spectra('c0p0')
+        if self._band is FastAcquisition1To3GHzBand.HIGH:
+            return self.num_spectra('c1p0')
+        c0_num_samples = self.num_spectra('c0p0')
+        c1_num_samples = self.num_spectra('c1p0')
+        if c0_num_samples != c1_num_samples:
+            raise ValueError(f"Channels has different sizes: {c0_num_samples} != {c1_num_samples}.")
+        return c0_num_samples
+
+    def data(self, stream: str) -> np.ndarray:
+
+        """
+            Спектры потока, пропущенные значения (0) заменены на config.raw_missing_value_replacement
+        """
+
+        data = np.empty(self._spectra_shape(stream), dtype=np.float32)
+        self.decode_records(self._streams[stream], self._spectrum_length, data=data,
+                            missing_value=config.raw_missing_value_replacement)
+        return data
+
+    def kurtosis(self, stream: str) -> np.ndarray:
+
+        """
+            Куртозис потока, 9 бит на отсчет: uint16
+        """
+
+        kurtosis = np.empty(self._spectra_shape(stream), dtype=np.uint16)
+        self.decode_records(self._streams[stream], self._spectrum_length, kurtosis=kurtosis)
+        return kurtosis
+
+    def state(self, stream: str) -> np.ndarray:
+
+        """
+            Слово состояния, по одному на спектр: из записи с отсчетом наименьшей частоты спектра
+            (c0 - последний отсчет спектра, c1 - первый)
+        """
+
+        value = self._spectrum_length - 1 if stream.startswith('c0') else 0
+        value_records = (np.arange(self.num_spectra(stream)) * self._spectrum_length + value) // config.chunk_length
+        return self._streams[stream]['state'][value_records]
+
+    def decode(self, stream: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+        """
+            data(), kurtosis() потока за один проход по записям и state()
+        """
+
+        shape = self._spectra_shape(stream)
+        data = np.empty(shape, dtype=np.float32)
+        kurtosis = np.empty(shape, dtype=np.uint16)
+        self.decode_records(self._streams[stream], self._spectrum_length, data=data, kurtosis=kurtosis,
+                            missing_value=config.raw_missing_value_replacement)
+        return data, kurtosis, self.state(stream)
+
+    def decode_stacked(self, streams: tuple) -> tuple[np.ndarray, np.ndarray]:
+
+        """
+            data(), kurtosis() потоков streams одной длины в общие массивы (поток, время, частота),
+            спектры потока streams[i] - [i] (см. FastAcquisition1To3GHzFlagger); потоки декодируются параллельно
+            (FastAcquisition1To3GHzStreamThreads)
+        """
+
+        num_spectra = {self.num_spectra(stream) for stream in streams}
+        if len(num_spectra) > 1:
+            raise ValueError(f"decode_stacked(): streams {streams} has different sizes: {sorted(num_spectra)}")
+        shape = (len(streams), num_spectra.pop() if streams else 0, self._spectrum_length)
+        data = np.empty(shape, dtype=np.float32)
+        kurtosis = np.empty(shape, dtype=np.uint16)
+        FastAcquisition1To3GHzStreamThreads.map(
+            lambda i: self.decode_records(self._streams[streams[i]], self._spectrum_length, data=data[i],
+                                          kurtosis=kurtosis[i], missing_value=config.raw_missing_value_replacement),
+            range(len(streams)))
+        return data, kurtosis
+
+    @staticmethod
+    def decode_records(records: np.ndarray, spectrum_length: int, data: np.ndarray = None,
+                       kurtosis: np.ndarray = None, state: np.ndarray = None, missing_value: float = None):
+
+        """
+            Декодирование записей в заранее выделенные массивы (len(records) * chunk_length // spectrum_length,
+            spectrum_length), C-порядок; None - не вычисляется:
+            data - 55 младших бит отсчета, при missing_value нули заменяются на missing_value,
+            kurtosis - старшие 9 бит отсчета (float32 или целый тип не меньше uint16),
+            state - слово состояния записи на каждый ее отсчет.
+
+            Записи обрабатываются блоками по DECODE_BLOCK_RECORDS, промежуточный uint64 - только на блок;
+            при FastAcquisition1To3GHzJitKernels.is_enabled() - JIT-ядром за один проход
+        """
+
+        num_records = records.shape[0]
+        outputs = []
+        for output in (data, kurtosis, state):
+            if output is None:
+                outputs.append(None)
+                continue
+            if not output.flags.c_contiguous or output.size != num_records * config.chunk_length:
+                raise ValueError(f"decode_records(): output must be C-contiguous with "
+                                 f"{num_records * config.chunk_length} values, got {output.shape}")
+            outputs.append(output.reshape(num_records, config.chunk_length))
+        data_rows, kurtosis_rows, state_rows = outputs
+
+        if FastAcquisition1To3GHzJitKernels.is_enabled():
+            FastAcquisition1To3GHzJitKernels.decode_records(records, data=data_rows, kurtosis=kurtosis_rows,
+                                                           state=state_rows, missing_value=missing_value)
+            return
+
+        step = FastAcquisition1To3GHzStreamDecoder.DECODE_BLOCK_RECORDS
+        buffer = np.empty((min(step, num_records), config.chunk_length), dtype=np.uint64)
+        for start in range(0, num_records, step):
+            stop = min(start + step, num_records)
+            block = records[start:stop]
+            values = block['data']
+            block_buffer = buffer[:stop - start]
+
+            if data_rows is not None:
+                np.bitwise_and(values, 0x7FFFFFFFFFFFFF, out=block_buffer)
+                block_data = data_rows[start:stop]
+                np.copyto(block_data, block_buffer, casting='unsafe')
+                if missing_value is not None:
+                    block_data[block_data == 0] = missing_value
+            if kurtosis_rows is not None:
+                np.right_shift(values, 55, out=block_buffer)
+                np.copyto(kurtosis_rows[start:stop], block_buffer, casting='unsafe')
+            if state_rows is not None:
+                state_rows[start:stop] = block['state'][:, np.newaxis]
+
+    def joined(self, polarization: int, out: np.ndarray = None) -> np.ndarray:
+
+        """
+            Склейка полосы (1-3 GHz) поляризации polarization: (частота, время),
+            out - массив для результата (FastAcquisition1To3GHzBand.join)
+        """
+
+        c0 = self.data(f'c0p{polarization}') if 0 in self._band.channels else None
+        c1 = self.data(f'c1p{polarization}') if 1 in self._band.channels else None
+        return self._band.join(c0, c1, out=out)
+
+    def generator_state(self, polarization: int) -> np.ndarray:
+
+        """
+            Состояние генератора (0/1) в первом частотном канале склейки, по значению на сэмпл:
+            по state() c0 (для полосы 2-3 GHz - c1)
+        """
+
+        channel = 1 if self._band is FastAcquisition1To3GHzBand.HIGH else 0
+        state = self.state(f'c{channel}p{polarization}')
+        return (state & 2 ** config.generator_bit) >> config.generator_bit
+
+    def num_spectra(self, stream: str) -> int:
+        return self._streams[stream].shape[0] * config.chunk_length // self._spectrum_length
+
+    def _spectra_shape(self, stream: str) -> tuple[int, int]:
+        return self.num_spectra(stream), self._spectrum_length
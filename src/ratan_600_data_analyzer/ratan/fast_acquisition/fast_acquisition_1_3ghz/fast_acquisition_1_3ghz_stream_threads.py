@@ -0,0 +1,63 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+
+class FastAcquisition1To3GHzStreamThreads:
+
+    """
+        Пул потоков для независимой обработки потоков c0p0, c0p1, c1p0, c1p1 одной записи
+        (декодирование, разметка, удаление выбросов, склейка): операции NumPy и JIT-ядра отпускают GIL.
+
+        Размер пула - config.stream_threads, 0 - доступные ядра / число процессов-обработчиков
+        (set_workers(), например пул процессов bin2fits). Вызовы map() не вкладываются друг в друга
+    """
+
+    _workers = 1
+    _executor = None
+    _executor_threads = 0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def set_workers(workers: int):
+
+        """
+            Число процессов, одновременно обрабатывающих записи на этой машине (делят ядра)
+        """
+
+        FastAcquisition1To3GHzStreamThreads._workers = max(int(workers), 1)
+
+    @staticmethod
+    def num_threads() -> int:
+        if config.stream_threads > 0:
+            return config.stream_threads
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+        return max(cores // FastAcquisition1To3GHzStreamThreads._workers, 1)
+
+    @staticmethod
+    def map(function, items) -> list:
+
+        """
+            [function(item) for item in items], при num_threads() > 1 - параллельно
+        """
+
+        items = list(items)
+        num_threads = min(FastAcquisition1To3GHzStreamThreads.num_threads(), len(items))
+        if num_threads <= 1:
+            return [function(item) for item in items]
+        return list(FastAcquisition1To3GHzStreamThreads._get_executor().map(function, items))
+
+    @staticmethod
+    def _get_executor() -> ThreadPoolExecutor:
+        num_threads = FastAcquisition1To3GHzStreamThreads.num_threads()
+        with FastAcquisition1To3GHzStreamThreads._lock:
+            if FastAcquisition1To3GHzStreamThreads._executor_threads != num_threads:
+                if FastAcquisition1To3GHzStreamThreads._executor is not None:
+                    FastAcquisition1To3GHzStreamThreads._executor.shutdown(wait=False)
+                FastAcquisition1To3GHzStreamThreads._executor = ThreadPoolExecutor(
+                    max_workers=num_threads, thread_name_prefix='fast_acquisition_streams')
+                FastAcquisition1To3GHzStreamThreads._executor_threads = num_threads
+            return FastAcquisition1To3GHzStreamThreads._executor
@@ -4,6 +4,9 @@ from itertools import groupby
 import plotly.colors
 from PIL import ImageColor
 
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_decoder import \
+    FastAcquisition1To3GHzStreamDecoder
+
 CHUNK_LENGTH = 0x80
 POLARIZATION_MASK = 0b00000000000010000000000000000000
 
@@ -53,12 +56,12 @@ def get_polarization_arrays(raw_array, channel):
 
 
 def get_data_and_kurtosis(a, spectrum_length):
-    cc = a['data'].reshape(-1, spectrum_length)
-    state = np.empty(a['data'].shape, dtype=np.uint32)
-    for i in np.arange(0, state.shape[0]):
-        state[i, :] = a['state'][i]
-    state = state.reshape(-1, spectrum_length)
-    return (cc & 0x7FFFFFFFFFFFFF).astype(np.float32), (cc >> 55).astype(np.float32), state
+    shape = (a.shape[0] * CHUNK_LENGTH // spectrum_length, spectrum_length)
+    data = np.empty(shape, dtype=np.float32)
+    kurtosis = np.empty(shape, dtype=np.float32)
+    state = np.empty(shape, dtype=np.uint32)
+    FastAcquisition1To3GHzStreamDecoder.decode_records(a, spectrum_length, data=data, kurtosis=kurtosis, state=state)
+    return data, kurtosis, state
 
 
 def remove_spikes_from_polarization_arrays(a, b, shift=-4):
@@ -0,0 +1,40 @@
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_decoder import \
+    FastAcquisition1To3GHzStreamDecoder
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.fast_acquisition_1_3ghz_raw_data import \
+    FastAcquisition1To3GHzRawData
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.fast_acquisition_1_3ghz_stacked_raw_data import \
+    FastAcquisition1To3GHzStackedRawData
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.generator_state_data import \
+    GeneratorStateData
+
+
+class FastAcquisition1To3GHzLazyRawData(FastAcquisition1To3GHzRawData):
+
+    """
+        Сырые данные, декодируемые из потоков при первом обращении:
+        polarizations и kurtosis - вместе, в общие массивы (stacked), generator state - только по заголовкам записей
+    """
+
+    def __init__(self, decoder: FastAcquisition1To3GHzStreamDecoder):
+        super().__init__()
+        self._decoder = decoder
+
+    @property
+    def stacked(self) -> FastAcquisition1To3GHzStackedRawData:
+        if self._stacked is None and self._decoder is not None \
+                and None in (self._polarization_channels_data, self._kurtosis_data):
+            self._stacked = FastAcquisition1To3GHzStackedRawData.decode(self._decoder)
+            self._generator_state_data = None
+            self._decoder = None
+        return super().stacked
+
+    @property
+    def generator_state_data(self):
+        if self._generator_state_data is None and self._stacked is None and self._decoder is not None:
+            self._generator_state_data = GeneratorStateData(
+                *(self._decoder.state(stream) for stream in FastAcquisition1To3GHzStackedRawData.STREAMS))
+        return super().generator_state_data
+
+    @generator_state_data.setter
+    def generator_state_data(self, generator_state_data):
+        FastAcquisition1To3GHzRawData.generator_state_data.fset(self, generator_state_data)
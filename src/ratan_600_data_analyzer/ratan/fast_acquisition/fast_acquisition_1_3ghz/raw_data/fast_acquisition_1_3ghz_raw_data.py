@@ -1,10 +1,13 @@
-import copy
+import numpy as np
 
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.fast_acquisition_1_3ghz_stacked_raw_data import \
+    FastAcquisition1To3GHzStackedRawData
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.generator_state_data import \
     GeneratorStateData
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.kurtosis_data import KurtosisData
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.polarization_channels_data import \
     PolarizationChannelsData
+from ratan_600_data_analyzer.utils.array_utils import ArrayUtils
 
 
 class FastAcquisition1To3GHzRawData:
@@ -14,35 +17,105 @@ class FastAcquisition1To3GHzRawData:
         polarizations (pol0,pol1)
         kurtosis (pol0,pol1)
         generator state (pol0,pol1)
+
+        stacked - общие массивы потоков (FastAcquisition1To3GHzStackedRawData); если заданы,
+        polarizations, kurtosis, generator state - срезы этих массивов по потокам.
+        Замена одной из частей отделяет их от общих массивов, stacked собирается заново при обращении.
+        Массивы передаются без копирования; разметка на месте - writable_stacked().
+        Копия (copy.deepcopy) с stacked использует его массивы совместно до первой записи
     """
 
     def __init__(self, pol_channels_data: PolarizationChannelsData = None,
                  kurtosis_data: KurtosisData = None,
-                gen_state_data: GeneratorStateData = None):
-        self._polarization_channels_data = copy.deepcopy(pol_channels_data)
-        self._kurtosis_data = copy.deepcopy(kurtosis_data)
-        self._generator_state_data = copy.deepcopy(gen_state_data)
+                gen_state_data: GeneratorStateData = None,
+                 stacked: FastAcquisition1To3GHzStackedRawData = None):
+        self._polarization_channels_data = pol_channels_data
+        self._kurtosis_data = kurtosis_data
+        self._generator_state_data = gen_state_data
+        self._stacked = stacked
+
+    def __deepcopy__(self, memo):
+        if self._stacked is None:
+            return ArrayUtils.share_read_only(self, memo)
+        # Части - срезы stacked, копия собирает их заново из своего stacked
+        return ArrayUtils.share_read_only(self, memo, dropped=('_polarization_channels_data', '_kurtosis_data',
+                                                               '_generator_state_data'))
+
+    @property
+    def stacked(self) -> FastAcquisition1To3GHzStackedRawData:
+        if self._stacked is None and None not in (self._polarization_channels_data, self._kurtosis_data,
+                                                  self._generator_state_data):
+            pol_chan_data = self._polarization_channels_data
+            kurtosis_data = self._kurtosis_data
+            gen_state_data = self._generator_state_data
+            streams = FastAcquisition1To3GHzStackedRawData.STREAMS
+            self._stacked = FastAcquisition1To3GHzStackedRawData.from_streams(
+                {stream: getattr(pol_chan_data, f'{stream}_data') for stream in streams},
+                {stream: getattr(kurtosis_data, f'{stream}_kurt') for stream in streams},
+                {stream: getattr(gen_state_data, f'{stream}_state') for stream in streams})
+            # Части - срезы собранных массивов
+            self._polarization_channels_data = None
+            self._kurtosis_data = None
+            self._generator_state_data = None
+        return self._stacked
 
     @property
     def polarization_channels_data(self):
+        if self._polarization_channels_data is None and self.stacked is not None:
+            streams = self._stacked.STREAMS
+            self._polarization_channels_data = PolarizationChannelsData(
+                *(self._stacked.stream_data(stream) for stream in streams))
         return self._polarization_channels_data
 
     @polarization_channels_data.setter
     def polarization_channels_data(self, polarization_channels_data):
-        self._polarization_channels_data = copy.deepcopy(polarization_channels_data)
+        self._detach_stacked()
+        self._polarization_channels_data = polarization_channels_data
 
     @property
     def kurtosis_data(self):
+        if self._kurtosis_data is None and self.stacked is not None:
+            streams = self._stacked.STREAMS
+            self._kurtosis_data = KurtosisData(*(self._stacked.stream_kurtosis(stream) for stream in streams))
         return self._kurtosis_data
 
     @kurtosis_data.setter
     def kurtosis_data(self, kurtosis_data):
-        self._kurtosis_data = copy.deepcopy(kurtosis_data)
+        self._detach_stacked()
+        self._kurtosis_data = kurtosis_data
 
     @property
     def generator_state_data(self):
+        if self._generator_state_data is None and self.stacked is not None:
+            streams = self._stacked.STREAMS
+            self._generator_state_data = GeneratorStateData(*(self._stacked.stream_state(stream) for stream in streams))
         return self._generator_state_data
 
     @generator_state_data.setter
     def generator_state_data(self, generator_state_data):
-        self._generator_state_data = copy.deepcopy(generator_state_data)
\ No newline at end of file
+        self._detach_stacked()
+        self._generator_state_data = generator_state_data
+
+    def writable_stacked(self) -> tuple[np.ndarray, np.ndarray]:
+
+        """
+            Данные и куртозис stacked для разметки на месте (FastAcquisition1To3GHzStackedRawData.writable);
+            части собираются заново из них
+        """
+
+        data, kurtosis = self.stacked.writable()
+        self._polarization_channels_data = None
+        self._kurtosis_data = None
+        return data, kurtosis
+
+    def _detach_stacked(self):
+
+        """
+            Части - срезы stacked сохраняются, общие массивы больше не используются
+        """
+
+        if self._stacked is not None:
+            self._polarization_channels_data = self.polarization_channels_data
+            self._kurtosis_data = self.kurtosis_data
+            self._generator_state_data = self.generator_state_data
+            self._stacked = None
@@ -0,0 +1,177 @@
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_band import \
+    FastAcquisition1To3GHzBand
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_decoder import \
+    FastAcquisition1To3GHzStreamDecoder
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.stacked_streams import \
+    stacked_base
+from ratan_600_data_analyzer.utils.array_utils import ArrayUtils
+
+
+class FastAcquisition1To3GHzStackedRawData:
+
+    """
+        Сырые данные потоков полосы в общих массивах: данные и куртозис (поток, время, частота),
+        состояние (поток, время); потоки - streams (c0p0, c0p1, c1p0, c1p1 без потоков вне полосы), одной длины.
+
+        Склейка поляризации (joined) - из этих массивов, один раз на поляризацию.
+
+        Массивы и срезы потоков отдаются только для чтения (ArrayUtils.read_only), разметка на месте - через
+        writable(). Копия контейнера (copy.deepcopy) использует массивы совместно до первой записи в любую из копий
+
+        c0 1-2 GHz
+        c1 2-3 GHz
+    """
+
+    STREAMS = ('c0p0', 'c0p1', 'c1p0', 'c1p1')
+
+    def __init__(self, data: np.ndarray, kurtosis: np.ndarray, state: np.ndarray,
+                 band: FastAcquisition1To3GHzBand = FastAcquisition1To3GHzBand.FULL):
+        self._band = FastAcquisition1To3GHzBand(band)
+        self._streams = tuple(stream for stream in self.STREAMS if int(stream[1]) in self._band.channels)
+        if data.ndim != 3 or data.shape[0] != len(self._streams) or kurtosis.shape != data.shape \
+                or state.shape != data.shape[:2]:
+            raise ValueError(f"Stacked raw data of band {self._band.value} must be ({len(self._streams)}, time, frequency), "
+                             f"got data {data.shape}, kurtosis {kurtosis.shape}, state {state.shape}")
+        self._data = data
+        self._kurtosis = kurtosis
+        self._state = state
+        self._owns_arrays = True
+
+    def __deepcopy__(self, memo):
+        # Массивы становятся общими: первая запись в любую из копий их копирует
+        self._owns_arrays = False
+        return ArrayUtils.share_read_only(self, memo, shared=('_data', '_kurtosis', '_state'))
+
+    @staticmethod
+    def decode(decoder: FastAcquisition1To3GHzStreamDecoder) -> 'FastAcquisition1To3GHzStackedRawData':
+
+        """
+            Декодирование потоков полосы decoder за один проход (FastAcquisition1To3GHzStreamDecoder.decode_stacked).
+            Каналы разной длины - ValueError
+        """
+
+        streams = tuple(stream for stream in FastAcquisition1To3GHzStackedRawData.STREAMS
+                        if int(stream[1]) in decoder.band.channels)
+        num_samples = decoder.num_samples
+        data, kurtosis = decoder.decode_stacked(streams)
+        state = np.empty((len(streams), num_samples), dtype=config.header_dt['state'])
+        for i, stream in enumerate(streams):
+            state[i] = decoder.state(stream)
+        return FastAcquisition1To3GHzStackedRawData(data, kurtosis, state, band=decoder.band)
+
+    @staticmethod
+    def from_streams(data: dict, kurtosis: dict, state: dict, band: FastAcquisition1To3GHzBand = None
+                     ) -> 'FastAcquisition1To3GHzStackedRawData':
+
+        """
+            Из словарей потоков (время, частота) / (время,); потоки - срезы общего массива не копируются.
+            band - None: по непустым потокам. Потоки полосы разной длины - ValueError
+        """
+
+        if band is None:
+            channels = tuple(channel for channel in (0, 1)
+                             if data[f'c{channel}p0'].size > 0 or data[f'c{channel}p1'].size > 0)
+            band = {(0,): FastAcquisition1To3GHzBand.LOW,
+                    (1,): FastAcquisition1To3GHzBand.HIGH}.get(channels, FastAcquisition1To3GHzBand.FULL)
+        band = FastAcquisition1To3GHzBand(band)
+        streams = [stream for stream in FastAcquisition1To3GHzStackedRawData.STREAMS if int(stream[1]) in band.channels]
+        num_samples = {stream: data[stream].shape[0] for stream in streams}
+        if len(set(num_samples.values())) > 1:
+            raise ValueError(f"Channels has different sizes: {num_samples}.")
+
+        def stack(arrays: dict) -> np.ndarray:
+            base = stacked_base([arrays[stream] for stream in streams])
+            if base is not None:
+                return base
+            return np.stack([arrays[stream] for stream in streams])
+
+        return FastAcquisition1To3GHzStackedRawData(stack(data), stack(kurtosis), stack(state), band=band)
+
+    @property
+    def band(self) -> FastAcquisition1To3GHzBand:
+        return self._band
+
+    @property
+    def streams(self) -> tuple:
+        return self._streams
+
+    @property
+    def data(self) -> np.ndarray:
+        return ArrayUtils.read_only(self._data)
+
+    @property
+    def kurtosis(self) -> np.ndarray:
+        return ArrayUtils.read_only(self._kurtosis)
+
+    @property
+    def state(self) -> np.ndarray:
+        return ArrayUtils.read_only(self._state)
+
+    def writable(self) -> tuple[np.ndarray, np.ndarray]:
+
+        """
+            Данные и куртозис для разметки на месте (FastAcquisition1To3GHzFlagger.flag).
+            Общие с копией контейнера массивы предварительно копируются
+        """
+
+        if not self._owns_arrays:
+            self._data = self._data.copy()
+            self._kurtosis = self._kurtosis.copy()
+            self._owns_arrays = True
+        return self._data, self._kurtosis
+
+    @property
+    def num_samples(self) -> int:
+        return self._data.shape[1]
+
+    @property
+    def spectrum_length(self) -> int:
+        return self._data.shape[2]
+
+    @property
+    def num_frequencies(self) -> int:
+        return len(self._band.channels) * self.spectrum_length
+
+    def stream_data(self, stream: str) -> np.ndarray:
+        return self._stream(self._data, stream)
+
+    def stream_kurtosis(self, stream: str) -> np.ndarray:
+        return self._stream(self._kurtosis, stream)
+
+    def stream_state(self, stream: str) -> np.ndarray:
+        return self._stream(self._state, stream)
+
+    def joined(self, polarization: int, out: np.ndarray = None) -> np.ndarray:
+
+        """
+            Склейка полосы поляризации polarization: (частота, время), C-порядок;
+            out - массив для результата (FastAcquisition1To3GHzBand.join)
+        """
+
+        return self._band.join(self.stream_data(f'c0p{polarization}'), self.stream_data(f'c1p{polarization}'),
+                               out=out)
+
+    def generator_state(self, polarization: int) -> np.ndarray:
+
+        """
+            Состояние генератора (0/1) в первом частотном канале склейки, по значению на сэмпл
+            (см. FastAcquisition1To3GHzStreamDecoder.generator_state)
+        """
+
+        channel = 1 if self._band is FastAcquisition1To3GHzBand.HIGH else 0
+        state = self.stream_state(f'c{channel}p{polarization}')
+        return (state & 2 ** config.generator_bit) >> config.generator_bit
+
+    def _stream(self, array: np.ndarray, stream: str) -> np.ndarray:
+
+        """
+            Срез потока stream, для потока вне полосы - пустой массив
+        """
+
+        if stream in self._streams:
+            return ArrayUtils.read_only(array[self._streams.index(stream)])
+        return np.empty((0,) + array.shape[2:], dtype=array.dtype)
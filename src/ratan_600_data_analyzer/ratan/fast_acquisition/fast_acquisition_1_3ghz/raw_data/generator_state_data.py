@@ -8,6 +8,9 @@ class GeneratorStateData:
     """
             c0 1-2 GHz
             c1 2-3 GHz
+
+            Слово состояния записи, по одному значению на спектр (сэмпл времени): (num_samples,) uint32.
+            Берется из записи с отсчетом наименьшей частоты спектра (c0 - последний отсчет, c1 - первый)
     """
     _c0p0_state: np.ndarray
     _c0p1_state: np.ndarray
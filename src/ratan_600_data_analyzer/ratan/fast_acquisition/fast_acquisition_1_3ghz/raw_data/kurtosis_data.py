@@ -2,18 +2,28 @@ from dataclasses import dataclass
 
 import numpy as np
 
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.stacked_streams import \
+    deepcopy_streams
+
 
 @dataclass
 class KurtosisData:
     """
             c0 1-2 GHz
             c1 2-3 GHz
+
+            Куртозис - 9 бит на отсчет, хранится как uint16
     """
     _c0p0_kurt: np.ndarray
     _c0p1_kurt: np.ndarray
     _c1p0_kurt: np.ndarray
     _c1p1_kurt: np.ndarray
 
+    def __deepcopy__(self, memo):
+        # Потоки - срезы общего массива (поток, время, частота) остаются срезами его копии
+        return KurtosisData(*deepcopy_streams((self._c0p0_kurt, self._c0p1_kurt,
+                                               self._c1p0_kurt, self._c1p1_kurt), memo))
+
     @property
     def c0p0_kurt(self):
         return self._c0p0_kurt
@@ -1,8 +1,10 @@
-import copy
 from dataclasses import dataclass
 
 import numpy as np
 
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.raw_data.stacked_streams import \
+    deepcopy_streams
+
 
 @dataclass
 class PolarizationChannelsData:
@@ -10,19 +12,26 @@ class PolarizationChannelsData:
     """
             c0 1-2 GHz
             c1 2-3 GHz
+
+            Потоки - рабочие массивы (разметка на месте), присваиваются без копирования
     """
     _c0p0_data: np.ndarray
     _c0p1_data: np.ndarray
     _c1p0_data: np.ndarray
     _c1p1_data: np.ndarray
 
+    def __deepcopy__(self, memo):
+        # Потоки - срезы общего массива (поток, время, частота) остаются срезами его копии
+        return PolarizationChannelsData(*deepcopy_streams((self._c0p0_data, self._c0p1_data,
+                                                           self._c1p0_data, self._c1p1_data), memo))
+
     @property
     def c0p0_data(self):
         return self._c0p0_data
 
     @c0p0_data.setter
     def c0p0_data(self, value):
-        self._c0p0_data = copy.deepcopy(value)
+        self._c0p0_data = value
 
     @property
     def c0p1_data(self):
@@ -30,7 +39,7 @@ class PolarizationChannelsData:
 
     @c0p1_data.setter
     def c0p1_data(self, value):
-        self._c0p1_data = copy.deepcopy(value)
+        self._c0p1_data = value
 
     @property
     def c1p0_data(self):
@@ -38,7 +47,7 @@ class PolarizationChannelsData:
 
     @c1p0_data.setter
     def c1p0_data(self, value):
-        self._c1p0_data = copy.deepcopy(value)
+        self._c1p0_data = value
 
     @property
     def c1p1_data(self):
@@ -46,4 +55,4 @@ class PolarizationChannelsData:
 
     @c1p1_data.setter
     def c1p1_data(self, value):
-        self._c1p1_data = copy.deepcopy(value)
\ No newline at end of file
+        self._c1p1_data = value
\ No newline at end of file
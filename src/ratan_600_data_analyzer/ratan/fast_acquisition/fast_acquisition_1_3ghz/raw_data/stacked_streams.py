@@ -0,0 +1,37 @@
+import copy
+
+import numpy as np
+
+
+def stacked_base(streams) -> np.ndarray:
+
+    """
+        Массив (поток, время, частота), последовательные срезы [0], [1], ... которого - непустые потоки streams,
+        иначе None
+    """
+
+    streams = [stream for stream in streams if stream.size > 0]
+    if not streams:
+        return None
+    base = streams[0].base
+    if not isinstance(base, np.ndarray) or base.ndim != 3 or base.shape[0] != len(streams):
+        return None
+    for i, stream in enumerate(streams):
+        if stream.base is not base or stream.shape != base.shape[1:] \
+                or stream.__array_interface__['data'][0] != base[i].__array_interface__['data'][0]:
+            return None
+    return base
+
+
+def deepcopy_streams(streams: tuple, memo: dict) -> tuple:
+
+    """
+        Копия потоков; срезы общего массива (stacked_base) остаются срезами его копии
+    """
+
+    base = stacked_base(streams)
+    if base is None:
+        return tuple(copy.deepcopy(stream, memo) for stream in streams)
+    base = copy.deepcopy(base, memo)
+    slices = iter(base)
+    return tuple(next(slices) if stream.size > 0 else copy.deepcopy(stream, memo) for stream in streams)
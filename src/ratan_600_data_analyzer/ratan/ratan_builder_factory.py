@@ -4,6 +4,8 @@ from typing import TypeGuard, Union
 from ratan_600_data_analyzer.ratan.data_receiver import DataReceiver
 from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_builder import \
     FastAcquisition1To3GHzBuilder
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
 from ratan_600_data_analyzer.ratan.ratan_observation_builder import RatanObservationBuilder
 from ratan_600_data_analyzer.ratan.sspc.sspc_builder import SSPCBuilder
 
@@ -14,7 +16,7 @@ class RatanBuilderFactory:
     def create_builder(file: Path) -> Union[FastAcquisition1To3GHzBuilder, SSPCBuilder]:
 
         extensions = file.suffixes
-        if (extensions == ['.bin', '.gz']) or (extensions == ['.bin']):
+        if FastAcquisition1To3GHzCodecs.is_supported(file):
             builder = FastAcquisition1To3GHzBuilder(file)
             builder.receiver = DataReceiver.FAST_ACQUISITION_1_3GHZ
             return builder
@@ -5,15 +5,46 @@ from pathlib import Path
 
 from ratan_600_data_analyzer.ratan.data_receiver import DataReceiver
 from ratan_600_data_analyzer.ratan.ratan_observation import RatanObservation
+from ratan_600_data_analyzer.ratan.ratan_pipeline_stage import RatanPipelineStage, RatanStageSpec
 
 
 class RatanObservationBuilder(ABC):
+
+    """
+        STAGES - этапы построителя (методы), доступные RatanObservationDirector, и их совместимость
+    """
+
+    STAGES = {'read': RatanStageSpec(provides=('data',))}
+
     def __init__(self, file: Path):
         self._file = file
         self._receiver = None
         self._data = None
         self._metadata = None
 
+    @property
+    def file(self) -> Path:
+        return self._file
+
+    @staticmethod
+    def default_stages() -> list:
+
+        """
+            Этапы обработки по умолчанию (RatanObservationDirector)
+        """
+
+        return [RatanPipelineStage('read')]
+
+    def resume(self, observation: RatanObservation) -> RatanObservationBuilder:
+
+        """
+            Продолжение построения с готового наблюдения (результат этапа из RatanStageCache)
+        """
+
+        self._metadata = observation.metadata
+        self._data = observation.data
+        return self
+
     @abstractmethod
     def read(self):
         pass
@@ -1,4 +1,178 @@
+import inspect
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import psutil
+
+from ratan_600_data_analyzer.ratan.ratan_observation import RatanObservation
+from ratan_600_data_analyzer.ratan.ratan_observation_builder import RatanObservationBuilder
+from ratan_600_data_analyzer.ratan.ratan_pipeline_stage import RatanPipelineStage
+from ratan_600_data_analyzer.ratan.ratan_stage_cache import RatanStageCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RatanStageReport:
+    """
+        Измерения этапа: время, с; память процесса (RSS) до и после этапа и пиковая, МБ.
+        cached - результат этапа взят из кэша, этап не выполнялся
+    """
+    stage: str
+    seconds: float = 0.0
+    rss_before_mb: float = 0.0
+    rss_after_mb: float = 0.0
+    peak_rss_mb: float = 0.0
+    cached: bool = False
+
+    def __str__(self) -> str:
+        if self.cached:
+            return f"{self.stage}: cached"
+        return (f"{self.stage}: {self.seconds:.2f} s, RSS {self.rss_before_mb:.0f} -> {self.rss_after_mb:.0f} MB, "
+                f"peak {self.peak_rss_mb:.0f} MB")
 
 
 class RatanObservationDirector:
-    pass
\ No newline at end of file
+    """
+        Построение наблюдения по объявленному списку этапов (например, config.pipeline приемника):
+        этап - метод построителя с параметрами (RatanPipelineStage), описания этапов - builder.STAGES.
+        Совместимость этапов проверяется до запуска (check). Каждый этап измеряется (reports): время и
+        память процесса, опрашиваемая каждые memory_sample_interval с.
+
+        cache - результаты этапов (RatanStageCache): выполняются только этапы после самого длинного
+        закэшированного начала списка. Построитель с in_place переводится в режим копий, чтобы следующие
+        этапы не изменяли наблюдения в кэше
+    """
+
+    def __init__(self, builder: RatanObservationBuilder, stages: list, cache: RatanStageCache = None,
+                 memory_sample_interval: float = 0.05):
+        self._builder = builder
+        self._stages = RatanObservationDirector.check(builder, stages)
+        self._cache = cache
+        self._memory_sample_interval = memory_sample_interval
+        self._reports = []
+
+    @property
+    def stages(self) -> list[RatanPipelineStage]:
+        return self._stages
+
+    @property
+    def reports(self) -> list[RatanStageReport]:
+        return self._reports
+
+    @staticmethod
+    def check(builder: RatanObservationBuilder, stages: list) -> list[RatanPipelineStage]:
+
+        """
+            Этапы stages (RatanPipelineStage или записи конфигурации) для builder, до выполнения:
+            этап и его параметры есть у построителя, значения параметров допустимы (spec.choices),
+            результаты, нужные этапу, получены предыдущими этапами.
+            Несовместимый список - ValueError с причиной
+        """
+
+        stages = [RatanPipelineStage.from_config(stage) for stage in stages]
+        if not stages:
+            raise ValueError("Pipeline has no stages")
+
+        specs = builder.STAGES
+        available = set()
+        done = []
+        for stage in stages:
+            spec = specs.get(stage.name)
+            if spec is None:
+                raise ValueError(f"Stage '{stage.name}' is not supported by {type(builder).__name__}, "
+                                 f"available: {', '.join(specs)}")
+            try:
+                inspect.signature(getattr(builder, stage.name)).bind(**stage.params)
+            except TypeError as e:
+                raise ValueError(f"Stage {stage}: {e}") from e
+            for name, choices in spec.choices.items():
+                value = stage.params.get(name)
+                if value is not None and (value.lower() if isinstance(value, str) else value) not in choices:
+                    raise ValueError(f"Stage {stage}: {name}={value!r} is not supported, "
+                                     f"available: {', '.join(map(str, choices))}")
+
+            missing = [result for result in spec.requires if result not in available]
+            if missing:
+                raise ValueError(f"Stage {stage} requires {', '.join(missing)}, "
+                                 f"not provided by previous stages: {done}")
+            conflicts = [result for result in spec.excludes if result in available]
+            if conflicts:
+                raise ValueError(f"Stage {stage} is not allowed after {', '.join(conflicts)}: {done}")
+            available.update(spec.provides)
+            done.append(stage.name)
+        return stages
+
+    def construct(self) -> RatanObservation:
+        file = self._builder.file
+        self._reports = []
+
+        start = 0
+        if self._cache is not None:
+            if getattr(self._builder, 'in_place', False):
+                self._builder.in_place = False
+            for stop in range(len(self._stages), 0, -1):
+                observation = self._cache.get(RatanStageCache.key(file, self._stages[:stop]))
+                if observation is not None:
+                    self._builder.resume(observation)
+                    self._reports.extend(RatanStageReport(str(stage), cached=True) for stage in self._stages[:stop])
+                    start = stop
+                    break
+
+        for i in range(start, len(self._stages)):
+            stage = self._stages[i]
+            with _MemorySampler(self._memory_sample_interval) as memory:
+                started = time.perf_counter()
+                try:
+                    getattr(self._builder, stage.name)(**stage.params)
+                except Exception as e:
+                    # Тип исключения сохраняется (MemoryError - обработка записи частями в bin2fits)
+                    e.add_note(f"Pipeline stage: {stage}")
+                    raise
+                seconds = time.perf_counter() - started
+            report = RatanStageReport(str(stage), seconds, memory.rss_before_mb, memory.rss_after_mb,
+                                      memory.peak_rss_mb)
+            self._reports.append(report)
+            logger.info(f"[{file.name}] {report}")
+
+            if self._cache is not None:
+                self._cache.put(RatanStageCache.key(file, self._stages[:i + 1]), self._builder.build())
+
+        return self._builder.build()
+
+
+class _MemorySampler:
+    """
+        RSS процесса до и после блока with и пиковый за время блока (опрос в фоновом потоке), МБ
+    """
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._process = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = None
+        self.rss_before_mb = 0.0
+        self.rss_after_mb = 0.0
+        self.peak_rss_mb = 0.0
+
+    def __enter__(self) -> '_MemorySampler':
+        self.rss_before_mb = self.peak_rss_mb = self._rss_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+        self.rss_after_mb = self._rss_mb()
+        self.peak_rss_mb = max(self.peak_rss_mb, self.rss_after_mb)
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(self._interval):
+            self.peak_rss_mb = max(self.peak_rss_mb, self._rss_mb())
+
+    def _rss_mb(self) -> float:
+        return self._process.memory_info().rss / 1024 ** 2
@@ -0,0 +1,51 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class RatanStageSpec:
+    """
+        Описание этапа построителя для RatanObservationDirector (RatanObservationBuilder.STAGES):
+        requires - результаты предыдущих этапов, без которых этап не выполняется,
+        provides - результаты этапа,
+        excludes - результаты, после которых этап недопустим (например, повторная калибровка),
+        choices - допустимые значения параметров {имя: (значения,)} (строки - без учета регистра)
+    """
+    requires: tuple = ()
+    provides: tuple = ()
+    excludes: tuple = ()
+    choices: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class RatanPipelineStage:
+    """
+        Этап конвейера: метод построителя name с именованными параметрами params.
+        В конфигурации - таблица { stage = "calibrate", method = "lebedev" } или имя этапа
+    """
+    name: str
+    params: dict = field(default_factory=dict)
+
+    @staticmethod
+    def from_config(entry) -> 'RatanPipelineStage':
+        if isinstance(entry, RatanPipelineStage):
+            return entry
+        if isinstance(entry, str):
+            return RatanPipelineStage(entry)
+        params = dict(entry)
+        name = params.pop('stage', None)
+        if name is None:
+            raise ValueError(f"Pipeline stage without 'stage' name: {entry}")
+        return RatanPipelineStage(name, params)
+
+    @property
+    def key(self) -> str:
+
+        """
+            Этап с параметрами, например calibrate(method='lebedev'): ключ кэша результатов и имя в отчетах
+        """
+
+        params = ', '.join(f"{name}={value!r}" for name, value in sorted(self.params.items()))
+        return f"{self.name}({params})"
+
+    def __str__(self) -> str:
+        return self.key
@@ -1,35 +1,41 @@
+from pathlib import Path
+
+from ratan_600_data_analyzer.ratan.ratan_builder_factory import RatanBuilderFactory
+from ratan_600_data_analyzer.ratan.ratan_observation import RatanObservation
+from ratan_600_data_analyzer.ratan.ratan_observation_director import RatanObservationDirector, RatanStageReport
+from ratan_600_data_analyzer.ratan.ratan_stage_cache import RatanStageCache
 
 
 class ObservationProcessingFacade:
-    # RatanObservationProcessor
 
     """
-    Facade
+        Обработка записи: построитель по типу файла (RatanBuilderFactory), этапы - RatanObservationDirector.
+        cache - результаты этапов для повторной обработки тех же записей (например, quicklook, затем полная)
     """
-    # def __init__(self):
-    #     self.observation = None
-    #
-    # def read_observation(self, file_path: str):
-    #     reader = ReaderFactory.get_reader(file_path)
-    #     self.observation = reader.read_inplace(file_path)
-    #
-    # def denoise_observation(self):
-    #     denoiser = DenoiserFactory.get_denoiser(self.observation)
-    #     denoiser.denoise_inplace(self.observation)
-    #
-    # def calibrate_observation(self, method: str):
-    #     calibrator = CalibratorFactory.get_calibrator(method, self.observation)
-    #     calibrator.calibrate_inplace(self.observation)
-    #
-    # def find_sun_center(self):
-    #     finder = SunCenterFinderFactory.get_finder(self.observation)
-    #     finder.find_center_inplace(self.observation)
-    #
-    # def downsample_observation(self):
-    #     if isinstance(self.observation, FastAcquisitionObservation):
-    #         downsampler = DownsamplerFactory.get_downsampler(self.observation)
-    #         downsampler.downsample_inplace(self.observation)
-    #
-    # def save_observation(self, output_path: str):
-    #     saver = SaverFactory.get_saver(output_path)
-    #     saver.save_inplace(self.observation, output_path)
\ No newline at end of file
+
+    def __init__(self, cache: RatanStageCache = None):
+        self._cache = cache
+        self._reports = []
+
+    @property
+    def reports(self) -> list[RatanStageReport]:
+
+        """
+            Измерения этапов последней обработки
+        """
+
+        return self._reports
+
+    def process(self, file: Path, stages: list = None) -> RatanObservation:
+
+        """
+            stages - этапы (RatanPipelineStage или записи конфигурации), None - этапы приемника по умолчанию
+            (builder.default_stages(), для 1-3 GHz - config.pipeline)
+        """
+
+        builder = RatanBuilderFactory.create_builder(file)
+        director = RatanObservationDirector(builder, builder.default_stages() if stages is None else stages,
+                                            cache=self._cache)
+        observation = director.construct()
+        self._reports = director.reports
+        return observation
@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from pathlib import Path
+
+from ratan_600_data_analyzer.ratan.ratan_observation import RatanObservation
+
+
+class RatanStageCache:
+    """
+        Результаты этапов RatanObservationDirector (наблюдения) в памяти: ключ - файл (путь, размер, mtime:
+        перезаписанная запись не берется из кэша) и этапы до результата включительно. Например, после quicklook
+        (read, remove_spikes) полная обработка той же записи начинается с калибровки.
+        max_entries - число хранимых результатов, вытесняются давно не использованные
+    """
+
+    def __init__(self, max_entries: int = 4):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @property
+    def max_entries(self) -> int:
+        return self._max_entries
+
+    @staticmethod
+    def key(file: Path, stages: list) -> tuple:
+        stat = file.stat()
+        return str(file), stat.st_size, stat.st_mtime_ns, tuple(stage.key for stage in stages)
+
+    def get(self, key: tuple) -> RatanObservation:
+        observation = self._entries.get(key)
+        if observation is not None:
+            self._entries.move_to_end(key)
+        return observation
+
+    def put(self, key: tuple, observation: RatanObservation):
+        self._entries[key] = observation
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
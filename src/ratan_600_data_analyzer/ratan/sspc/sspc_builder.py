@@ -19,6 +19,10 @@ class SSPCBuilder(RatanObservationBuilder):
         self._data = observation.data
         return self
 
+    def resume(self, observation: SSPCObservation) -> SSPCBuilder:
+        super().resume(observation)
+        return self
+
     def build(self) -> SSPCObservation:
         return SSPCObservation(self._metadata, self._data)
 
@@ -1,14 +1,20 @@
-import copy
-
 import numpy as np
 
 from ratan_600_data_analyzer.ratan.ratan_observation_data import RatanObservationData
+from ratan_600_data_analyzer.utils.array_utils import ArrayUtils
 
 
 class SSPCData(RatanObservationData):
 
+    """
+        array_3d хранится и отдается только для чтения, без копирования (ArrayUtils.read_only)
+    """
+
     def __init__(self, array_3d: np.ndarray):
-        self._array_3d = copy.deepcopy(array_3d)
+        self._array_3d = ArrayUtils.read_only(array_3d)
+
+    def __deepcopy__(self, memo):
+        return ArrayUtils.share_read_only(self, memo)
 
     @property
     def array_3d(self):
@@ -16,4 +22,4 @@ class SSPCData(RatanObservationData):
 
     @array_3d.setter
     def array_3d(self, array_3d):
-        self._array_3d = array_3d
\ No newline at end of file
+        self._array_3d = ArrayUtils.read_only(array_3d)
\ No newline at end of file
@@ -30,7 +30,7 @@ class SSPCFitsReader(RatanObservationReader):
             with fits.open(file) as hdul:
                 header = copy.deepcopy(hdul[0].header)
                 hdu2_table = copy.deepcopy(hdul[1].data)
-                array_3d = copy.deepcopy(hdul[0].data.astype(np.float32))
+                array_3d = hdul[0].data.astype(np.float32)
         except (FileNotFoundError, OSError, ValueError) as e:
             message = f"Error while reading file: {file}"
             logger.exception(f"{message}")
@@ -0,0 +1,82 @@
+"""
+    Микро-бенчмарк декодирования потока записей fast_input.dt в спектры (данные, куртозис, состояние):
+    прежняя реализация (цикл по записям и полноразмерные временные uint64) против
+    FastAcquisition1To3GHzStreamDecoder.decode_records (блоки, заранее выделенные массивы).
+
+    python -m ratan_600_data_analyzer.scripts.benchmark_fast_acquisition_1_3ghz_decode --records 200000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_decoder import \
+    FastAcquisition1To3GHzStreamDecoder
+
+
+def reference_decode(a, spectrum_length):
+    cc = a['data'].reshape(-1, spectrum_length)
+    state = np.empty(a['data'].shape, dtype=np.uint32)
+    for i in np.arange(0, state.shape[0]):
+        state[i, :] = a['state'][i]
+    state = state.reshape(-1, spectrum_length)
+    return (cc & 0x7FFFFFFFFFFFFF).astype(np.float32), (cc >> 55).astype(np.float32), state
+
+
+def fused_decode(a, spectrum_length, data, kurtosis, state):
+    FastAcquisition1To3GHzStreamDecoder.decode_records(a, spectrum_length, data=data, kurtosis=kurtosis, state=state)
+    return data, kurtosis, state
+
+
+def make_records(num_records: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    records = np.zeros(num_records, dtype=config.dt)
+    records['cnt'] = np.arange(num_records)
+    records['state'] = rng.integers(0, 2 ** 32, num_records, dtype=np.uint32)
+    records['data'] = rng.integers(0, 2 ** 64, (num_records, config.chunk_length), dtype=np.uint64)
+    return records
+
+
+def best_time(function, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode kernel micro-benchmark")
+    parser.add_argument("--records", type=int, default=100_000, help="Number of records in the stream")
+    parser.add_argument("--spectrum-length", type=int, default=256, help="Spectrum length (8192 // avg)")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs, best time is reported")
+    args = parser.parse_args()
+
+    records = make_records(args.records)
+    shape = (args.records * config.chunk_length // args.spectrum_length, args.spectrum_length)
+    data = np.empty(shape, dtype=np.float32)
+    kurtosis = np.empty(shape, dtype=np.float32)
+    state = np.empty(shape, dtype=np.uint32)
+
+    expected = reference_decode(records, args.spectrum_length)
+    actual = fused_decode(records, args.spectrum_length, data, kurtosis, state)
+    for name, e, a in zip(("data", "kurtosis", "state"), expected, actual):
+        if not np.array_equal(e, a):
+            raise SystemExit(f"Mismatch in {name}")
+
+    reference_time = best_time(lambda: reference_decode(records, args.spectrum_length), args.repeat)
+    fused_time = best_time(lambda: fused_decode(records, args.spectrum_length, data, kurtosis, state), args.repeat)
+
+    size_mb = records.nbytes / 2 ** 20
+    print(f"records: {args.records} ({size_mb:.0f} MB), spectrum length: {args.spectrum_length}")
+    print(f"reference: {reference_time:.3f} s ({size_mb / reference_time:.0f} MB/s)")
+    print(f"fused:     {fused_time:.3f} s ({size_mb / fused_time:.0f} MB/s)")
+    print(f"speedup:   {reference_time / fused_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
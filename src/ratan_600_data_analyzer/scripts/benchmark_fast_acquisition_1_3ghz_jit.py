@@ -0,0 +1,100 @@
+"""
+    Бенчмарк JIT-ядер (numba) разбора и декодирования записей fast_input.dt:
+    разбор по потокам (FastAcquisition1To3GHzBinDemultiplexer), удаление выбросов и декодирование
+    данных, куртозиса и состояния - с JIT-ядрами и NumPy-реализацией.
+    Совпадение результатов проверяет tests/test_fast_acquisition_1_3ghz_jit_kernels.py
+
+    python -m ratan_600_data_analyzer.scripts.benchmark_fast_acquisition_1_3ghz_jit --records 200000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_demultiplexer import \
+    FastAcquisition1To3GHzBinDemultiplexer
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_reader import \
+    FastAcquisition1To3GHzBinReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_jit_kernels import \
+    FastAcquisition1To3GHzJitKernels
+
+
+def make_records(num_records: int, avg_log: int, drop: float = 0.01, seed: int = 0) -> np.ndarray:
+
+    """
+        Записи 4 потоков вперемешку: cnt по потоку, переключение поляризации, пропуски,
+        повторы cnt, нулевые отсчеты и куртозис 9 бит
+    """
+
+    rng = np.random.default_rng(seed)
+    records = np.zeros(num_records, dtype=config.dt)
+    frame = np.arange(num_records) // 2
+    records['cnt'] = frame
+    records['avg_kurt'] = avg_log
+    records['channel'] = (np.arange(num_records) % 2) * 3
+    polarization = (frame // 30) % 2
+    records['state'] = np.where(polarization != 0, config.polarization_mask, 0) | rng.integers(0, 2 ** 19, num_records)
+    values = rng.integers(0, 2 ** 55, (num_records, config.chunk_length), dtype=np.uint64)
+    values[rng.random(values.shape) < 0.01] = 0
+    kurtosis = rng.integers(0, 512, values.shape, dtype=np.uint64)
+    records['data'] = values | (kurtosis << np.uint64(55))
+    repeated = rng.random(num_records) < drop
+    records['cnt'][repeated] = np.maximum(records['cnt'][repeated].astype(np.int64) - 1, 0)
+    return records[rng.random(num_records) > drop]
+
+
+def pipeline(records: np.ndarray) -> list[np.ndarray]:
+    demultiplexer = FastAcquisition1To3GHzBinDemultiplexer(capacity=records.shape[0] // 2)
+    for start in range(0, records.shape[0], config.read_chunk_records):
+        demultiplexer.add(records[start:start + config.read_chunk_records])
+    reader = FastAcquisition1To3GHzBinReader()
+    decoder = reader._get_decoder(demultiplexer.avg_kurt, *demultiplexer.result())
+    result = []
+    for stream in FastAcquisition1To3GHzBinDemultiplexer.STREAMS:
+        result.extend(decoder.decode(stream))
+        spectrum_length = decoder.spectrum_length
+        state = np.empty(decoder.num_spectra(stream) * spectrum_length, dtype=np.uint32)
+        decoder.decode_records(decoder._streams[stream], spectrum_length, state=state)
+        result.append(state)
+    return result
+
+
+def best_time(function, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JIT decode/demux kernels benchmark")
+    parser.add_argument("--records", type=int, default=100_000, help="Number of records")
+    parser.add_argument("--avg-log", type=int, default=5, help="log2 of averaging, spectrum length 8192 >> avg_log")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs, best time is reported")
+    args = parser.parse_args()
+
+    if not FastAcquisition1To3GHzJitKernels.is_enabled():
+        raise SystemExit("JIT kernels are disabled: numba is not installed or config.jit_kernels is false")
+
+    records = make_records(args.records, args.avg_log)
+    # Компиляция JIT-ядер - вне замеров
+    pipeline(records)
+
+    jit_time = best_time(lambda: pipeline(records), args.repeat)
+    with FastAcquisition1To3GHzJitKernels.numpy_fallback():
+        numpy_time = best_time(lambda: pipeline(records), args.repeat)
+
+    size_mb = records.nbytes / 2 ** 20
+    print(f"records: {records.shape[0]} ({size_mb:.0f} MB), spectrum length: {8192 >> args.avg_log}")
+    print(f"numpy: {numpy_time:.3f} s ({size_mb / numpy_time:.0f} MB/s)")
+    print(f"jit:   {jit_time:.3f} s ({size_mb / jit_time:.0f} MB/s)")
+    print(f"speedup: {numpy_time / jit_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+    Перепаковка записей быстрого сбора 1-3 GHz (.bin, .bin.gz, .bin.xz, ...) в поколоночный формат .binc
+    для многократного чтения (FastAcquisition1To3GHzColumnarFile); .desc копируется рядом.
+
+    python -m ratan_600_data_analyzer.scripts.convert_fast_acquisition_1_3ghz_columnar raw/*.bin.gz --output-dir columnar
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_columnar_converter import \
+    FastAcquisition1To3GHzColumnarConverter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert .bin / compressed .bin observations to the columnar .binc format")
+    parser.add_argument("files", type=Path, nargs="+", help=".bin or compressed .bin files")
+    parser.add_argument("--output-dir", type=Path, default=None, help="Output directory. Default: next to the source")
+    parser.add_argument("--overwrite", action="store_true", help="Overwrite existing .binc files")
+    args = parser.parse_args()
+
+    for file in args.files:
+        start = time.perf_counter()
+        try:
+            output_file = FastAcquisition1To3GHzColumnarConverter.convert(file, args.output_dir, args.overwrite)
+        except Exception as e:
+            print(f"{file.name}: {e}")
+            continue
+        print(f"{file.name} -> {output_file} ({file.stat().st_size / 2 ** 20:.1f} MB -> "
+              f"{output_file.stat().st_size / 2 ** 20:.1f} MB, {time.perf_counter() - start:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
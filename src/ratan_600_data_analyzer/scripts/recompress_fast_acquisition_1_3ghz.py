@@ -0,0 +1,75 @@
+"""
+    Перепаковка записей быстрого сбора 1-3 GHz (.bin, .bin.gz, ...) другим кодеком
+    (FastAcquisition1To3GHzCodecs), например архива .bin.gz в быстрее распаковываемый .bin.zst;
+    .desc копируется рядом. Выводит размер и время распаковки исходного и нового файла.
+
+    python -m ratan_600_data_analyzer.scripts.recompress_fast_acquisition_1_3ghz raw/*.bin.gz --codec zst --output-dir zst
+"""
+
+import argparse
+import shutil
+import time
+from pathlib import Path
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+
+def read_time(file: Path) -> float:
+    start = time.perf_counter()
+    with FastAcquisition1To3GHzCodecs.open(file) as f:
+        while f.read(config.read_chunk_records * config.dt.itemsize):
+            pass
+    return time.perf_counter() - start
+
+
+def recompress(file: Path, suffix: str, output_dir: Path = None, overwrite: bool = False) -> Path:
+    extension = FastAcquisition1To3GHzCodecs.extension(file)
+    if not FastAcquisition1To3GHzCodecs.is_bin(file):
+        raise ValueError(f"Unsupported file type: '{file.name}'.")
+    base_name = file.name.removesuffix(extension)
+    directory = file.parent if output_dir is None else output_dir
+    output_file = directory / (base_name + FastAcquisition1To3GHzCodecs.BIN_SUFFIX + suffix)
+    if output_file.exists() and not overwrite:
+        raise FileExistsError(f"'{output_file}' already exists")
+
+    codec = next(codec for codec in FastAcquisition1To3GHzCodecs.codecs() if codec.suffix == suffix)
+    directory.mkdir(parents=True, exist_ok=True)
+    temp_file = output_file.with_name(output_file.name + '.temp')
+    try:
+        with FastAcquisition1To3GHzCodecs.open(file) as src, codec.open(temp_file, 'wb') as dst:
+            shutil.copyfileobj(src, dst, config.read_chunk_records * config.dt.itemsize)
+        temp_file.replace(output_file)
+    finally:
+        temp_file.unlink(missing_ok=True)
+
+    desc_file = file.with_name(base_name + ".desc")
+    output_desc_file = output_file.with_name(base_name + ".desc")
+    if desc_file.exists() and desc_file.resolve() != output_desc_file.resolve():
+        shutil.copy2(desc_file, output_desc_file)
+    return output_file
+
+
+def main():
+    suffixes = [codec.suffix.removeprefix('.') for codec in FastAcquisition1To3GHzCodecs.codecs()]
+    parser = argparse.ArgumentParser(description="Recompress .bin observations with another codec")
+    parser.add_argument("files", type=Path, nargs="+", help=".bin or compressed .bin files")
+    parser.add_argument("--codec", choices=suffixes, default=suffixes[-1], help="Target codec (file suffix)")
+    parser.add_argument("--output-dir", type=Path, default=None, help="Output directory. Default: next to the source")
+    parser.add_argument("--overwrite", action="store_true", help="Overwrite existing files")
+    args = parser.parse_args()
+
+    for file in args.files:
+        try:
+            output_file = recompress(file, '.' + args.codec, args.output_dir, args.overwrite)
+        except Exception as e:
+            print(f"{file.name}: {e}")
+            continue
+        print(f"{file.name} ({file.stat().st_size / 2 ** 20:.1f} MB, read {read_time(file):.2f} s) -> "
+              f"{output_file.name} ({output_file.stat().st_size / 2 ** 20:.1f} MB, read {read_time(output_file):.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import copy
+
+import numpy as np
+
+
+class ArrayUtils:
+
+    @staticmethod
+    def read_only(array):
+
+        """
+            Представление массива только для чтения, без копирования (None и не ndarray - как есть).
+            Контейнеры данных наблюдения хранят и отдают такие представления (copy-on-write):
+            изменение - через явную копию array.copy() и присваивание ее контейнеру
+        """
+
+        if not isinstance(array, np.ndarray) or not array.flags.writeable:
+            return array
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    @staticmethod
+    def share_read_only(obj, memo: dict, shared: tuple = (), dropped: tuple = ()):
+
+        """
+            Копия obj для __deepcopy__ контейнера: массивы только для чтения и атрибуты shared
+            используются совместно, атрибуты dropped (собираемые заново) в копии - None, остальные копируются
+        """
+
+        result = obj.__class__.__new__(obj.__class__)
+        memo[id(obj)] = result
+        for name, value in obj.__dict__.items():
+            if name in dropped:
+                result.__dict__[name] = None
+            elif name in shared or isinstance(value, np.ndarray) and not value.flags.writeable:
+                result.__dict__[name] = value
+            else:
+                result.__dict__[name] = copy.deepcopy(value, memo)
+        return result
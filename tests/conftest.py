@@ -0,0 +1,91 @@
+import gzip
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+# Запись 1-3 GHz: 2048 кадров, log2 усреднения 7 (спектр 64 отсчета) - 3840 сэмплов, ~34 с, 4 МБ
+AVERAGING_LOG = 7
+NUM_FRAMES = 2048
+# Калибровочные импульсы генератора, с от начала записи
+PULSES = ((2, 4), (30, 32))
+
+DESC = """# synthetic record
+{
+ "feed_offset": 43,
+ "record_duration_rlc": [-17, 17],
+ "pulse1_rlc": [-15, -13],
+ "pulse2_rlc": [13, 15],
+ "acquisition_parameters": {"average_points": 32, "kurtosis_lower_bound_12ghz": -20, "kurtosis_upper_bound_12ghz": 20,
+  "kurtosis_lower_bound_23ghz": -20, "kurtosis_upper_bound_23ghz": 20, "attenuator_12ghz": 0, "attenuator_23ghz": 0,
+  "attenuator_common": -20, "polarization": 0, "noise_generator": 0, "auto_polarization_switch": 1},
+ "override_mainobs": False,
+ "azimuth": 0,
+ "object": 'sun',
+ "culmination": "2024-06-05T12:12:12.890000+03:00",
+ "feed_offset_time": 44.208052,
+ "start_time": "2024-06-05T12:08:32.098052+03:00"
+}
+"""
+
+
+def make_records(num_frames: int, averaging_log: int, pulses: tuple = (), drop: float = 0.01,
+                 seed: int = 0) -> np.ndarray:
+
+    """
+        Записи config.dt двух каналов: переключение поляризации каждые 30 кадров, импульсы генератора
+        в кадрах pulses [(start, stop)], нулевые отсчеты, пропуски записей (drop)
+    """
+
+    rng = np.random.default_rng(seed)
+    frame = np.repeat(np.arange(num_frames), 2)
+    records = np.zeros(frame.shape[0], dtype=config.dt)
+    records['cnt'] = frame
+    records['avg_kurt'] = averaging_log | (7 << 6)
+    records['channel'] = np.tile([0, 3], num_frames)
+    state = np.where((frame // 30) % 2 != 0, config.polarization_mask, 0).astype(np.uint32) | 5
+    for start, stop in pulses:
+        state[(frame >= start) & (frame < stop)] |= 1 << config.generator_bit
+    records['state'] = state
+    values = rng.integers(100, 10 ** 9, (records.shape[0], config.chunk_length), dtype=np.uint64)
+    values[rng.random(values.shape) < 0.01] = 0
+    kurtosis = rng.integers(180, 300, values.shape, dtype=np.uint64)
+    records['data'] = values | (kurtosis << np.uint64(55))
+    keep = rng.random(records.shape[0]) > drop
+    # Хвост записи без пропусков: длина потоков одинакова
+    keep[-4 * config.chunk_length:] = True
+    return records[keep]
+
+
+@pytest.fixture(scope='session')
+def fast_acquisition_bin_file(tmp_path_factory) -> Path:
+
+    """
+        Синтетическая запись .bin с .desc
+    """
+
+    frames_per_second = config.samples_per_second * (8192 >> AVERAGING_LOG) / config.chunk_length
+    pulses = tuple((int(start * frames_per_second), int(stop * frames_per_second)) for start, stop in PULSES)
+    directory = tmp_path_factory.mktemp('fast_acquisition_1_3ghz')
+    bin_file = directory / '2024-06-05_120832_sun+00.bin'
+    bin_file.write_bytes(make_records(NUM_FRAMES, AVERAGING_LOG, pulses=pulses).tobytes())
+    (directory / '2024-06-05_120832_sun+00.desc').write_text(DESC)
+    return bin_file
+
+
+@pytest.fixture(scope='session')
+def fast_acquisition_gz_file(fast_acquisition_bin_file, tmp_path_factory) -> Path:
+
+    """
+        Та же запись в архиве .bin.gz с .desc
+    """
+
+    directory = tmp_path_factory.mktemp('fast_acquisition_1_3ghz_gz')
+    gz_file = directory / (fast_acquisition_bin_file.name + '.gz')
+    gz_file.write_bytes(gzip.compress(fast_acquisition_bin_file.read_bytes(), compresslevel=1))
+    shutil.copy(fast_acquisition_bin_file.with_suffix('.desc'), directory)
+    return gz_file
@@ -0,0 +1,15 @@
+import gzip
+
+import numpy as np
+import pytest
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_codecs import \
+    FastAcquisition1To3GHzCodecs
+
+
+@pytest.mark.parametrize('content', (b'', bytes(1_000_000),
+                                     np.random.default_rng(0).bytes(100_000)), ids=('empty', 'zeros', 'incompressible'))
+def test_gzip_uncompressed_size(tmp_path, content):
+    file = tmp_path / 'record.bin.gz'
+    file.write_bytes(gzip.compress(content))
+    assert FastAcquisition1To3GHzCodecs.uncompressed_size(file) == len(content)
@@ -0,0 +1,86 @@
+import sys
+
+import numpy as np
+import pytest
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_builder import \
+    FastAcquisition1To3GHzBuilder
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_threads import \
+    FastAcquisition1To3GHzStreamThreads
+
+
+class _ArrayCopies:
+
+    """
+        Копии массивов не меньше plane байт (ndarray.copy, ndarray.__deepcopy__) в текущем потоке:
+        список (байты / plane)
+    """
+
+    def __init__(self, plane: int):
+        self._plane = plane
+        self.copies = []
+
+    def __enter__(self):
+        sys.setprofile(self._profile)
+        return self
+
+    def __exit__(self, *exc):
+        sys.setprofile(None)
+
+    def _profile(self, frame, event, arg):
+        if event == 'c_call' and getattr(arg, '__name__', None) in ('copy', '__deepcopy__'):
+            owner = getattr(arg, '__self__', None)
+            if isinstance(owner, np.ndarray) and owner.nbytes >= self._plane:
+                self.copies.append(owner.nbytes / self._plane)
+
+
+@pytest.fixture
+def builder(fast_acquisition_bin_file, monkeypatch):
+    # Копии считаются в текущем потоке
+    monkeypatch.setattr(FastAcquisition1To3GHzStreamThreads, 'num_threads', staticmethod(lambda: 1))
+    return FastAcquisition1To3GHzBuilder(fast_acquisition_bin_file)
+
+
+def _plane(builder: FastAcquisition1To3GHzBuilder) -> int:
+
+    """
+        Байты спектрограммы одной поляризации
+    """
+
+    metadata = builder.build().metadata
+    return metadata.num_frequencies * metadata.num_samples * np.dtype(np.float32).itemsize
+
+
+def test_in_place_pipeline_copies(builder):
+    builder.read()
+    plane = _plane(builder)
+    with _ArrayCopies(plane) as counter:
+        builder.remove_spikes(method='kurtosis')
+    assert counter.copies == []
+    with _ArrayCopies(plane) as counter:
+        builder.calibrate(method='lebedev')
+    # Калибратор: lhcp, rhcp и их копии при интерполяции
+    assert counter.copies == [1.0] * 4
+
+
+def test_copy_mode_pipeline_copies(builder):
+    builder.in_place = False
+    read = builder.read().build()
+    plane = _plane(builder)
+    data = read.data.array_3d.copy()
+    raw_data = read.raw_data.stacked.data.copy()
+
+    with _ArrayCopies(plane) as counter:
+        despiked = builder.remove_spikes(method='kurtosis').build()
+    # Разметка выбросов: копия сырых данных (data, kurtosis), спектрограмма собирается заново без копии
+    assert sorted(counter.copies) == [1.0, 2.0]
+
+    with _ArrayCopies(plane) as counter:
+        calibrated = builder.calibrate(method='lebedev').build()
+    # Калибровка: 4 копии калибратора и одна копия куба; сырые данные не копируются
+    assert sorted(counter.copies) == [1.0] * 4 + [2.0]
+    assert np.shares_memory(calibrated.raw_data.stacked.data, despiked.raw_data.stacked.data)
+
+    assert np.array_equal(read.data.array_3d, data, equal_nan=True)
+    assert np.array_equal(read.raw_data.stacked.data, raw_data)
+    assert not read.metadata.is_calibrated and calibrated.metadata.is_calibrated
@@ -0,0 +1,29 @@
+import logging
+
+import numpy as np
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_reader import \
+    FastAcquisition1To3GHzBinReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+
+def test_cached_read(fast_acquisition_bin_file, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_decoded_cache_directory', tmp_path / 'decoded_cache')
+    reference = FastAcquisition1To3GHzBinReader().read(fast_acquisition_bin_file, cache=False)
+    for _ in range(2):
+        observation = FastAcquisition1To3GHzBinReader().read(fast_acquisition_bin_file, cache=True)
+        assert np.array_equal(observation.data.array_3d, reference.data.array_3d, equal_nan=True)
+    assert len(list((tmp_path / 'decoded_cache').iterdir())) == 1
+
+
+def test_unusable_cache_directory(fast_acquisition_bin_file, tmp_path, monkeypatch, caplog):
+    # Кэш не обязателен: каталог кэша - файл, чтение возвращает декодированное наблюдение
+    not_a_directory = tmp_path / 'decoded_cache'
+    not_a_directory.write_text('')
+    monkeypatch.setattr(config, '_decoded_cache_directory', not_a_directory / 'cache')
+    reference = FastAcquisition1To3GHzBinReader().read(fast_acquisition_bin_file, cache=False)
+    with caplog.at_level(logging.WARNING):
+        observation = FastAcquisition1To3GHzBinReader().read(fast_acquisition_bin_file, cache=True)
+    assert np.array_equal(observation.data.array_3d, reference.data.array_3d, equal_nan=True)
+    assert 'decoded cache entry is not saved' in caplog.text
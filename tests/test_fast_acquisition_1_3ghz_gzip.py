@@ -0,0 +1,59 @@
+import gzip
+import shutil
+
+import numpy as np
+import pytest
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_reader import \
+    FastAcquisition1To3GHzBinReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+
+pytest.importorskip('indexed_gzip')
+
+
+@pytest.fixture
+def index_directory(tmp_path, monkeypatch):
+    directory = tmp_path / 'gzip_index'
+    monkeypatch.setattr(config, '_gzip_index_directory', directory)
+    return directory
+
+
+def _compress(content: bytes) -> bytes:
+    return gzip.compress(content, compresslevel=1)
+
+
+def _archive(bin_file, directory, content: bytes):
+    directory.mkdir()
+    archive = directory / (bin_file.name + '.gz')
+    archive.write_bytes(content)
+    shutil.copy(bin_file.with_suffix('.desc'), directory)
+    return archive
+
+
+def test_indexed_read(fast_acquisition_bin_file, tmp_path, index_directory):
+    archive = _archive(fast_acquisition_bin_file, tmp_path / 'archive',
+                       _compress(fast_acquisition_bin_file.read_bytes()))
+    reference = FastAcquisition1To3GHzBinReader().read(fast_acquisition_bin_file, cache=False)
+    for _ in range(2):
+        observation = FastAcquisition1To3GHzBinReader().read(archive, cache=False)
+        assert np.array_equal(observation.data.array_3d, reference.data.array_3d, equal_nan=True)
+    # Индекс - только в каталоге индексов
+    assert sorted(path.name for path in archive.parent.iterdir()) == sorted(
+        [archive.name, fast_acquisition_bin_file.with_suffix('.desc').name])
+
+
+def test_truncated_archive(fast_acquisition_bin_file, tmp_path, index_directory):
+    content = _compress(fast_acquisition_bin_file.read_bytes())
+    archive = _archive(fast_acquisition_bin_file, tmp_path / 'archive', content[:len(content) // 2])
+    with pytest.raises(RuntimeError, match="end-of-stream marker"):
+        FastAcquisition1To3GHzBinReader().read(archive, cache=False)
+    assert not index_directory.exists() or not any(index_directory.iterdir())
+
+
+def test_partial_record(fast_acquisition_bin_file, tmp_path, index_directory):
+    archive = _archive(fast_acquisition_bin_file, tmp_path / 'archive',
+                       _compress(fast_acquisition_bin_file.read_bytes() + b'\0' * 3))
+    with pytest.raises(RuntimeError, match="partial record"):
+        FastAcquisition1To3GHzBinReader().read(archive, cache=False)
+    assert not index_directory.exists() or not any(index_directory.iterdir())
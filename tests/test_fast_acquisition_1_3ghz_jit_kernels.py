@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_demultiplexer import \
+    FastAcquisition1To3GHzBinDemultiplexer
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_reader import \
+    FastAcquisition1To3GHzBinReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_jit_kernels import \
+    FastAcquisition1To3GHzJitKernels
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_stream_decoder import \
+    FastAcquisition1To3GHzStreamDecoder
+from ratan_600_data_analyzer.scripts.benchmark_fast_acquisition_1_3ghz_jit import make_records
+
+pytest.importorskip('numba')
+
+NUM_RECORDS = 20_000
+
+
+@pytest.fixture(params=(5, 7))
+def records(request) -> np.ndarray:
+    if not FastAcquisition1To3GHzJitKernels.is_enabled():
+        pytest.skip("JIT kernels are disabled (config.jit_kernels)")
+    return make_records(NUM_RECORDS, request.param)
+
+
+def _route(records: np.ndarray) -> list[np.ndarray]:
+    demultiplexer = FastAcquisition1To3GHzBinDemultiplexer(capacity=records.shape[0] // 2)
+    for start in range(0, records.shape[0], config.read_chunk_records):
+        demultiplexer.add(records[start:start + config.read_chunk_records])
+    return demultiplexer.result()
+
+
+def _remove_spikes(streams: list[np.ndarray]) -> tuple:
+    return FastAcquisition1To3GHzBinReader()._remove_spikes(*(stream.copy() for stream in streams))
+
+
+def _decode(avg_kurt: int, streams: tuple) -> list[np.ndarray]:
+
+    """
+        data, kurtosis, state на каждый отсчет и decode() каждого потока
+    """
+
+    decoder = FastAcquisition1To3GHzStreamDecoder(avg_kurt, *streams)
+    result = []
+    for stream, records in zip(FastAcquisition1To3GHzBinDemultiplexer.STREAMS, streams):
+        size = records.shape[0] * config.chunk_length
+        data = np.empty(size, dtype=np.float32)
+        kurtosis = np.empty(size, dtype=np.uint16)
+        state = np.empty(size, dtype=np.uint32)
+        decoder.decode_records(records, decoder.spectrum_length, data=data, kurtosis=kurtosis, state=state,
+                               missing_value=config.raw_missing_value_replacement)
+        result.extend((data, kurtosis, state))
+        result.extend(decoder.decode(stream))
+    return result
+
+
+def _assert_identical(jit_result, numpy_result):
+    assert len(jit_result) == len(numpy_result)
+    for jit_array, numpy_array in zip(jit_result, numpy_result):
+        assert jit_array.dtype == numpy_array.dtype
+        assert np.array_equal(jit_array, numpy_array)
+
+
+def test_routing(records):
+    jit_result = _route(records)
+    with FastAcquisition1To3GHzJitKernels.numpy_fallback():
+        numpy_result = _route(records)
+    _assert_identical(jit_result, numpy_result)
+
+
+def test_spike_alignment(records):
+    with FastAcquisition1To3GHzJitKernels.numpy_fallback():
+        streams = _route(records)
+        numpy_result = _remove_spikes(streams)
+    jit_result = _remove_spikes(streams)
+    _assert_identical(jit_result, numpy_result)
+
+
+def test_decode(records):
+    with FastAcquisition1To3GHzJitKernels.numpy_fallback():
+        streams = _remove_spikes(_route(records))
+        numpy_result = _decode(int(records[0]['avg_kurt']), streams)
+    jit_result = _decode(int(records[0]['avg_kurt']), streams)
+    _assert_identical(jit_result, numpy_result)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_bin_reader import \
+    FastAcquisition1To3GHzBinReader
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_builder import \
+    FastAcquisition1To3GHzBuilder
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_configuration import \
+    config
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_preflight_validator import \
+    FastAcquisition1To3GHzPreflightValidator
+
+
+@pytest.fixture
+def passes(monkeypatch, tmp_path) -> list:
+
+    """
+        Проходы по записям файла (FastAcquisition1To3GHzBinReader._demultiplex_file)
+    """
+
+    monkeypatch.setattr(config, '_gzip_index_directory', tmp_path / 'gzip_index')
+    result = []
+    demultiplex_file = FastAcquisition1To3GHzBinReader._demultiplex_file
+
+    def counting(self, file, *args, **kwargs):
+        result.append(file.name)
+        return demultiplex_file(self, file, *args, **kwargs)
+
+    monkeypatch.setattr(FastAcquisition1To3GHzBinReader, '_demultiplex_file', counting)
+    return result
+
+
+def test_validated_records_are_read_once(fast_acquisition_gz_file, passes):
+    reference = FastAcquisition1To3GHzBinReader().read(fast_acquisition_gz_file, cache=False)
+    passes.clear()
+
+    metadata, records = FastAcquisition1To3GHzPreflightValidator.validate(fast_acquisition_gz_file, keep_records=True)
+    builder = FastAcquisition1To3GHzBuilder(fast_acquisition_gz_file)
+    builder.records = records
+    observation = builder.read().build()
+
+    assert len(passes) == 1
+    assert builder.records is None
+    assert metadata.num_samples == observation.metadata.num_samples
+    assert np.array_equal(observation.data.array_3d, reference.data.array_3d, equal_nan=True)
+
+
+def test_headers_only(fast_acquisition_gz_file, fast_acquisition_bin_file, passes):
+    _, records = FastAcquisition1To3GHzPreflightValidator.validate(fast_acquisition_gz_file)
+    assert records is None
+    # Несжатая запись читается через np.memmap, записи не сохраняются
+    _, records = FastAcquisition1To3GHzPreflightValidator.validate(fast_acquisition_bin_file, keep_records=True)
+    assert records is None
+
+
+def test_records_of_other_band(fast_acquisition_gz_file, passes):
+    reader = FastAcquisition1To3GHzBinReader()
+    records = reader.read_records(fast_acquisition_gz_file)
+    with pytest.raises(ValueError, match="do not match band"):
+        reader.read(fast_acquisition_gz_file, band='1-2 GHz', records=records, cache=False)
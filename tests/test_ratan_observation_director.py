@@ -0,0 +1,43 @@
+import pytest
+
+from ratan_600_data_analyzer.ratan.fast_acquisition.fast_acquisition_1_3ghz.fast_acquisition_1_3ghz_builder import \
+    FastAcquisition1To3GHzBuilder
+from ratan_600_data_analyzer.ratan.ratan_observation_director import RatanObservationDirector
+
+
+@pytest.fixture
+def builder(fast_acquisition_bin_file):
+    return FastAcquisition1To3GHzBuilder(fast_acquisition_bin_file)
+
+
+def test_check_accepts_default_pipeline(builder):
+    stages = RatanObservationDirector.check(builder, builder.default_stages())
+    assert [stage.name for stage in stages][0] == 'read'
+
+
+def test_check_accepts_downsampling_after_calibration(builder):
+    RatanObservationDirector.check(builder, ['read', {'stage': 'remove_spikes', 'method': 'kurtosis'},
+                                             {'stage': 'calibrate', 'method': 'lebedev'},
+                                             {'stage': 'time_downsample', 'factor': 16}])
+
+
+@pytest.mark.parametrize('stages, reason', (
+    ([], "no stages"),
+    (['read', 'frobnicate'], "not supported"),
+    (['read', {'stage': 'remove_spikes', 'methd': 'kurtosis'}], "unexpected keyword"),
+    ([{'stage': 'calibrate', 'method': 'lebedev'}], "requires data"),
+    (['read', {'stage': 'calibrate', 'method': 'nonexistent'}], "method='nonexistent' is not supported"),
+    (['read', {'stage': 'calibrate', 'method': 'lebedev'}, {'stage': 'calibrate', 'method': 'lebedev'}],
+     "not allowed after calibrated"),
+    (['read', {'stage': 'time_downsample', 'factor': 16}, {'stage': 'calibrate', 'method': 'lebedev'}],
+     "not allowed after time_downsampled"),
+))
+def test_check_rejects(builder, stages, reason):
+    with pytest.raises(ValueError, match=reason):
+        RatanObservationDirector.check(builder, stages)
+
+
+def test_calibrate_rejects_unknown_method(builder):
+    builder.read()
+    with pytest.raises(ValueError, match="No calibration method found"):
+        builder.calibrate(method='nonexistent')